@@ -0,0 +1,104 @@
+import pygame
+
+
+class Animation:
+
+    def __init__(self, duration, on_update=None):
+        """Create an animation that runs for a fixed amount of time.
+
+        Parameters:
+
+            duration  - Length in milliseconds, at normal speed.
+
+            on_update - Function called with the elapsed time in milliseconds
+                        (never more than duration) whenever the animation
+                        advances.
+        """
+        self._duration = duration
+        self._on_update = on_update
+        self._elapsed = 0
+
+    def advance(self, dt):
+        """Move the animation forward by dt milliseconds."""
+        self._elapsed = min(self._elapsed + dt, self._duration)
+        if self._on_update is not None:
+            self._on_update(self._elapsed)
+
+    def finish(self):
+        """Jump straight to the end of the animation."""
+        self.advance(self._duration)
+
+    def progress(self):
+        """Get how far along the animation is, between 0 and 1."""
+        if self._duration <= 0:
+            return 1
+        return self._elapsed / self._duration
+
+    def done(self):
+        """Return True if the animation has reached its end."""
+        return self._elapsed >= self._duration
+
+
+class Animator:
+
+    def __init__(self, clock=pygame.time.get_ticks):
+        """Create a scheduler that advances animations by real time.
+
+        Parameters:
+            clock - Function returning the current time in milliseconds.
+
+        Attributes:
+
+            speed        - Multiplier applied to every animation. At 10, a
+                           one second animation is over in a tenth of a
+                           second.
+
+            fast_forward - If True, animations finish on their first update.
+        """
+        self.speed = 1.0
+        self.fast_forward = False
+        self._clock = clock
+        self._last = None
+        self._animations = []
+
+    def set_clock(self, clock):
+        """Time animations with a different clock from now on."""
+        self._clock = clock
+        if self._last is not None:
+            self._last = clock()
+
+    def play(self, animation):
+        """Start running an animation, and return it."""
+        if not self._animations:
+            self._last = self._clock()
+        self._animations.append(animation)
+        return animation
+
+    def skip(self, animation=None):
+        """Finish the given animation immediately, or all of them if None."""
+        for a in self._animations:
+            if animation is None or a is animation:
+                a.finish()
+        self._animations = [a for a in self._animations if not a.done()]
+
+    def update(self):
+        """Advance every running animation by the time since the last update.
+
+        Call this once per frame. Finished animations are dropped.
+        """
+        now = self._clock()
+        dt = (now - self._last) * self.speed if self._last is not None else 0
+        self._last = now
+        for a in self._animations:
+            if self.fast_forward:
+                a.finish()
+            else:
+                a.advance(dt)
+        self._animations = [a for a in self._animations if not a.done()]
+
+    def busy(self):
+        """Return True if any animation is still running."""
+        return bool(self._animations)
+
+
+ANIMATOR = Animator()
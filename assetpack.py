@@ -0,0 +1,139 @@
+import io
+import os
+import json
+import mmap
+import struct
+import warnings
+import threading
+from functools import lru_cache
+
+PACK_PATH = "assets.pack"
+MAGIC = b"PKMNPAK2"
+OLD_MAGIC = b"PKMNPAK1"         # packs without each file's mtime
+HEADER = struct.Struct("<8sQ")  # magic, then the length of the JSON index
+
+_PACK_LOCK = threading.Lock()
+
+
+class AssetPack:
+
+    def __init__(self, path):
+        """Open a pack file built by `pack_assets.py`.
+
+        The file is memory-mapped rather than read, so only the assets that
+        are actually used are ever paged in.
+
+        Parameters:
+            path - str path of the pack file.
+        """
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = HEADER.unpack_from(self._map)
+        if magic == OLD_MAGIC:
+            raise ValueError(f"{path} was built by an older pack_assets.py; "
+                             f"run it again.")
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset pack.")
+        start = HEADER.size
+        self._index = json.loads(self._map[start:start + index_len])
+        self._data = start + index_len
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self):
+        """Get the path of every asset in the pack."""
+        return self._index.keys()
+
+    def current(self, name):
+        """Return True if the packed copy of an asset matches its file.
+
+        The file's size and modification time are compared to the ones it
+        had when it was packed. An asset with no file, as when only the pack
+        is shipped, is taken to be current.
+
+        Parameters:
+            name - str of the asset's path when it was packed.
+        """
+        _, size, mtime = self._index[name]
+        try:
+            stat = os.stat(name)
+        except OSError:
+            return True
+        return stat.st_size == size and stat.st_mtime_ns == mtime
+
+    def read(self, name):
+        """Get the bytes of an asset, as a memoryview into the pack.
+
+        Parameters:
+            name - str of the asset's path when it was packed.
+        """
+        offset, size, _ = self._index[name]
+        start = self._data + offset
+        return memoryview(self._map)[start:start + size]
+
+
+@lru_cache(1)
+def _asset_pack():
+    if not os.path.exists(PACK_PATH):
+        return None
+    try:
+        return AssetPack(PACK_PATH)
+    except ValueError as e:
+        warnings.warn(f"Not using the asset pack: {e}")
+        return None
+
+
+def asset_pack():
+    """Get the AssetPack at PACK_PATH, or None if it has not been built.
+
+    Safe to call from several threads; the pack is only opened once.
+    """
+    with _PACK_LOCK:
+        return _asset_pack()
+
+
+def exists(path):
+    """Return True if the asset at path is in the pack or on disk.
+
+    Parameters:
+        path - str path of the asset, e.g. "assets/img/arrow.png".
+    """
+    pack = asset_pack()
+    if pack is not None and path in pack:
+        return True
+    return os.path.exists(path)
+
+
+def open_asset(path):
+    """Open an asset for reading in binary mode.
+
+    Assets come from the pack when it has a current copy, see
+    `AssetPack.current`, so no file is opened, though each is checked with
+    a stat. Ones missing from the pack or changed since it was built are
+    read from disk, so a stale pack is slow, not broken.
+
+    Parameters:
+        path - str path of the asset, e.g. "assets/img/arrow.png".
+
+    Returns:
+        Binary file object.
+    """
+    pack = asset_pack()
+    if pack is not None and path in pack and pack.current(path):
+        return io.BytesIO(pack.read(path))
+    return open(path, 'rb')
+
+
+def load_json(path):
+    """Load a JSON asset, from the pack if possible."""
+    with open_asset(path) as f:
+        return json.load(f)
+
+
+def load_image(path):
+    """Load an image asset as a pygame Surface, from the pack if possible."""
+    import pygame
+
+    with open_asset(path) as f:
+        return pygame.image.load(f, path)
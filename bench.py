@@ -0,0 +1,245 @@
+"""Benchmark the board's render paths.
+
+    SDL_VIDEODRIVER=dummy python bench.py
+    SDL_VIDEODRIVER=dummy python bench.py full_hand attack_roll --frames 300
+
+Each scenario sets up a board and draws it frame after frame through the
+same methods the game uses. Every scenario runs twice: once for frame times,
+and once under tracemalloc for Python memory allocated per frame, since
+tracing slows everything down. Both runs count the Surfaces created, the
+smoothscale calls and the lines of text rasterized in each frame.
+
+This file should not be imported.
+"""
+
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+import pygame
+
+import ui
+import pkmn
+import board
+import frontend
+from animation import ANIMATOR
+
+SIZE = (1000, 800)
+DECK = "decks/brightsdeck.json"
+
+SCENARIOS = {}
+scenario = lambda f: SCENARIOS.setdefault(f.__name__, f)
+
+
+class FrameStats:
+
+    def __init__(self):
+        """Collect per-frame measurements between calls to `frame`."""
+        self.times = []
+        self.surfaces = 0
+        self.smoothscales = 0
+        self.text_renders = 0
+        self.py_bytes = []
+        self._last = None
+        self._text_misses = 0
+        self._py_start = 0
+
+    def start(self):
+        """Begin timing the first frame."""
+        self._text_misses = ui.render_line.cache_info().misses
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._py_start = tracemalloc.get_traced_memory()[0]
+        self._last = time.perf_counter()
+
+    def frame(self, *_):
+        """Finish timing one frame and begin timing the next."""
+        now = time.perf_counter()
+        self.times.append(now - self._last)
+        misses = ui.render_line.cache_info().misses
+        self.text_renders += misses - self._text_misses
+        self._text_misses = misses
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            self.py_bytes.append(peak - self._py_start)
+            tracemalloc.reset_peak()
+            self._py_start = tracemalloc.get_traced_memory()[0]
+        self._last = time.perf_counter()
+
+
+def _counting(stats, name, f):
+    """Wrap f so each call adds one to the given counter of stats."""
+    def wrapper(*args, **kwargs):
+        setattr(stats, name, getattr(stats, name) + 1)
+        return f(*args, **kwargs)
+    return wrapper
+
+
+def _instrument(stats):
+    """Count Surface-creating pygame calls into stats.
+
+    Returns a function that undoes the instrumentation.
+    """
+    originals = {
+        (pygame, "Surface"): pygame.Surface,
+        (pygame.transform, "smoothscale"): pygame.transform.smoothscale,
+        (pygame.transform, "scale"): pygame.transform.scale,
+        (pygame.transform, "rotate"): pygame.transform.rotate,
+    }
+    for (module, attr), f in originals.items():
+        setattr(module, attr, _counting(stats, "surfaces", f))
+    pygame.transform.smoothscale = _counting(
+        stats, "smoothscales", pygame.transform.smoothscale)
+
+    def restore():
+        for (module, attr), f in originals.items():
+            setattr(module, attr, f)
+    return restore
+
+
+def _players():
+    """Create two players from DECK, laid out for SIZE."""
+    with open(DECK, 'r', encoding='utf-8') as f:
+        d = json.load(f)
+    pkmn.init()
+    players = board.Player.from_deck_dict(d), board.Player.from_deck_dict(d)
+    for player in players:
+        player.set_dimensions(SIZE)
+    pkmn.wait_for_images()
+    return players
+
+
+def _take(player, placement, n):
+    """Remove n cards of the given placement from the player's deck."""
+    cards = [card for card in player.deck if card.placement() == placement]
+    cards = cards[:n]
+    player.deck = [card for card in player.deck if card not in cards]
+    return cards
+
+
+@scenario
+def full_hand(screen, frames, stats):
+    """Twelve cards in hand, with the hover moving across them."""
+    p1, p2 = _players()
+    p1.hand.extend(p1.draw(12))
+    opposing_ss = p2.get_opposing_snapshot(SIZE)
+    hits = ui.HitIndex()
+    stats.start()
+    for i in range(frames):
+        hits.clear()
+        screen.fill(board.BACKGROUND)
+        screen.blit(opposing_ss, (0, 0))
+        p1.render(screen, hits)
+        p1.render_hand(screen, i % len(p1.hand), hits)
+        stats.frame()
+
+
+@scenario
+def evolved_front_line(screen, frames, stats):
+    """Four evolved units a side, each with eight energies, taking damage."""
+    p1, p2 = _players()
+    for player in (p1, p2):
+        for i, card in enumerate(_take(player, "evolved", 4)):
+            card.add_energy({"water": 4, "psychic": 4})
+            player.front_line[i] = card
+    stats.start()
+    for i in range(frames):
+        if i % 10 == 0:
+            p2.front_line[i // 10 % 4].take_damage(10)
+            opposing_ss = p2.get_opposing_snapshot(SIZE)
+        screen.fill(board.BACKGROUND)
+        screen.blit(opposing_ss, (0, 0))
+        p1.render(screen)
+        p1.render_hand(screen)
+        stats.frame()
+
+
+@scenario
+def resizes(screen, frames, stats):
+    """The window being dragged between sizes, one relayout every frame."""
+    p1, p2 = _players()
+    p1.hand.extend(p1.draw(6))
+    p2.hand.extend(p2.draw(6))
+    for player in (p1, p2):
+        for i, card in enumerate(_take(player, "basic", 3)):
+            card.add_energy({"water": 2})
+            player.front_line[i] = card
+    sizes = [(1000 + 8 * i, 800 + 6 * i) for i in range(20)]
+    surfaces = {size: pygame.Surface(size) for size in sizes}
+    stats.start()
+    for i in range(frames):
+        size = sizes[i % len(sizes)]
+        screen = surfaces[size]
+        p1.set_dimensions(size)
+        p2.set_dimensions(size)
+        screen.fill(board.BACKGROUND)
+        screen.blit(p2.get_opposing_snapshot(size), (0, 0))
+        p1.render(screen)
+        p1.render_hand(screen)
+        stats.frame()
+
+
+@scenario
+def attack_roll(screen, frames, stats):
+    """The d10 roll in receive_attack, run back to back."""
+    p1, p2 = _players()
+    fe = frontend.ScriptedFrontend([[]] * frames, stats.frame)
+    frontend.use(fe)
+    screen = fe.open(SIZE)
+    stats.start()
+    try:
+        while True:
+            p2.receive_attack(screen, lambda event: None, 100, p1, None)
+            p1.prize_cards.extend(p1.hand)
+            p1.hand = []
+    except frontend.ScriptFinished:
+        pass
+
+
+def run(name, frames, trace):
+    """Run one scenario, returning its FrameStats."""
+    random.seed(0)
+    ANIMATOR.speed = 1.0
+    ANIMATOR.fast_forward = False
+    stats = FrameStats()
+    restore = _instrument(stats)
+    if trace:
+        tracemalloc.start()
+    try:
+        SCENARIOS[name](pygame.Surface(SIZE), frames, stats)
+    finally:
+        if trace:
+            tracemalloc.stop()
+        restore()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--frames", type=int, default=200,
+                        help="frames per scenario (default: 200)")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<20}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+          f"{'surf/f':>8}{'smooth/f':>9}{'text/f':>8}{'KiB/f':>8}")
+    for name in args.scenarios:
+        timed = run(name, args.frames, trace=False)
+        traced = run(name, args.frames, trace=True)
+
+        ordered = sorted(timed.times)
+        n = len(ordered)
+        p = lambda q: 1000 * ordered[min(n - 1, int(q * n))]
+        kib = sum(traced.py_bytes) / len(traced.py_bytes) / 1024
+        print(f"{name:<20}{p(0.5):>8.2f}{p(0.95):>8.2f}{p(0.99):>8.2f}"
+              f"{1000 * ordered[-1]:>8.2f}{timed.surfaces / n:>8.2f}"
+              f"{timed.smoothscales / n:>9.2f}{timed.text_renders / n:>8.2f}"
+              f"{kib:>8.1f}")
+    print("Times are in ms per frame.")
+
+
+if __name__ == "__main__":
+    main()
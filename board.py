@@ -1,31 +1,203 @@
 import sys
 import random
+import weakref
+from functools import lru_cache
 
 import pygame
-pygame.init()
 
 import pkmn
-from ui import TextBox, Button
+import bots
+import engine
+import assetpack
+import frontend
+from animation import Animation, ANIMATOR
+from ui import HitIndex, text_panel
+from ui import Scene, Area, ImageView, TextView, CardView
 
 BACKGROUND = (234, 242, 239)
 
-class Player:
+RESIZE_DELAY = 150  # ms to wait after the last resize event before relayout
+
+ROLL_DURATION = 2500    # ms the d10 spends rolling, at normal speed
+ROLL_CHANGES = 40       # times the d10 changes number while rolling
+ROLL_HOLD = 1000        # ms the final roll stays on screen
+
+MEMORY_KEY = pygame.K_F12   # prints what images and caches hold, see memory
+
+# every opponent snapshot still in use, so `memory` can measure them
+_SNAPSHOTS = weakref.WeakSet()
+
+WAKE_UP_TEXT = ("Wake up\n\nAttempt to wake up this Pokemon, removing its"
+                " 'asleep' affliction. Has a 50% chance of success.")
+MOVE_TEXT = ("Move\n\nMove this Pokemon to an open space.\n\nThis action"
+             " cannot be taken two turns in a row.")
+RETREAT_TEXT = ("Retreat\n\nMove this Pokemon to an open space or switch it"
+                " with another active Pokemon.")
+
+
+@lru_cache(None)
+def relayout_event():
+    """Get the event type that relayouts the board once resizing stops.
+
+    It's allocated on first use rather than at import, which would make
+    importing this module register an event type with pygame.
+    """
+    return pygame.event.custom_type()
+
+
+def action_options(card):
+    """Get the text of each action a front line Pokemon can take, in order.
+
+    Wake up if it's asleep, otherwise move, retreat, then each of its moves.
+    """
+    if card.affliction() == "asleep":
+        return (WAKE_UP_TEXT,)
+    return (MOVE_TEXT, RETREAT_TEXT, *card.move_texts())
+
+
+def draw_state(screen, state):
+    """Draw the board as a game state dict describes it, see `protocol`.
+
+    The side of the seat it was made for is drawn at the bottom, or the
+    side that went first for a spectator's. Nothing but the dict is read,
+    so this can draw on one thread while the game is played on another.
+
+    Parameters:
+
+        screen - pygame.Surface to draw onto.
+
+        state  - dict from `engine.Game.state`.
+    """
+    bottom = 0 if state["seat"] is None else state["seat"]
+    size = screen.get_size()
+    you, opponent = Player([]), Player([])
+    for player, seat in ((you, bottom), (opponent, 1 - bottom)):
+        player.load_state(state["sides"][seat])
+        player.set_dimensions(size)
+    screen.blit(you._field_image(size, opponent), (0, 0))
+
+
+class Layout:
+
+    def __init__(self, size):
+        """Compute where everything on the board goes for one screen size.
+
+        Parameters:
+            size - (width, height) of entire screen.
+        
+        All rects are (x, y, w, h) and are laid out for the player at the
+        bottom of the screen. The opponent's side is the same, rotated 180
+        degrees.
+        """
+        self.size = size
+        W, H = size
+        if W / H > 1.3:
+            W = H * 1.3
+        elif H > W:
+            H = W
+        self.card_h = H * 4 // 18
+        self.kern_h = H * 0.4 // 18
+        self.card_w = W * 3 // 22
+        self.kern_w = W * 0.4 // 22
+
+        self.center = (size[0] // 2, size[1] // 2)
+        cx, cy = self.center
+        card_w, card_h = self.card_w, self.card_h
+        kern_w, kern_h = self.kern_w, self.kern_h
+
+        # deck and discard pile
+        deck_x = cx + 2 * card_w + int(2.5 * kern_w)
+        deck_y = cy + kern_h // 2
+        self.deck_rect = (deck_x, deck_y, card_w, card_h)
+        self.discard_rect = (deck_x, deck_y + card_h + kern_h, card_w, card_h)
+
+        # front line
+        self.fl_x = cx - int(1.5 * kern_w) - 2 * card_w
+        self.fl_y = cy + kern_h
+        self.fl_gap = card_w + kern_w
+        self.front_line_rects = [
+            (self.fl_x + i * self.fl_gap, self.fl_y, card_w, card_h)
+            for i in range(4)
+        ]
+        self.opponent_front_line_rects = [
+            (size[0] - x - w, size[1] - y - h, w, h)
+            for x, y, w, h in self.front_line_rects
+        ]
+
+        # prize cards, stacked downwards
+        self.pc_x = cx - 3 * card_w - int(2.5 * kern_w)
+        self.pc_y = deck_y + kern_h
+        self.pc_gap = 3 * kern_h
+
+        # hand
+        self.hand_y = cy + int(1.5 * card_h)
+        self.max_hand_width = 4 * card_w + 3 * kern_w
+
+        # card being focused on, given by its center
+        self.focus_rect = (cx, cy // 2, cy, cy)
+
+        # help text along the top or bottom edge
+        screen_w, screen_h = size
+        if screen_w > screen_h:
+            text_l = screen_h
+            text_x = (screen_w - text_l) // 2
+        else:
+            text_l = screen_w
+            text_x = 0
+        self.help_top_rect = (text_x, 0, text_l, text_l // 5)
+        self.help_bottom_rect = (text_x, screen_h - (text_l // 5), text_l,
+                                 text_l // 5)
+
+        # action panel and its buttons
+        if screen_w > screen_h:
+            length = screen_h
+            x = (screen_w - length) // 2
+            y = screen_h // 2
+            button_y = screen_h
+        else:
+            length = screen_w
+            x = 0
+            y = screen_h // 2
+            button_y = y + length // 2
+        button_l = length // 15
+        self.panel_rect = (x, y, length, length // 2)
+        self.l_button_rect = (x, button_y - button_l, button_l, button_l)
+        self.r_button_rect = (x + length - button_l, button_y - button_l,
+                              button_l, button_l)
+        self.ok_button_rect = (x + (length - button_l) // 2,
+                               button_y - button_l, button_l, button_l)
+
+        # d10 roll
+        roll_w, roll_h = 100, 80
+        self.roll_rect = (cx - (roll_w // 2), cy - (roll_h // 2), roll_w,
+                          roll_h)
+
+    def help_rect(self, on_top):
+        """Get the rect of a help text box at the top or bottom edge."""
+        return self.help_top_rect if on_top else self.help_bottom_rect
+
+
+@lru_cache(8)
+def get_layout(size):
+    """Get the Layout for a screen size, computing it only once per size."""
+    return Layout(size)
+
+
+class Player(engine.Side):
 
     def __init__(self, deck):
         """Create an instance of a Player.
 
+        A Side with screens: actions and the choices moves ask for are made
+        by clicking, and attacks on an empty slot roll the d10 on screen.
+
         Parameters:
 
             deck - list of Card objects.
         """
-        self.deck = deck
-        self.shuffle()
-        self.prize_cards = self.draw(round(len(deck)/10))
-        self.hand = []
-        self.discard_pile = []
-        self.front_line = [None, None, None, None]
-
-        self._deck_card = pkmn.Card.cardback()
+        super().__init__(deck)
+        self._deck_card = pkmn.shared_cardback()
+        self._prerendered = None    # panel size and species last prerendered
     
     @staticmethod
     def from_deck_dict(d):
@@ -34,27 +206,49 @@ class Player:
         Parameters:
             d - dict with attributes "name", "energy", "pokemon"
         """
-        deck = []
-        for name in d['pokemon']:
-            p = pkmn.Pokemon.from_id(name)
-            for _ in range(d['pokemon'][name]):
-                deck.append(p.build_unit())
-        for energy in d['energy']:
-            for _ in range(d['energy'][energy]):
-                deck.append(pkmn.Energy(energy))
-        return Player(deck)
-    
-    def _focus_on(self, screen, card):
-        """Display the given Card as big as possible on the top half."""
-        card.render(screen,
-                    (
-                        self._center[0],
-                        self._center[1] // 2,
-                        self._center[1],
-                        self._center[1]
-                    ),
-                    centered=True)
+        return Player(engine.deck_from_dict(d))
     
+    def _prerender_action_panels(self):
+        """Draw the action panel of every front line Pokemon ahead of time.
+
+        Panels are cached by text and size, so they are drawn once per
+        species and layout, and opening or cycling the action menu is a blit.
+        Nothing is drawn unless the layout or the species on the front line
+        changed since the last call.
+        """
+        size = tuple(self._layout.panel_rect[2:])
+        cards = [card for card in self.front_line if card is not None]
+        key = size, frozenset(card.card_id() for card in cards)
+        if key == self._prerendered:
+            return
+        self._prerendered = key
+        for card in cards:
+            # every option, so a Pokemon falling asleep needs no new panel
+            for text in (WAKE_UP_TEXT, MOVE_TEXT, RETREAT_TEXT,
+                         *card.move_texts()):
+                # as `TextView` asks for it, so its draws are hits
+                text_panel(text, size, True, False)
+
+    def _add_hits(self, hits):
+        """Register the deck, front line slots and hand cards in a HitIndex.
+
+        They're registered where `render` and `render_hand` draw them, so
+        clicks can be taken before the first frame is drawn.
+
+        Parameters:
+            hits - HitIndex to register them in.
+        """
+        layout = self._layout
+        hits.add(pkmn.fit_within(layout.deck_rect, pkmn.CARD_SIZE),
+                 ("deck", None))
+        for i, rect in enumerate(layout.front_line_rects):
+            hits.add(rect, ("front_line", i))
+        hand_x, hand_gap, hand_y = self._get_hand_coords()
+        for i in range(len(self.hand)):
+            hits.add((hand_x, hand_y, layout.card_w, layout.card_h),
+                     ("hand", i))
+            hand_x += hand_gap
+
     def _get_hand_coords(self):
         """Generate coordinates for drawing cards in hand.
 
@@ -64,152 +258,108 @@ class Player:
             hand_gap   - Horizontal distance between card starts.
             hand_y     - y-position of all cards.
         """
+        layout = self._layout
         if len(self.hand) > 4:
-            hand_width = 4 * self._card_w + 3 * self._kern_w
-            hand_start = self._center[0] - (hand_width // 2)
-            hand_gap = (hand_width - self._card_w) / (len(self.hand) - 1)
+            hand_width = layout.max_hand_width
+            hand_start = layout.center[0] - (hand_width // 2)
+            hand_gap = (hand_width - layout.card_w) / (len(self.hand) - 1)
         else:
-            hand_width = len(self.hand) * self._card_w
-            hand_start = self._center[0] - (hand_width // 2)
-            hand_gap = self._card_w
-
-        hand_y = self._center[1] + int(1.5 * self._card_h)
+            hand_width = len(self.hand) * layout.card_w
+            hand_start = layout.center[0] - (hand_width // 2)
+            hand_gap = layout.card_w
 
-        return hand_start, hand_gap, hand_y
+        return hand_start, hand_gap, layout.hand_y
     
-    def _on_hand_loc(self, screen, mouse_pos):
-        """Return True if the mouse cursor is on the user's hand."""
-        hand_start, _, hand_y = self._get_hand_coords()
-        return mouse_pos[0] >= hand_start and \
-               mouse_pos[0] <= screen.get_width() - hand_start and \
-               mouse_pos[1] > hand_y
-    
-    def _selected_from_hand(self, hand_start, hand_gap, mouse_pos):
-        """Decide which card in the hand is currently selected.
-        
+    def _field_scene(self, slots, card, help_text, text_on_top):
+        """Declare the widgets of a front line selection screen.
+
         Parameters:
 
-            hand_start - x position of left-most card in hand.
+            slots       - str name of the Layout attribute listing the rects
+                          of the slots to choose from. Each gets an Area whose
+                          value is its index.
 
-            hand_gap   - Horizontal distance between cards.
+            card        - Card to show large on the top half, or None.
 
-            mouse_pos  - (x, y) of mouse cursor.
-        """
-        selected = int((mouse_pos[0] - hand_start) // hand_gap)
-        if selected < 0:
-            selected = 0
-        elif selected >= len(self.hand):
-            selected = len(self.hand) - 1
-        return selected
-    
-    def _selected_from_front_line(self, mouse_pos):
-        """Decide which card in the front line is current selected.
-        
-        Paramters:
-            mouse_pos - (x, y) of mouse cursor.
-        """
-        fl_x = self._center[0] - int(1.5 * self._kern_w) - 2 * self._card_w
-        fl_y = self._center[1] + self._kern_h
-        fl_gap = self._card_w + self._kern_w
+            help_text   - str of instructions to show, or None.
 
-        x, y = mouse_pos
-        if y < fl_y or y > fl_y + self._card_h:
-            return None
+            text_on_top - If True, the instructions go at the top.
+        """
+        scene = Scene()
+        if card:
+            scene.add(CardView(card, lambda size: get_layout(size).focus_rect))
+        for i in range(len(self.front_line)):
+            scene.add(Area(lambda size, i=i:
+                           getattr(get_layout(size), slots)[i], i))
+        if help_text:
+            scene.add(TextView(help_text,
+                               lambda size: get_layout(size).help_rect(
+                                   text_on_top),
+                               do_title=False))
+        return scene
 
-        selected = int((x - fl_x) // fl_gap)
-        if 0 <= selected and selected < len(self.front_line):
-            return selected
-        
-        return None
-    
-    def _card_to_front_line(self, card, position):
-        """Place a card on the front line, either playing, evolving, or adding.
+    def _field_image(self, size, opponent):
+        """Draw both sides of the board, with this player at the bottom.
 
         Parameters:
 
-            card - Card object to be put on the front line.
+            size     - (w, h) of the screen.
 
-            position - int between 0 and len(front line)-1.
+            opponent - Player drawn upside down at the top.
         """
-        placement = card.placement()
-        if placement == "basic":
-            self.front_line[position] = card
-        elif placement == "evolved":
-            self.front_line[position].evolve_into(card)
-            self.front_line[position] = card
-        elif placement == "energy":
-            self.front_line[position].attach(card)
-            self.front_line[position].add_energy(card)
-    
-    def _discard_front_line(self, i):
-        """Discard the card at the given spot of the front line, with attached.
-        
+        surface = opponent.get_opposing_snapshot(size)
+        self.render(surface)
+        return surface
+
+    def _select_area(self, screen, check_event, background, scene, valid):
+        """Show a scene until one of its Areas with a valid value is clicked.
+
         Parameters:
-            i - Index of card in front line.
-        """
-        card = self.front_line[i]
-        stowaways = card.detach()
-        self.discard_pile.extend(stowaways)
-        self.discard_pile.append(card)
-        self.front_line[i] = None
-    
-    def front_line_screen(self, screen, check_event, opponent, valid,
-                          card=None, help_text=None, text_on_top=False):
-        """Let the user selected one of the front line slots.
-        
-        Returns the index of the slot selected, or None if bailed out.
-        """
-        if help_text:
-            textbox = TextBox(help_text)
-            screen_w, screen_h = screen.get_size()
-            if screen_w > screen_h:
-                text_l = screen_h
-                text_x = (screen_w - text_l) // 2
-            else:
-                text_l = screen_w
-                text_x = 0
-            if text_on_top:
-                text_y = 0
-            else:
-                text_y = screen_h - (text_l // 5)
 
-        opposing_ss = opponent.get_opposing_snapshot(screen.get_size())
+            background - Function taking the (w, h) of the screen and
+                         returning the Surface to draw the scene over.
+
+            scene      - Scene to show.
+
+            valid      - Values of the Areas that can be selected.
+
+        Returns the value of the Area clicked, or None if bailed out.
+        """
+        fe = frontend.current()
+        loaded = pkmn.images_loaded()
+        scene.set_background(background(screen.get_size()))
         while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
+            if pkmn.images_loaded() != loaded:
+                # redraw the board now its cards have real pictures
+                loaded = pkmn.images_loaded()
+                scene.set_background(background(screen.get_size()))
+
+            mouse_pos = fe.mouse_pos()
+            for event in fe.events():
                 if check_event(event) == pygame.VIDEORESIZE:
-                    opposing_ss = opponent.get_opposing_snapshot(
-                        screen.get_size())
-                    if help_text:
-                        screen_w, screen_h = screen.get_size()
-                        if screen_w > screen_h:
-                            text_l = screen_h
-                            text_x = (screen_w - text_l) // 2
-                        else:
-                            text_l = screen_w
-                            text_x = 0
-                        if text_on_top:
-                            text_y = 0
-                        else:
-                            text_y = screen_h - (text_l // 5)
+                    screen = fe.screen()
+                    scene.set_background(background(screen.get_size()))
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         return None
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    selected = self._selected_from_front_line(mouse_pos)
-                    if selected is not None and selected in valid:
-                        return selected
-
-                screen.fill(BACKGROUND)
-                screen.blit(opposing_ss, (0, 0))
-                self.render(screen)
-                if card:
-                    self._focus_on(screen, card)
-                if help_text:
-                    textbox.render(screen, (text_x, text_y, text_l, text_l//5),
-                                   do_title=False)
-                pygame.display.flip()
-                pygame.time.Clock().tick(30)
+                    target = scene.hit(mouse_pos)
+                    if isinstance(target, Area) and target.value in valid:
+                        return target.value
+
+            fe.present(screen, scene.render(screen))
+
+    def front_line_screen(self, screen, check_event, opponent, valid,
+                          card=None, help_text=None, text_on_top=False):
+        """Let the user selected one of the front line slots.
+        
+        Returns the index of the slot selected, or None if bailed out.
+        """
+        scene = self._field_scene("front_line_rects", card, help_text,
+                                  text_on_top)
+        return self._select_area(
+            screen, check_event,
+            lambda size: self._field_image(size, opponent), scene, valid)
 
     def front_line_opponent(self, screen, check_event, opponent, valid,
                             card=None, help_text=None, text_on_top=False):
@@ -217,85 +367,26 @@ class Player:
         
         Returns the index of the slot selected, or None if bailed out.
         """
-        if help_text:
-            textbox = TextBox(help_text)
-            screen_w, screen_h = screen.get_size()
-            if screen_w > screen_h:
-                text_l = screen_h
-                text_x = (screen_w - text_l) // 2
-            else:
-                text_l = screen_w
-                text_x = 0
-            if text_on_top:
-                text_y = 0
-            else:
-                text_y = screen_h - (text_l // 5)
-        
-        opposing_ss = opponent.get_opposing_snapshot(screen.get_size())
-        while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if check_event(event) == pygame.VIDEORESIZE:
-                    opposing_ss = opponent.get_opposing_snapshot(
-                        screen.get_size())
-                    if help_text:
-                        screen_w, screen_h = screen.get_size()
-                        if screen_w > screen_h:
-                            text_l = screen_h
-                            text_x = (screen_w - text_l) // 2
-                        else:
-                            text_l = screen_w
-                            text_x = 0
-                        if text_on_top:
-                            text_y = 0
-                        else:
-                            text_y = screen_h - (text_l // 5)
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        return None
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    selected = self._selected_from_front_line(
-                        (screen.get_width()-mouse_pos[0],
-                        screen.get_height()-mouse_pos[1])
-                    )
-                    if selected is not None and selected in valid:
-                        return selected
-
-                screen.fill(BACKGROUND)
-                screen.blit(opposing_ss, (0, 0))
-                self.render(screen)
-                if card:
-                    self._focus_on(screen, card)
-                if help_text:
-                    textbox.render(screen, (text_x, text_y, text_l, text_l//5),
-                                   do_title=False)
-                pygame.display.flip()
-                pygame.time.Clock().tick(30)
+        scene = self._field_scene("opponent_front_line_rects", card,
+                                  help_text, text_on_top)
+        return self._select_area(
+            screen, check_event,
+            lambda size: self._field_image(size, opponent), scene, valid)
     
-    def _place_card(self, screen, check_event, opponent, card):
-        """Place the provided card somewhere on the frontline.
+    def _place_card(self, screen, check_event, opponent, hand_index):
+        """Place a card from the hand somewhere on the frontline.
 
         Parameters:
 
-            screen - Pygame Surface to draw on.
+            screen     - Pygame Surface to draw on.
 
-            card   - Card object to place.
+            hand_index - int of the card's position in the hand.
         
         Returns:
             True if card was successfully placed, False otherwise.
         """
-        placement = card.placement()
-        if placement == "basic":
-            valid = [i for i in range(4) if self.front_line[i] is None]
-        elif placement == "evolved":
-            valid = [i for i in range(4) 
-                        if self.front_line[i] and 
-                           card.evolves_from(self.front_line[i])]
-        elif placement == "energy":
-            valid = [i for i in range(4) if self.front_line[i]]
-        else:
-            return False
-        
+        card = self.hand[hand_index]
+        valid = self.placements(card)
         if not valid:
             return False
 
@@ -303,8 +394,7 @@ class Player:
                                           card)
         if selected is None:
             return False
-        self._card_to_front_line(card, selected)
-        return True
+        return self.act(("play", hand_index, selected), opponent)
     
     def _pkmn_action(self, screen, check_event, opponent, fl_space):
         """Choose between attack, move, or retreat for the selected Pokemon.
@@ -314,163 +404,100 @@ class Player:
         
         Returns True if successfully executed, False otherwise.
         """
-        opposing_ss = opponent.get_opposing_snapshot(screen.get_size())
         card = self.front_line[fl_space]
-
-        if card.affliction() == "asleep":
-            options = ["Wake up\n\nAttempt to wake up this Pokemon, removing"
-                       " its 'asleep' affliction. Has a 50% chance of success."
-                       ]
-        else:
-            options = [
-                "Move\n\nMove this Pokemon to an open space.\n\nThis action"
-                " cannot be taken two turns in a row.",
-                "Retreat\n\nMove this Pokemon to an open space or switch it"
-                " with another active Pokemon."
-            ]
-            options.extend(card.move_texts())
-
+        options = action_options(card)
         current = 0
-        textbox = TextBox(options[0])
 
         def r_click():
             nonlocal current
             current += 1
             current = current % len(options)
-            textbox.set_text(options[current])
+            panel.set_text(options[current])
         
         def l_click():
             nonlocal current
             current -= 1
             current = current % len(options)
-            textbox.set_text(options[current])
+            panel.set_text(options[current])
         
         def ok_click():
-            nonlocal current
-
             if card.affliction() == "asleep":   # WAKE UP
-                if random.randint(0, 1):
-                    card.afflict(None)
-                return True
-
-            elif current == 0:  # MOVE
-                valid = [i for i in range(len(self.front_line))
-                            if self.front_line[i] is None]
+                return self.act(("wake", fl_space), opponent)
+
+            elif current in (0, 1):             # MOVE or RETREAT
+                kind = "move" if current == 0 else "retreat"
+                if kind == "move":
+                    valid = self.move_targets(fl_space)
+                else:
+                    valid = self.retreat_targets(fl_space)
                 if not valid:
                     return False
                 selected = self.front_line_screen(screen, check_event,
                                                    opponent, valid, card)
                 if selected is None:
                     return False
-                self.front_line[fl_space], self.front_line[selected] = \
-                    self.front_line[selected], self.front_line[fl_space]
-                return True
-            
-            elif current == 1:  # RETREAT
-                if not card.sufficient_energy(card.retreat_energy()):
-                    return False
-                cost = card.retreat_cost()
-                valid = [i for i in range(len(self.front_line)) if
-                            self.front_line[i] is None or
-                            self.front_line[i].retreat_cost() <= cost]
-                if not valid:
-                    return False
-                selected = self.front_line_screen(screen, check_event,
-                                                   opponent, card, valid)
-                if selected is None:
-                    return False
-                self.front_line[fl_space], self.front_line[selected] = \
-                    self.front_line[selected], self.front_line[fl_space]
-                to_hand = card.discard_energy(card.retreat_energy())
-                self.hand.extend(to_hand)
-                return True
+                return self.act((kind, fl_space, selected), opponent)
             
-            else:               # ATTACK
-                move_id = current - 2
-                if not card.can_use_move(move_id):
-                    return False
-                target = opponent.opposite_space(fl_space)
-                to_hand = card.attack(move_id, target, self, opponent,
-                                      fl_space, screen, check_event)
-                self.hand.extend(to_hand)
-                opponent.remove_fainted()
-                self.remove_fainted()
-                return True
-
-        arrow_img = pygame.image.load("assets/img/arrow.png")
-        use_img = pygame.image.load("assets/img/use_button.png")
-
-        r_button = Button(arrow_img, r_click)
-        l_button = Button(pygame.transform.rotate(arrow_img, 180), l_click)
-        ok_button = Button(use_img)
-
-        screen_w, screen_h = screen.get_size()
-        if screen_w > screen_h:
-            length = screen_h
-            x = (screen_w - length) // 2
-            y = screen_h // 2
-            button_y = screen_h
-        else:
-            length = screen_w
-            x = 0
-            y = screen_h // 2
-            button_y = y + length // 2
-        button_l = length // 15
-
+            else:                               # ATTACK
+                return self.act(("attack", fl_space, current - 2), opponent,
+                                screen, check_event)
+
+        arrow_img = assetpack.load_image("assets/img/arrow.png")
+        use_img = assetpack.load_image("assets/img/use_button.png")
+
+        scene = Scene()
+        scene.add(CardView(card, lambda size: get_layout(size).focus_rect))
+        panel = scene.add(TextView(options[current],
+                                   lambda size: get_layout(size).panel_rect))
+        scene.add(ImageView(pygame.transform.rotate(arrow_img, 180),
+                            lambda size: get_layout(size).l_button_rect,
+                            l_click))
+        scene.add(ImageView(arrow_img,
+                            lambda size: get_layout(size).r_button_rect,
+                            r_click))
+        ok_button = scene.add(ImageView(
+            use_img, lambda size: get_layout(size).ok_button_rect))
+
+        fe = frontend.current()
+        loaded = pkmn.images_loaded()
+        scene.set_background(self._field_image(screen.get_size(), opponent))
         while True:
-            for event in pygame.event.get():
+            if pkmn.images_loaded() != loaded:
+                loaded = pkmn.images_loaded()
+                scene.set_background(
+                    self._field_image(screen.get_size(), opponent))
+
+            for event in fe.events():
                 if check_event(event) == pygame.VIDEORESIZE:
-                    opposing_ss = opponent.get_opposing_snapshot(
-                        screen.get_size())
-                    screen_w, screen_h = screen.get_size()
-                    if screen_w > screen_h:
-                        length = screen_h
-                        x = (screen_w - length) // 2
-                        y = screen_h // 2
-                        button_y = screen_h
-                    else:
-                        length = screen_w
-                        x = 0
-                        y = screen_h // 2
-                        button_y = y + length // 2
-                    button_l = length // 10
+                    screen = fe.screen()
+                    scene.set_background(
+                        self._field_image(screen.get_size(), opponent))
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         return False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-                    l_button.check_pressed(mouse_pos)
-                    r_button.check_pressed(mouse_pos)
-                    if ok_button.check_pressed(mouse_pos):
+                    target = scene.hit(fe.mouse_pos())
+                    if target is None:
+                        return False
+                    if target is ok_button:
                         if ok_click():
                             return True
-                    if not textbox.contains(mouse_pos):
-                        return False
-            
-            screen.fill(BACKGROUND)
-            screen.blit(opposing_ss, (0, 0))
-            self.render(screen)
-            self._focus_on(screen, card)
-            textbox.render(screen, (x, y, length, length // 2))
-            l_button.render(screen, (x, button_y-button_l, button_l, button_l))
-            r_button.render(screen,
-                            (
-                                x+length-button_l,
-                                button_y-button_l,
-                                button_l, button_l
-                            ))
-            ok_button.render(screen,
-                             (
-                                x+(length-button_l)//2,
-                                button_y-button_l,
-                                button_l, button_l
-                             ))
-            pygame.display.flip()
-            pygame.time.Clock().tick(30)
+
+                        # any screen ok_click opened drew over this one
+                        screen = fe.screen()
+                        scene.set_background(
+                            self._field_image(screen.get_size(), opponent))
+                    else:
+                        target.click()
+
+            fe.present(screen, scene.render(screen))
     
     def receive_attack(self, screen, check_event, damage, user, _):
         """Roll a d10, and if the result is less than damage, do prize card.
 
+        The roll plays out over a fixed time, scaled by `ANIMATOR.speed`, then
+        the game carries on by itself. Clicking skips ahead.
+
         Parameters:
 
             damage - Chance that this attack hits.
@@ -482,136 +509,114 @@ class Player:
         
         choices = [f"{str(i)}0" for i in range(10)]
         defense = "00"
-
-        roll_speed = 40
-        roll_count = 0
-        roll_peak = 30
-        roll_diff = 0.5
-
-        opposing_ss = self.get_opposing_snapshot(screen.get_size())
-
-        textbox = TextBox("\n" + defense)
-        width = 100
-        height = 80
-        x, y = self._center[0] - (width // 2), self._center[1] - (height // 2)
-
+        changes = 0
+
+        scene = Scene()
+        textbox = scene.add(TextView("\n" + defense,
+                                     lambda size: get_layout(size).roll_rect,
+                                     centered=True))
+
+        def on_roll(elapsed):
+            """Change numbers quickly at first, slowing to a stop."""
+            nonlocal defense, changes
+            progress = elapsed / ROLL_DURATION
+            target = int(ROLL_CHANGES * (1 - (1 - progress) ** 2))
+            while changes < target:
+                defense = random.choice(choices)
+                changes += 1
+            textbox.set_text("\n" + defense)
+
+        roll = ANIMATOR.play(Animation(ROLL_DURATION, on_roll))
+        hold = None
+
+        fe = frontend.current()
+        loaded = pkmn.images_loaded()
+        scene.set_background(user._field_image(screen.get_size(), self))
         while True:
-            for event in pygame.event.get():
+            if pkmn.images_loaded() != loaded:
+                loaded = pkmn.images_loaded()
+                scene.set_background(
+                    user._field_image(screen.get_size(), self))
+
+            for event in fe.events():
                 if check_event(event) == pygame.VIDEORESIZE:
-                    opposing_ss = self.get_opposing(screen.get_size())
-                    x = self._center[0] - (width // 2)
-                    y = self._center[1] - (height // 2)
+                    screen = fe.screen()
+                    scene.set_background(
+                        user._field_image(screen.get_size(), self))
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if roll_speed <= 0:
-                        if int(defense) < damage:
-                            user.win_prize_card()
-                        return
+                    if not roll.done():
+                        ANIMATOR.skip(roll)
+                    elif hold is not None:
+                        ANIMATOR.skip(hold)
             
-            if roll_speed > 0:
-                roll_speed -= roll_diff
-                roll_count += roll_speed
-                if roll_count > roll_peak:
-                    roll_count = 0
-                    defense = random.choice(choices)
-                    textbox.set_text("\n" + defense)
-            
-            screen.fill(BACKGROUND)
-            screen.blit(opposing_ss, (0, 0))
-            user.render(screen)
-            textbox.render(screen, (x, y, width, height), centered=True)
-            pygame.display.flip()
-            pygame.time.Clock().tick(30)
+            ANIMATOR.update()
+            if roll.done() and hold is None:
+                hold = ANIMATOR.play(Animation(ROLL_HOLD))
+            if hold is not None and hold.done():
+                if int(defense) < damage:
+                    user.win_prize_card()
+                return
+
+            fe.present(screen, scene.render(screen))
     
     def choose_action(self, screen, check_event, opponent):
+        loaded = pkmn.images_loaded()
         opposing_ss = opponent.get_opposing_snapshot(screen.get_size())
+        self._prerender_action_panels()
+        hits = HitIndex()
+        self._add_hits(hits)
+        fe = frontend.current()
         while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
+            if pkmn.images_loaded() != loaded:
+                # retake the snapshot now its cards have real pictures
+                loaded = pkmn.images_loaded()
+                opposing_ss = opponent.get_opposing_snapshot(
+                    screen.get_size())
+
+            mouse_pos = fe.mouse_pos()
+            for event in fe.events():
                 if check_event(event) == pygame.VIDEORESIZE:
+                    screen = fe.screen()
                     opposing_ss = opponent.get_opposing_snapshot(
                         screen.get_size())
+                    self._prerender_action_panels()
+                    hits.clear()
+                    self._add_hits(hits)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
+                    kind, i = hits.hit(event.pos) or (None, None)
 
                     # ATTACK, MOVE, or RETREAT
-                    fl_space = self._selected_from_front_line(mouse_pos)
-                    if fl_space is not None and \
-                       self.front_line[fl_space] is not None:
-                        if self._pkmn_action(screen, check_event, opponent,
-                                          fl_space):
+                    if kind == "front_line" and \
+                       self.front_line[i] is not None:
+                        if self._pkmn_action(screen, check_event, opponent, i):
                             return
                         opposing_ss = opponent.get_opposing_snapshot(
                             screen.get_size())
 
                     # PLAY, EVOLVE, or ATTACH
-                    elif self._on_hand_loc(screen, mouse_pos):
-                        start, gap, _ = self._get_hand_coords()
-                        selected = self._selected_from_hand(start, gap,
-                                                            mouse_pos)
-                        if selected is None:
-                            continue
-                        card = self.hand[selected]
-                        if self._place_card(screen, check_event, opponent,
-                                            card):
-                            del self.hand[selected]
+                    elif kind == "hand":
+                        if self._place_card(screen, check_event, opponent, i):
                             return
                         opposing_ss = opponent.get_opposing_snapshot(
                             screen.get_size())
 
                     # DRAW
-                    elif self._deck_card.contains_point(mouse_pos):
-                        card = self.draw(1)
-                        self.hand.extend(card)
-                        opposing_ss = opponent.get_opposing_snapshot(
-                            screen.get_size())
+                    elif kind == "deck":
+                        self.act(("draw",), opponent)
                         return
 
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = fe.mouse_pos()
+            kind, i = hits.hit(mouse_pos) or (None, None)
+            hovered = i if kind == "hand" else None
+
+            hits.clear()
             screen.fill(BACKGROUND)
             screen.blit(opposing_ss, (0, 0))
-            self.render(screen)
-            self.render_hand(screen, mouse_pos)
-            pygame.display.flip()
-            pygame.time.Clock().tick(30)
+            self.render(screen, hits)
+            self.render_hand(screen, hovered, hits)
+            fe.present(screen)
 
     
-    def shuffle(self):
-        """Shuffle the player's deck."""
-        random.shuffle(self.deck)
-
-    def draw(self, num):
-        """Create a list of Card objects from drawn from the deck.
-
-        Parameters:
-
-            num - int representing number of cards to be drawn.
-        """
-        toret = self.deck[:num]
-        self.deck = self.deck[num:]
-        return toret
-    
-    def win_prize_card(self):
-        """Move the top prize card from its place to the hand."""
-        self.hand.append(self.prize_cards[0])
-        self.prize_cards = self.prize_cards[1:]
-    
-    def opposite_space(self, i):
-        """Return the card that opposes the unit at position i.
-
-        Parameters:
-            i - Position of other Player's Pokemon (0-4).
-        """
-        i = 3 - i
-        card = self.front_line[i]
-        if card is None:
-            return self
-        return card
-
-    def remove_fainted(self):
-        """Remove any Pokemon on the front line that have fainted."""
-        for i, card in enumerate(self.front_line):
-            if card and card.is_fainted():
-                self._discard_front_line(i)
-    
     def set_dimensions(self, size):
         """Fit the player's field to the given size.
 
@@ -619,50 +624,38 @@ class Player:
 
             size - (width, height) of entire screen.
         """
-        W, H = size
-        if W / H > 1.3:
-            W = H * 1.3
-        elif H > W:
-            H = W
-        self._card_h = H * 4 // 18
-        self._kern_h = H * 0.4 // 18
-        self._card_w = W * 3 // 22
-        self._kern_w = W * 0.4 // 22
-
-        self._center = (size[0] // 2, size[1] // 2)
+        self._layout = get_layout(tuple(size))
     
-    def render(self, screen):
+    def render(self, screen, hits=None):
         """Render this player's field onto the screen.
 
         Parameters:
 
             screen    - pygame.Surface to draw onto.
-        """
-        deck_x = self._center[0] + 2 * self._card_w + int(2.5 * self._kern_w)
-        deck_y = self._center[1] + self._kern_h // 2
-        discard_y = deck_y + self._card_h + self._kern_h
 
-        fl_x = self._center[0] - int(1.5 * self._kern_w) - 2 * self._card_w
-        fl_y = self._center[1] + self._kern_h
-
-        pc_x = self._center[0] - 3 * self._card_w - int(2.5 * self._kern_w)
-        pc_y = deck_y + self._kern_h
+            hits      - HitIndex to register the deck and front line slots
+                        in, if given.
+        """
+        layout = self._layout
+        card_w, card_h = layout.card_w, layout.card_h
 
-        self._deck_card.render(screen,
-            (deck_x, deck_y, self._card_w, self._card_h))
-        pkmn.CARDBACK.render(screen,
-            (deck_x, discard_y, self._card_w, self._card_h))
+        self._deck_card.render(screen, layout.deck_rect)
+        pkmn.shared_cardback().render(screen, layout.discard_rect)
         
-        for card in self.front_line:
+        for card, rect in zip(self.front_line, layout.front_line_rects):
             if card:
-                card.render_with_energy(screen,
-                    (fl_x, fl_y, self._card_w, self._card_h))
-            fl_x += self._card_w + self._kern_w
+                card.render_with_energy(screen, rect)
+
+        if hits is not None:
+            hits.add(self._deck_card.rect(), ("deck", None))
+            for i, rect in enumerate(layout.front_line_rects):
+                hits.add(rect, ("front_line", i))
         
+        pc_y = layout.pc_y
         for card in self.prize_cards:
-            pkmn.CARDBACK.render(screen, 
-                                 (pc_x, pc_y, self._card_w, self._card_h))
-            pc_y += 3 * self._kern_h
+            pkmn.shared_cardback().render(
+                screen, (layout.pc_x, pc_y, card_w, card_h))
+            pc_y += layout.pc_gap
     
     def get_opposing_snapshot(self, size):
         """Create a pygame.Surface image of this player as the opponent."""
@@ -672,68 +665,283 @@ class Player:
 
         hand_start, hand_gap, hand_y = self._get_hand_coords()
 
+        card_w, card_h = self._layout.card_w, self._layout.card_h
         for _ in self.hand:
-            pkmn.CARDBACK.render(surface,
-                                 (hand_start, hand_y,
-                                  self._card_w, self._card_h))
+            pkmn.shared_cardback().render(
+                surface, (hand_start, hand_y, card_w, card_h))
             hand_start += hand_gap
         
-        return pygame.transform.rotate(surface, 180)
+        snapshot = pygame.transform.rotate(surface, 180)
+        _SNAPSHOTS.add(snapshot)
+        return snapshot
     
-    def render_hand(self, screen, mouse_pos):
-        hand_start, hand_gap, hand_y = self._get_hand_coords()
+    def render_hand(self, screen, selected=None, hits=None):
+        """Render this player's hand along the bottom of the screen.
 
-        if self._on_hand_loc(screen, mouse_pos):
-            selected = self._selected_from_hand(hand_start, hand_gap,
-                                                mouse_pos)
-            
-            hand_x = hand_start
-            for i, card in enumerate(self.hand):
-                if i != selected:
-                    card.render(screen,
-                                (hand_x, hand_y, self._card_w, self._card_h))
-                hand_x += hand_gap
-            
+        Parameters:
+
+            screen   - pygame.Surface to draw onto.
+
+            selected - Index of the card to raise above the others, if any.
+
+            hits     - HitIndex to register each card in, if given. Cards
+                       are registered where they rest, even when raised.
+        """
+        hand_start, hand_gap, hand_y = self._get_hand_coords()
+        card_w, card_h = self._layout.card_w, self._layout.card_h
+
+        hand_x = hand_start
+        for i, card in enumerate(self.hand):
+            if i != selected:
+                card.render(screen, (hand_x, hand_y, card_w, card_h))
+            if hits is not None:
+                hits.add((hand_x, hand_y, card_w, card_h), ("hand", i))
+            hand_x += hand_gap
+        
+        if selected is not None:
             self.hand[selected].render(screen,
                 (
                     hand_start + hand_gap * selected,
-                    hand_y - (self._card_h // 3),
-                    self._card_w, self._card_h
+                    hand_y - (card_h // 3),
+                    card_w, card_h
                 ))
 
-        else:
-            hand_x = hand_start
-            for card in self.hand:
-                card.render(screen,
-                            (hand_x, hand_y, self._card_w, self._card_h))
-                hand_x += hand_gap
+
+class _ChoiceProbe(engine.Side):
+
+    def __init__(self, player, opponent):
+        """Create a copy of a Player's side to try an attack out on.
+
+        Whenever the move asks for a slot, the player picks it on screen,
+        drawn over the real board, and the first pick is kept as `choice`.
+
+        Parameters:
+
+            player   - Player to copy, and to ask.
+
+            opponent - Player to draw as the opponent while asking.
+        """
+        super().__init__([])
+        self.load_state(player.state(reveal_hand=False))
+        self.choice = None
+        self._player = player
+        self._opponent = opponent
+
+    def front_line_screen(self, screen, check_event, opponent, valid,
+                          card=None, help_text=None, text_on_top=False):
+        return self._ask(self._player.front_line_screen, screen,
+                         check_event, valid, card, help_text, text_on_top)
+
+    def front_line_opponent(self, screen, check_event, opponent, valid,
+                            card=None, help_text=None, text_on_top=False):
+        return self._ask(self._player.front_line_opponent, screen,
+                         check_event, valid, card, help_text, text_on_top)
+
+    def _ask(self, pick, screen, check_event, valid, card, help_text,
+             text_on_top):
+        if self.choice is None:
+            self.choice = pick(screen, check_event, self._opponent, valid,
+                               card, help_text, text_on_top)
+        return self.choice if self.choice in valid else None
+
+
+class RemotePlayer(Player):
+
+    def __init__(self, connection):
+        """Create the Player at this end of a game hosted by `server.py`.
+
+        Its cards are whatever the server last said they were. Actions are
+        chosen on screen as usual but sent to the server to be taken. Attacks
+        on an empty slot are rolled there, without showing the d10.
+
+        Parameters:
+            connection - protocol.Connection to the server.
+        """
+        super().__init__([])
+        self._connection = connection
+
+    def act(self, action, opponent, screen=None, check_event=None):
+        """Send an action to the server, which answers with the new state.
+
+        An attack is first tried out on copies of both sides, so a slot its
+        move asks for is picked on screen as it would be offline, and sent
+        as the attack's choice. The protocol carries one choice, which
+        answers every question the move asks. A move that flips a coin
+        before asking may ask here but not on the server, or the other way
+        around; then the choice goes unused, or the server picks the first
+        valid slot.
+        """
+        action = tuple(action)
+        if action[0] == "attack" and len(action) == 3 and screen is not None:
+            probe = _ChoiceProbe(self, opponent)
+            opposing = engine.Side([])
+            opposing.load_state(opponent.state(reveal_hand=False))
+            probe.act(action, opposing, screen, check_event)
+            if probe.choice is not None:
+                action += (probe.choice,)
+        self._connection.send({"op": "act", "action": list(action)})
+        return True
+
+
+class BotPlayer(Player):
+
+    # the choices a move asks for are the bot's, made without a screen
+    front_line_screen = engine.Side.front_line_screen
+    front_line_opponent = engine.Side.front_line_opponent
+
+    def __init__(self, deck, bot):
+        """Create a Player whose actions are chosen by one of `bots`.
+
+        While it thinks, the board is shown from its opponent's side, from
+        a snapshot, so with a frontend.ThreadedFrontend the window keeps
+        drawing. Attacks on an empty slot of its opponent still roll the
+        d10 on screen.
+
+        Parameters:
+
+            deck - list of Card objects.
+
+            bot  - str name of the bot in `bots.BOTS`.
+        """
+        super().__init__(deck)
+        self._bot = bots.BOTS[bot]
+
+    def choose_action(self, screen, check_event, opponent):
+        game = engine.Game(self, opponent)
+        frontend.current().show(game.state(1), draw_state)
+        self.act(self._bot(game), opponent, screen, check_event)
 
 
 class Board:
 
-    def __init__(self, size, player1, player2):
+    def __init__(self, size, player1, player2, fe=None):
+        """Create the board two players play on.
+
+        Parameters:
+
+            size    - (width, height) of the screen.
+
+            player1 - Player who goes first.
+
+            player2 - Player who goes second.
+
+            fe      - Frontend to read input from and draw with. Defaults to
+                      a window; use a frontend.ScriptedFrontend to play
+                      without one.
+        """
+        if fe is None:
+            fe = frontend.WindowFrontend()
+        frontend.use(fe)
+        self._frontend = fe
         self._w, self._h = size
-        self._screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        self._screen = fe.open(size)
         self._p1 = player1
         self._p2 = player2
+        self._pending_size = None
     
     def _check_event(self, event):
+        """Handle events every screen needs to respond to the same way.
+
+        Resizes are coalesced: each VIDEORESIZE restarts a short timer, and
+        only when it fires is the display reset and the board laid out again,
+        so dragging the window edge relayouts once rather than every frame.
+
+        Pressing MEMORY_KEY prints what images and caches are holding.
+
+        Returns pygame.VIDEORESIZE once the new layout is in place.
+        """
         if event.type == pygame.QUIT:
             sys.exit()
+        elif event.type == pygame.KEYDOWN and event.key == MEMORY_KEY:
+            import memory
+            memory.print_report()
         elif event.type == pygame.VIDEORESIZE:
-            self._screen = pygame.display.set_mode((event.w, event.h),
-                                                   pygame.RESIZABLE)
-            self._p1.set_dimensions((event.w, event.h))
-            self._p2.set_dimensions((event.w, event.h))
+            self._pending_size = (event.w, event.h)
+            self._frontend.set_timer(relayout_event(), RESIZE_DELAY)
+        elif event.type == relayout_event() and \
+             self._pending_size is not None:
+            size = self._pending_size
+            self._pending_size = None
+            self._w, self._h = size
+            self._screen = self._frontend.open(size)
+            self._p1.set_dimensions(size)
+            self._p2.set_dimensions(size)
             return pygame.VIDEORESIZE
     
     def run_game(self):
+        game = engine.Game(self._p1, self._p2)
+        while not game.over():
+            game.current().choose_action(self._screen, self._check_event,
+                                         game.opponent())
+            game.end_turn()
+        print(f"Player {game.winner + 1} wins!")
+
+    def run_remote(self, connection):
+        """Play or watch a game hosted by `server.py`.
+
+        Player 1 is drawn at the bottom, and must be a RemotePlayer on the
+        connection to play; player 2 shows the opponent. Spectators see the
+        player who went first at the bottom. Between turns the board is
+        drawn as the server last described it.
+
+        Parameters:
+            connection - protocol.Connection that has sent a join or watch
+                         message.
+        """
+        you, opponent = self._p1, self._p2
+        fe = self._frontend
+        seat = None
+        state = None
+        my_turn = False
+        loaded = None
         while True:
-            self._p1.choose_action(self._screen, self._check_event, self._p2)
-            if not self._p1.prize_cards:
-                print("Player 1 wins!")
-                break
-            self._p2.choose_action(self._screen, self._check_event, self._p1)
-            if not self._p2.prize_cards:
-                print("Player 2 wins!")
-                break
+            try:
+                messages = connection.poll(1 / 60)
+            except ConnectionError:
+                print("Lost the connection to the server.")
+                return
+            for msg in messages:
+                if msg["op"] == "joined":
+                    seat = msg["seat"]
+                elif msg["op"] == "state":
+                    state = msg["state"]
+                    bottom = 0 if seat is None else seat
+                    you.load_state(state["sides"][bottom])
+                    opponent.load_state(state["sides"][1 - bottom])
+                    my_turn = seat is not None and state["turn"] == seat
+                    loaded = None
+                elif msg["op"] == "error":
+                    print(msg["message"])
+                elif msg["op"] == "left":
+                    if seat is None:
+                        print("A player left.")
+                    else:
+                        print("Your opponent left.")
+                    return
+
+            if state is None:
+                for event in fe.events():
+                    self._check_event(event)
+                continue
+            if state["over"]:
+                if state["winner"] is None:
+                    print("The game is a draw.")
+                elif seat is None:
+                    print(f"Player {state['winner'] + 1} wins!")
+                elif state["winner"] == seat:
+                    print("You win!")
+                else:
+                    print("Your opponent wins!")
+                return
+            if my_turn:
+                you.choose_action(self._screen, self._check_event, opponent)
+                # wait for the server to say how it went
+                my_turn = False
+                continue
+
+            resized = False
+            for event in fe.events():
+                resized |= self._check_event(event) == pygame.VIDEORESIZE
+            if resized or pkmn.images_loaded() != loaded:
+                loaded = pkmn.images_loaded()
+                fe.show(state, draw_state)
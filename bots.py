@@ -0,0 +1,133 @@
+import os
+import glob
+import json
+import random
+
+import engine
+
+DECKS = "decks"
+
+BOTS = {}
+bot = lambda f: BOTS.setdefault(f.__name__, f)
+
+# A bot is a function taking an engine.Game on its turn and returning one
+# of game.legal_actions(). Randomness comes from the random module, as it
+# does for the game itself, so seeding it makes a whole match repeatable.
+
+
+@bot
+def random_bot(game):
+    """Take any legal action, each as likely as the others."""
+    return random.choice(game.legal_actions())
+
+
+def _attack_score(game, slot, move_index):
+    """Score an attack by the prize or knock out it's likely to bring."""
+    card = game.current().front_line[slot]
+    damage = card.moves()[move_index].damage()
+    target = game.opponent().opposite_space(slot)
+    if target is game.opponent():
+        # an empty slot: the d10 roll beats damage for a prize card
+        return 10 + 10 * min(1, -(-damage // 10) / 10)
+    damage = target.apply_effectiveness(damage, card.element())
+    score = 5 + min(damage, target.hp()) / 10
+    if damage >= target.hp():
+        score += 5
+    return score
+
+
+def _score(game, action):
+    """Score how good an action looks on its face."""
+    side = game.current()
+    kind = action[0]
+    if kind == "attack":
+        return _attack_score(game, action[1], action[2])
+    if kind == "play":
+        card = side.hand[action[1]]
+        placement = card.placement()
+        if placement == "basic":
+            return 6
+        if placement == "evolved":
+            return 7
+        # energy: best on a Pokemon that can't attack yet
+        unit = side.front_line[action[2]]
+        if not any(unit.can_use_move(i) for i in range(len(unit.moves()))):
+            return 5
+        return 3
+    if kind == "wake":
+        return 4
+    if kind == "draw":
+        return 2 if len(side.hand) < engine.HAND_SIZE else 1
+    if kind == "move":
+        # toward an empty slot opposite, where attacks can win prize cards
+        if game.opponent().front_line[engine.SLOTS - 1 - action[2]] is None:
+            return 2.5
+    return 0
+
+
+@bot
+def greedy_bot(game):
+    """Take the action that looks best this turn, without looking ahead.
+
+    Attacks that could win a prize card come first, then knock outs and
+    damage, then filling the front line, then energy, then drawing.
+    """
+    actions = game.legal_actions()
+    scores = [_score(game, action) for action in actions]
+    best = max(scores)
+    return random.choice([a for a, s in zip(actions, scores) if s == best])
+
+
+def load_decks(folder=DECKS):
+    """Load every deck in a folder, as a dict of {file name: deck dict}."""
+    decks = {}
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            decks[name] = json.load(f)
+    return decks
+
+
+def turn_seed(seed, turn):
+    """Get the seed the random module is given before a turn is taken.
+
+    Reseeding each turn means the game's own dice depend on the match's
+    seed and the turn alone, not on what the bots drew, so a `replay` plays
+    out the same without them.
+    """
+    return seed << 32 | turn
+
+
+def play_match(deck1, deck2, bot1, bot2, seed=None, max_turns=None,
+               actions=None):
+    """Play one game between two bots, the first of which goes first.
+
+    Parameters:
+
+        deck1, deck2 - dicts as in `decks`.
+
+        bot1, bot2   - Bot functions, or names in BOTS.
+
+        seed         - Non-negative int seed for the random module, or None
+                       to leave it.
+
+        max_turns    - As for engine.Game.
+
+        actions      - list to append each action taken to, or None.
+
+    Returns:
+        int index of the winner, 0 or 1, or None for a draw.
+        int number of turns played.
+    """
+    if seed is not None:
+        random.seed(seed)
+    bots = [BOTS.get(b, b) for b in (bot1, bot2)]
+    game = engine.Game.new(deck1, deck2, max_turns)
+    while not game.over():
+        action = bots[game.turn](game)
+        if seed is not None:
+            random.seed(turn_seed(seed, game.turns))
+        game.step(action)
+        if actions is not None:
+            actions.append(action)
+    return game.winner, game.turns
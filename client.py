@@ -0,0 +1,65 @@
+"""Play a game hosted by `server.py` against someone on another machine.
+
+    python client.py ROOM
+    python client.py ROOM --host example.com --deck decks/brightsdeck.json
+    python client.py ROOM --watch
+
+Both players join the same room name; whoever joins first goes first.
+Anyone else can watch the room once it's been joined.
+
+This file should not be imported.
+"""
+
+import json
+import argparse
+
+import pygame
+
+import pkmn
+import board
+import frontend
+import protocol
+
+SIZE = (1000, 800)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play a game hosted by server.py.")
+    parser.add_argument("room", help="name of the room to join")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address of the server")
+    parser.add_argument("--port", type=int, default=protocol.PORT,
+                        help="port of the server")
+    parser.add_argument("--deck", default="decks/brightsdeck.json",
+                        help="deck to play with")
+    parser.add_argument("--watch", action="store_true",
+                        help="spectate instead of playing")
+    args = parser.parse_args()
+
+    pygame.init()
+    pkmn.init()
+
+    connection = protocol.Connection(args.host, args.port)
+    if args.watch:
+        connection.send({"op": "watch", "room": args.room})
+        you = board.Player([])
+    else:
+        with open(args.deck, 'r', encoding='utf-8') as f:
+            d = json.load(f)
+        connection.send({"op": "join", "room": args.room, "deck": d})
+        you = board.RemotePlayer(connection)
+    opponent = board.Player([])
+    you.set_dimensions(SIZE)
+    opponent.set_dimensions(SIZE)
+
+    fe = frontend.ThreadedFrontend()
+    itf = board.Board(SIZE, you, opponent, fe)
+    try:
+        fe.run(lambda: itf.run_remote(connection))
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
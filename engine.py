@@ -0,0 +1,466 @@
+import random
+from functools import lru_cache
+
+import pkmn
+
+HAND_SIZE = 4       # cards each side draws before the first turn
+SLOTS = 4           # front line slots per side
+
+# Every action is a tuple starting with its kind:
+#
+#     ("draw",)                         draw a card
+#     ("play", hand_index, slot)        play, evolve or attach from the hand
+#     ("wake", slot)                    try to wake up an asleep Pokemon
+#     ("move", slot, to)                move a Pokemon to an empty slot
+#     ("retreat", slot, to)             retreat a Pokemon, paying energy
+#     ("attack", slot, move[, choice])  use a move; choice is the slot any
+#                                       effect that picks one should pick
+ACTIONS = ("draw", "play", "wake", "move", "retreat", "attack")
+
+
+@lru_cache(None)
+def species(card_id):
+    """Get the Pokemon for a card id, loading it only once.
+
+    Parameters:
+        card_id - str id in the card database, e.g. "fs050shellder".
+    """
+    return pkmn.Pokemon.from_id(card_id)
+
+
+def card_key(card):
+    """Get a str that `card_from_key` can rebuild a card from.
+
+    That's the card id for a Unit and the element for an Energy.
+    """
+    if isinstance(card, pkmn.Energy):
+        return card.name()
+    return card.card_id()
+
+
+def card_from_key(key):
+    """Create a new card from a str given by `card_key`."""
+    if key in pkmn.Energy.NAMES:
+        return pkmn.Energy(key)
+    return species(key).build_unit()
+
+
+def deck_from_dict(d):
+    """Create the list of cards in a deck.
+
+    Parameters:
+        d - dict with attributes "name", "energy", "pokemon", as in `decks`.
+    """
+    deck = []
+    for name in d['pokemon']:
+        p = species(name)
+        for _ in range(d['pokemon'][name]):
+            deck.append(p.build_unit())
+    for energy in d['energy']:
+        for _ in range(d['energy'][energy]):
+            deck.append(pkmn.Energy(energy))
+    return deck
+
+
+class Side:
+
+    def __init__(self, deck):
+        """Create one side of a game: a deck, hand, prize cards and front line.
+
+        This holds the rules. `board.Player` adds the screens that let a
+        person choose what to do. Left alone, choices that moves ask for are
+        whatever the action says, and attacks on an empty slot roll the d10
+        without showing it.
+
+        Parameters:
+            deck - list of Card objects.
+        """
+        self.deck = deck
+        self.shuffle()
+        self.prize_cards = self.draw(round(len(deck)/10))
+        self.hand = []
+        self.discard_pile = []
+        self.front_line = [None] * SLOTS
+        self._choice = None
+
+    @staticmethod
+    def from_deck_dict(d):
+        """Create a Side with the given dict as a deck.
+
+        Parameters:
+            d - dict with attributes "name", "energy", "pokemon"
+        """
+        return Side(deck_from_dict(d))
+
+    def shuffle(self):
+        """Shuffle the deck."""
+        random.shuffle(self.deck)
+
+    def draw(self, num):
+        """Create a list of Card objects from drawn from the deck.
+
+        Parameters:
+            num - int representing number of cards to be drawn.
+        """
+        toret = self.deck[:num]
+        self.deck = self.deck[num:]
+        return toret
+
+    def win_prize_card(self):
+        """Move the top prize card from its place to the hand."""
+        self.hand.append(self.prize_cards[0])
+        self.prize_cards = self.prize_cards[1:]
+
+    def opposite_space(self, i):
+        """Return the card that opposes the unit at position i.
+
+        Parameters:
+            i - Position of other Player's Pokemon (0-4).
+        """
+        i = SLOTS - 1 - i
+        card = self.front_line[i]
+        if card is None:
+            return self
+        return card
+
+    def remove_fainted(self):
+        """Remove any Pokemon on the front line that have fainted."""
+        for i, card in enumerate(self.front_line):
+            if card and card.is_fainted():
+                self._discard_front_line(i)
+
+    def _card_to_front_line(self, card, position):
+        """Place a card on the front line, either playing, evolving, or adding.
+
+        Parameters:
+
+            card     - Card object to be put on the front line.
+
+            position - int between 0 and len(front line)-1.
+        """
+        placement = card.placement()
+        if placement == "basic":
+            self.front_line[position] = card
+        elif placement == "evolved":
+            self.front_line[position].evolve_into(card)
+            self.front_line[position] = card
+        elif placement == "energy":
+            self.front_line[position].attach(card)
+            self.front_line[position].add_energy(card)
+
+    def _discard_front_line(self, i):
+        """Discard the card at the given spot of the front line, with attached.
+
+        Parameters:
+            i - Index of card in front line.
+        """
+        card = self.front_line[i]
+        stowaways = card.detach()
+        self.discard_pile.extend(stowaways)
+        self.discard_pile.append(card)
+        self.front_line[i] = None
+
+    def placements(self, card):
+        """Get the front line slots the given card from the hand can go in."""
+        placement = card.placement()
+        if placement == "basic":
+            return [i for i in range(SLOTS) if self.front_line[i] is None]
+        elif placement == "evolved":
+            return [i for i in range(SLOTS) if self.front_line[i] and
+                    card.evolves_from(self.front_line[i])]
+        elif placement == "energy":
+            return [i for i in range(SLOTS) if self.front_line[i]]
+        return []
+
+    def move_targets(self, slot):
+        """Get the slots the Pokemon at the given slot can move to."""
+        return [i for i in range(SLOTS) if self.front_line[i] is None]
+
+    def retreat_targets(self, slot):
+        """Get the slots the Pokemon at the given slot can retreat to.
+
+        Empty if it doesn't have the energy to retreat.
+        """
+        card = self.front_line[slot]
+        if not card.sufficient_energy(card.retreat_energy()):
+            return []
+        cost = card.retreat_cost()
+        return [i for i in range(SLOTS) if i != slot and
+                (self.front_line[i] is None or
+                 self.front_line[i].retreat_cost() <= cost)]
+
+    def legal_actions(self):
+        """Get a list of every action this side can take this turn."""
+        actions = [("draw",)]
+        for i, card in enumerate(self.hand):
+            for slot in self.placements(card):
+                actions.append(("play", i, slot))
+        for slot, card in enumerate(self.front_line):
+            if card is None:
+                continue
+            if card.affliction() == "asleep":
+                actions.append(("wake", slot))
+                continue
+            for to in self.move_targets(slot):
+                actions.append(("move", slot, to))
+            for to in self.retreat_targets(slot):
+                actions.append(("retreat", slot, to))
+            for move in range(len(card.moves())):
+                if card.can_use_move(move):
+                    actions.append(("attack", slot, move))
+        return actions
+
+    def act(self, action, opponent, screen=None, check_event=None):
+        """Take an action, as listed by `legal_actions`.
+
+        Parameters:
+
+            action      - tuple of the action.
+
+            opponent    - Side on the other end of the board.
+
+            screen      - Surface for the screens of any choices a move asks
+                          for, if this is a `board.Player`.
+
+            check_event - As for the screens of `board.Player`.
+
+        Returns True if the action was taken, False if it isn't allowed.
+        """
+        kind = action[0]
+        if kind == "draw":
+            self.hand.extend(self.draw(1))
+            return True
+
+        if kind == "play":
+            i, slot = action[1:]
+            if slot not in self.placements(self.hand[i]):
+                return False
+            self._card_to_front_line(self.hand.pop(i), slot)
+            return True
+
+        slot = action[1]
+        card = self.front_line[slot]
+        if card is None:
+            return False
+        asleep = card.affliction() == "asleep"
+        if kind == "wake":
+            if not asleep:
+                return False
+            if random.randint(0, 1):
+                card.afflict(None)
+            return True
+        if asleep:
+            return False
+
+        if kind in ("move", "retreat"):
+            to = action[2]
+            if kind == "move" and to not in self.move_targets(slot) or \
+               kind == "retreat" and to not in self.retreat_targets(slot):
+                return False
+            self.front_line[slot], self.front_line[to] = \
+                self.front_line[to], self.front_line[slot]
+            if kind == "retreat":
+                self.hand.extend(card.discard_energy(card.retreat_energy()))
+            return True
+
+        if kind == "attack":
+            move = action[2]
+            if not 0 <= move < len(card.moves()) or \
+               not card.can_use_move(move):
+                return False
+            self._choice = action[3] if len(action) > 3 else None
+            try:
+                target = opponent.opposite_space(slot)
+                self.hand.extend(card.attack(move, target, self, opponent,
+                                             slot, screen, check_event))
+            finally:
+                self._choice = None
+            opponent.remove_fainted()
+            self.remove_fainted()
+            return True
+        return False
+
+    def state(self, reveal_hand=True):
+        """Get a dict of this side, as much of it as the board draws.
+
+        Cards are given by `card_key`. The deck, prize cards and discard
+        pile are only counted, as that's all the board shows of them.
+
+        Parameters:
+            reveal_hand - If False, the hand is only counted too, for the
+                          opponent's view.
+        """
+        front_line = []
+        for card in self.front_line:
+            if card is None:
+                front_line.append(None)
+                continue
+            front_line.append({
+                "id": card.card_id(),
+                "hp": card.hp(),
+                "affliction": card.affliction(),
+                "energy": {name: n for name, n in card.energy().items() if n}
+            })
+        return {
+            "front_line": front_line,
+            "hand": [card_key(c) for c in self.hand] if reveal_hand else None,
+            "hand_size": len(self.hand),
+            "deck_size": len(self.deck),
+            "prize_cards": len(self.prize_cards),
+            "discard_size": len(self.discard_pile)
+        }
+
+    def load_state(self, state):
+        """Replace this side's cards with the ones in a dict from `state`.
+
+        Cards that were only counted become None, which is enough to draw
+        them face down. Energy is added to units without attaching cards,
+        so this is for drawing a side, not for playing it out.
+        """
+        self.front_line = []
+        for unit in state["front_line"]:
+            if unit is None:
+                self.front_line.append(None)
+                continue
+            card = card_from_key(unit["id"])
+            card.add_energy(unit["energy"])
+            card.take_damage(card.max_hp() - unit["hp"])
+            card.afflict(unit["affliction"])
+            self.front_line.append(card)
+
+        if state["hand"] is None:
+            self.hand = [None] * state["hand_size"]
+        else:
+            self.hand = [card_from_key(key) for key in state["hand"]]
+        self.deck = [None] * state["deck_size"]
+        self.prize_cards = [None] * state["prize_cards"]
+        self.discard_pile = [None] * state["discard_size"]
+
+    def front_line_screen(self, screen, check_event, opponent, valid,
+                          card=None, help_text=None, text_on_top=False):
+        """Pick one of this side's front line slots for a move's effect.
+
+        Returns the choice given with the attack if it's valid, else None.
+        """
+        return self._choice if self._choice in valid else None
+
+    def front_line_opponent(self, screen, check_event, opponent, valid,
+                            card=None, help_text=None, text_on_top=False):
+        """Pick one of the opponent's front line slots for a move's effect.
+
+        Returns the choice given with the attack if it's valid, else None.
+        """
+        return self._choice if self._choice in valid else None
+
+    def receive_attack(self, screen, check_event, damage, user, _):
+        """Roll a d10, and if the result is less than damage, do prize card.
+
+        Parameters:
+
+            damage - Chance that this attack hits.
+
+            user   - Side dealing the damage.
+        """
+        if damage == 0:
+            return False
+        if 10 * random.randrange(10) < damage:
+            user.win_prize_card()
+        return True
+
+
+class Game:
+
+    def __init__(self, side1, side2, max_turns=None):
+        """Create a game between two sides, the first of which goes first.
+
+        Hands are not dealt; see `Game.new`.
+
+        Parameters:
+
+            side1, side2 - Side objects.
+
+            max_turns    - int of turns after which the game is a draw, or
+                           None to play until someone wins.
+        """
+        self.sides = [side1, side2]
+        self.turn = 0
+        self.turns = 0
+        self.winner = None
+        self.max_turns = max_turns
+
+    @staticmethod
+    def new(deck1, deck2, max_turns=None):
+        """Create a game between two deck dicts, with hands dealt.
+
+        Parameters:
+
+            deck1, deck2 - dicts as in `decks`.
+
+            max_turns    - As for Game.
+        """
+        game = Game(Side.from_deck_dict(deck1), Side.from_deck_dict(deck2),
+                    max_turns)
+        for side in game.sides:
+            side.hand.extend(side.draw(HAND_SIZE))
+        return game
+
+    def current(self):
+        """Get the Side whose turn it is."""
+        return self.sides[self.turn]
+
+    def opponent(self):
+        """Get the Side whose turn it isn't."""
+        return self.sides[1 - self.turn]
+
+    def over(self):
+        """Return True if the game has been won or has run out of turns."""
+        return self.winner is not None or \
+            self.max_turns is not None and self.turns >= self.max_turns
+
+    def legal_actions(self):
+        """Get a list of every action the current side can take."""
+        if self.over():
+            return []
+        return self.current().legal_actions()
+
+    def end_turn(self):
+        """Finish the current side's turn.
+
+        A side wins at the end of its turn if it has no prize cards left.
+        """
+        self.turns += 1
+        if not self.current().prize_cards:
+            self.winner = self.turn
+        else:
+            self.turn = 1 - self.turn
+
+    def state(self, seat):
+        """Get a dict of the game as one side sees it, see `protocol`.
+
+        Parameters:
+            seat - int index of the side looking, 0 or 1, or None for a
+                   spectator, who sees neither hand.
+        """
+        return {
+            "seat": seat,
+            "turn": self.turn,
+            "turns": self.turns,
+            "winner": self.winner,
+            "over": self.over(),
+            "sides": [side.state(reveal_hand=i == seat)
+                      for i, side in enumerate(self.sides)]
+        }
+
+    def step(self, action):
+        """Take an action for the current side and end its turn.
+
+        Parameters:
+            action - tuple (or list) of one of `legal_actions`.
+
+        Raises ValueError if the action isn't legal.
+        """
+        action = tuple(action)
+        if action[:3] not in self.legal_actions():
+            raise ValueError(f"{action} is not a legal action.")
+        self.current().act(action, self.opponent())
+        self.end_turn()
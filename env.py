@@ -0,0 +1,362 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+import pkmn
+import bots
+import engine
+import protocol
+
+PILES = 4   # hand, deck, prize cards and discard pile, counted per side
+
+# An observation is a dict of arrays, one row per game, seen by the side to
+# move. Index 0 of each side axis is that side and index 1 its opponent.
+#
+#   "card"        (n, 2, SLOTS) int16       code of each front line card,
+#                                           see `protocol.card_keys`, or 0
+#   "hp"          (n, 2, SLOTS) int16       hit points left
+#   "max_hp"      (n, 2, SLOTS) int16       hit points when undamaged
+#   "affliction"  (n, 2, SLOTS) int8        index in `protocol.AFFLICTIONS`
+#   "energy"      (n, 2, SLOTS, E) int8     energy attached, of each of
+#                                           `pkmn.Energy.NAMES`
+#   "hand"        (n, C) int8               copies of each card code in
+#                                           the hand of the side to move
+#   "piles"       (n, 2, PILES) int16       cards in the hand, deck, prize
+#                                           cards and discard pile
+#   "mask"        (n, A) bool               which of `actions` are legal
+
+
+@lru_cache(1)
+def actions():
+    """Get every action an agent can take, indexed by its number.
+
+    Plays name the card's key rather than its place in the hand, so there
+    are as many actions whatever the hand holds; the first copy of the card
+    is played. Attacks leave any choice a move asks for to the move.
+    """
+    moves = max(len(d["moves"]) for d in pkmn.pokemon_data().values())
+    slots = range(engine.SLOTS)
+    return ([("draw",)] +
+            [("play", key, slot) for key in protocol.card_keys()[1:]
+             for slot in slots] +
+            [("wake", slot) for slot in slots] +
+            [(kind, slot, to) for kind in ("move", "retreat")
+             for slot in slots for to in slots if to != slot] +
+            [("attack", slot, move) for slot in slots
+             for move in range(moves)])
+
+
+@lru_cache(1)
+def action_numbers():
+    """Get a dict of {action: number}, the inverse of `actions`."""
+    return {action: i for i, action in enumerate(actions())}
+
+
+@lru_cache(1)
+def _energy_indices():
+    return {name: i for i, name in enumerate(pkmn.Energy.NAMES)}
+
+
+def blank_observation(n):
+    """Get an observation of n games, zeroed, to be filled by `observe`."""
+    side = (n, 2, engine.SLOTS)
+    return {
+        "card": np.zeros(side, np.int16),
+        "hp": np.zeros(side, np.int16),
+        "max_hp": np.zeros(side, np.int16),
+        "affliction": np.zeros(side, np.int8),
+        "energy": np.zeros(side + (len(pkmn.Energy.NAMES),), np.int8),
+        "hand": np.zeros((n, len(protocol.card_keys())), np.int8),
+        "piles": np.zeros((n, 2, PILES), np.int16),
+        "mask": np.zeros((n, len(actions())), bool)
+    }
+
+
+def observe(games, observation=None):
+    """Get the observation of many games, each seen by the side to move.
+
+    Games are read into flat lists that are written to the arrays in one
+    go, since setting elements one at a time costs more than reading the
+    games.
+
+    Parameters:
+
+        games       - list of engine.Game objects.
+
+        observation - dict from `blank_observation` to fill in place, or
+                      None for a new one.
+    """
+    n = len(games)
+    obs = blank_observation(n) if observation is None else observation
+    codes = protocol.card_codes()
+    energies = _energy_indices()
+    afflictions = protocol.AFFLICTIONS
+    numbers = action_numbers()
+    cards = len(protocol.card_keys())
+    choices = len(actions())
+    units = []          # card, hp, max hp and affliction of each slot
+    piles = []
+    energy_at = []      # flat index into "energy" of each nonzero count
+    energy = []
+    hand_at = []        # flat index into "hand" of each card in a hand
+    legal_at = []       # flat index into "mask" of each legal action
+    for i, game in enumerate(games):
+        side = game.current()
+        for s, other in enumerate((side, game.opponent())):
+            for slot, card in enumerate(other.front_line):
+                if card is None:
+                    units.append((0, 0, 0, 0))
+                    continue
+                units.append((codes[card.card_id()], card.hp(),
+                              card.max_hp(),
+                              afflictions.index(card.affliction())))
+                at = ((i * 2 + s) * engine.SLOTS + slot) * len(energies)
+                for name, count in card.energy().items():
+                    if count:
+                        energy_at.append(at + energies[name])
+                        energy.append(count)
+            piles.append((len(other.hand), len(other.deck),
+                          len(other.prize_cards), len(other.discard_pile)))
+
+        at = i * cards
+        hand_at.extend(at + codes[engine.card_key(c)] for c in side.hand)
+        at = i * choices
+        for action in side.legal_actions():
+            if action[0] == "play":
+                action = ("play", engine.card_key(side.hand[action[1]]),
+                          action[2])
+            legal_at.append(at + numbers[action])
+
+    units = np.array(units, np.int16).reshape(n, 2, engine.SLOTS, 4)
+    for j, name in enumerate(("card", "hp", "max_hp", "affliction")):
+        obs[name][:] = units[..., j]
+    obs["piles"][:] = np.array(piles, np.int16).reshape(n, 2, PILES)
+    obs["energy"].fill(0)
+    obs["energy"].reshape(-1)[energy_at] = energy
+    obs["hand"][:] = np.bincount(hand_at, minlength=n * cards) \
+        .reshape(n, cards)
+    obs["mask"].fill(False)
+    obs["mask"].reshape(-1)[legal_at] = True
+    return obs
+
+
+@lru_cache(1)
+def species():
+    """Get the card id of every Pokemon, indexed by its species number - 1.
+
+    Species are numbered from 1 in the order of their ids, leaving 0 for an
+    empty slot.
+    """
+    return sorted(pkmn.pokemon_data())
+
+
+@lru_cache(1)
+def feature_names():
+    """Get the name of each column `features` gives, in order.
+
+    The layout only changes if the card database or the rules' constants
+    do, so a model's weights line up with it from run to run.
+    """
+    unit = ["species", "occupied", "hp"] + \
+        [f"energy.{name}" for name in pkmn.Energy.NAMES] + \
+        [f"affliction.{name}" for name in protocol.AFFLICTIONS[1:]]
+    names = [f"{side}.slot{slot}.{name}" for side in ("me", "opponent")
+             for slot in range(engine.SLOTS) for name in unit]
+    names += [f"hand.{key}" for key in protocol.card_keys()[1:]]
+    names += [f"{side}.{pile}" for side in ("me", "opponent")
+              for pile in ("hand", "deck", "prize_cards", "discard")]
+    return names
+
+
+def features(observation, out=None):
+    """Flatten an observation into one row of features per game.
+
+    Everything is done on whole arrays, written straight into the rows, so
+    encoding thousands of positions costs a few array operations rather
+    than a lookup per unit per feature.
+
+    Parameters:
+
+        observation - dict from `observe`.
+
+        out         - float32 array of shape (n, len(feature_names())) to
+                      fill in place, or None for a new one.
+
+    Returns a C-contiguous float32 array of shape (n, len(feature_names())),
+    each front line slot as its number in `species` (0 if empty), whether
+    it's occupied, the fraction of hit points left, energy counts and a
+    one-hot affliction, then the counts of each card in the hand and the
+    size of each pile.
+    """
+    card = observation["card"]
+    n = len(card)
+    energies = len(pkmn.Energy.NAMES)
+    afflictions = len(protocol.AFFLICTIONS) - 1
+    first = 1 + energies    # codes of Pokemon follow no card and energy
+    width = 3 + energies + afflictions
+    if out is None:
+        out = np.empty((n, len(feature_names())), np.float32)
+
+    slots = 2 * engine.SLOTS * width
+    units = out[:, :slots].reshape(card.shape + (width,))   # a view
+    occupied = card > 0
+    np.multiply(card - (first - 1), occupied, out=units[..., 0])
+    units[..., 1] = occupied
+    np.divide(observation["hp"], np.maximum(observation["max_hp"], 1),
+              out=units[..., 2])
+    units[..., 3:3 + energies] = observation["energy"]
+    np.equal(observation["affliction"][..., None],
+             np.arange(1, afflictions + 1), out=units[..., 3 + energies:])
+
+    hand = observation["hand"][:, 1:]
+    out[:, slots:slots + hand.shape[1]] = hand
+    out[:, slots + hand.shape[1]:] = observation["piles"].reshape(n,
+                                                                  2 * PILES)
+    return out
+
+
+def encode(games):
+    """Get the `features` of many games, each seen by the side to move."""
+    return features(observe(games))
+
+
+class VectorEnv:
+
+    def __init__(self, n, deck, opponent_deck=None, opponent=None,
+                 max_turns=500):
+        """Run n games side by side, for training agents.
+
+        Every game is stepped together from one array of actions. A game
+        that ends is dealt again straight away, so every row always holds
+        a game in progress.
+
+        With an opponent, the agent plays every turn of one side, and the
+        opponent's turns are taken inside `step`; the agent goes first in
+        every other game. Without one, the agent plays both sides.
+
+        Parameters:
+
+            n             - int number of games.
+
+            deck          - dict as in `decks` the agent plays.
+
+            opponent_deck - dict as in `decks` for the other side, or None
+                            for the same deck.
+
+            opponent      - Bot function, or name in `bots.BOTS`, or None.
+
+            max_turns     - As for engine.Game.
+        """
+        pkmn.use_images(False)
+        self.n = n
+        self.decks = (deck, deck if opponent_deck is None else opponent_deck)
+        self.opponent = bots.BOTS.get(opponent, opponent)
+        self.max_turns = max_turns
+        self.games = [None] * n
+        self.seats = [1] * n
+        self.observation = blank_observation(n)
+        self._rewards = np.zeros(n, np.float32)
+        self._terminated = np.zeros(n, bool)
+        self._truncated = np.zeros(n, bool)
+
+    def reset(self, seed=None):
+        """Deal every game again.
+
+        Parameters:
+            seed - Seed for the random module, which the games and bots
+                   draw from, or None to leave it.
+
+        Returns the observation dict. Its arrays are filled in place by
+        every later call, so copy them to keep them.
+        """
+        if seed is not None:
+            random.seed(seed)
+        for i in range(self.n):
+            self._deal(i)
+        observe(self.games, self.observation)
+        return self.observation
+
+    def step(self, chosen):
+        """Take one action in every game.
+
+        Parameters:
+            chosen - Array of n ints, each a number in `actions` that the
+                     game's row of the mask allows.
+
+        Returns:
+            dict of the observation, as from `reset`.
+            float32 array of each game's reward to the agent: 1 for a win,
+            -1 for a loss and 0 otherwise. Without an opponent, it's the
+            reward to the side that took the action.
+            bool array of which games were won, and dealt again.
+            bool array of which games ran out of turns, and dealt again.
+
+        Raises ValueError, naming this env and the action, if chosen isn't
+        n action numbers or an action isn't allowed.
+        """
+        mask = self.observation["mask"]
+        table = actions()
+        rewards = self._rewards
+        terminated = self._terminated
+        truncated = self._truncated
+        rewards[:] = 0
+        terminated[:] = False
+        truncated[:] = False
+        chosen = np.asarray(chosen)
+        if chosen.shape != (self.n,) or \
+           not np.issubdtype(chosen.dtype, np.integer):
+            raise ValueError(f"{self!r} takes {self.n} action numbers, "
+                             f"not {chosen.dtype} of shape {chosen.shape}.")
+        unknown = np.flatnonzero((chosen < 0) | (chosen >= len(table)))
+        if unknown.size:
+            i = unknown[0]
+            raise ValueError(f"{self!r} has no action {chosen[i]}, chosen "
+                             f"for game {i}; there are {len(table)}.")
+        illegal = np.flatnonzero(~mask[np.arange(self.n), chosen])
+        if illegal.size:
+            i = illegal[0]
+            raise ValueError(f"{self!r}: action {chosen[i]} "
+                             f"{table[chosen[i]]} isn't legal in game {i}.")
+        for i, number in enumerate(chosen.tolist()):
+            game = self.games[i]
+            agent = game.turn if self.opponent is None else self.seats[i]
+            # the mask was made from legal_actions, so skip checking again
+            game.current().act(self._concrete(game.current(), table[number]),
+                               game.opponent())
+            game.end_turn()
+            if self.opponent is not None and not game.over():
+                game.step(self.opponent(game))
+            if game.over():
+                if game.winner is not None:
+                    rewards[i] = 1 if game.winner == agent else -1
+                    terminated[i] = True
+                else:
+                    truncated[i] = True
+                self._deal(i)
+        observe(self.games, self.observation)
+        return self.observation, rewards, terminated, truncated
+
+    def __repr__(self):
+        opponent = getattr(self.opponent, "__name__", self.opponent)
+        return f"VectorEnv(n={self.n}, opponent={opponent})"
+
+    def _deal(self, i):
+        """Start a new game in row i, playing the opponent's turn if first."""
+        self.seats[i] = 1 - self.seats[i]
+        if self.seats[i] == 0:
+            self.games[i] = engine.Game.new(*self.decks, self.max_turns)
+        else:
+            self.games[i] = engine.Game.new(*self.decks[::-1],
+                                            self.max_turns)
+            if self.opponent is not None:
+                self.games[i].step(self.opponent(self.games[i]))
+
+    def _concrete(self, side, action):
+        """Turn an action from `actions` into one `engine.Game.step` takes."""
+        if action[0] != "play":
+            return action
+        for i, card in enumerate(side.hand):
+            if engine.card_key(card) == action[1]:
+                return ("play", i, action[2])
+        raise ValueError(f"There is no {action[1]} in the hand.")
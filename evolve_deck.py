@@ -0,0 +1,288 @@
+"""Breed a deck that beats the decks in `decks/`, by simulating games.
+
+    python evolve_deck.py
+    python evolve_deck.py --size 30 --generations 50 --population 48
+    python evolve_deck.py --cards fs110jigglypuff fs111wigglytuff \\
+        --energy psychic --out jiggly.json
+
+Decks are built from a pool of cards, by default every Pokemon in the card
+database and every energy, at most MAX_COPIES of each Pokemon. Each
+generation keeps the best decks, and breeds the rest by mixing the card
+counts of two decks picked by tournament selection, then swapping a few
+cards at random. A deck's fitness is its score against every deck in the
+gauntlet, playing --games games against each and taking turns going first,
+with a draw counting as half a win.
+
+Each generation's new decks are played on a pool of processes. Results are
+kept in the cache file under a hash of the deck, the gauntlet and the
+settings, so a deck bred twice, in this run or an earlier one, is only
+played once. Game i against a gauntlet deck is seeded the same for every
+deck, so decks are compared on the same shuffles and rolls.
+
+The best deck found is written to --out, in the format of `decks`.
+
+This file should not be imported.
+"""
+
+import os
+import json
+import zlib
+import random
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pkmn
+import bots
+
+MAX_COPIES = 4      # copies of one Pokemon in a deck; energy isn't limited
+ELITE = 2           # best decks carried into the next generation unchanged
+SELECTION = 3       # decks drawn for each tournament selection
+
+
+def limit(card, size):
+    """Get how many copies of a card a deck of the given size may hold."""
+    return size if card in pkmn.Energy.NAMES else MAX_COPIES
+
+
+def repair(pool, counts, size, rng):
+    """Remove or add random cards until a deck has exactly size cards.
+
+    Copies over a card's `limit` are removed first.
+
+    Parameters:
+
+        pool   - list of the card keys decks are built from.
+
+        counts - list of how many copies of each card in pool are in the
+                 deck.
+
+        size   - int number of cards in a deck.
+
+        rng    - random.Random to pick cards with.
+
+    Returns a tuple of counts.
+    """
+    counts = [min(n, limit(card, size)) for card, n in zip(pool, counts)]
+    while sum(counts) > size:
+        i = rng.choice([i for i, n in enumerate(counts) if n])
+        counts[i] -= 1
+    while sum(counts) < size:
+        i = rng.choice([i for i, n in enumerate(counts)
+                        if n < limit(pool[i], size)])
+        counts[i] += 1
+    return tuple(counts)
+
+
+def crossover(pool, mother, father, size, rng):
+    """Breed a deck taking each card's count from one parent or the other."""
+    counts = [rng.choice(pair) for pair in zip(mother, father)]
+    return repair(pool, counts, size, rng)
+
+
+def mutate(pool, counts, size, rng, swaps):
+    """Swap up to swaps random cards in a deck for random cards."""
+    counts = list(counts)
+    for _ in range(rng.randint(0, swaps)):
+        i = rng.choice([i for i, n in enumerate(counts) if n])
+        counts[i] -= 1
+    return repair(pool, counts, size, rng)
+
+
+def select(population, fitness, rng):
+    """Pick the fittest of SELECTION decks drawn from the population."""
+    return max(rng.sample(population, SELECTION), key=fitness.get)
+
+
+def to_deck(pool, counts, name="Evolved Deck"):
+    """Turn a deck's counts into a dict as in `decks`."""
+    d = {"name": name, "energy": {}, "pokemon": {}}
+    for card, n in zip(pool, counts):
+        if n:
+            kind = "energy" if card in pkmn.Energy.NAMES else "pokemon"
+            d[kind][card] = n
+    return d
+
+
+def from_deck(pool, d, size, rng):
+    """Turn a dict as in `decks` into counts, fitted to the pool and size."""
+    cards = {**d["pokemon"], **d["energy"]}
+    return repair(pool, [cards.get(card, 0) for card in pool], size, rng)
+
+
+def deck_key(pool, counts, context):
+    """Get a str naming a deck, the gauntlet and settings it was played in.
+
+    Parameters:
+        context - str hash of the gauntlet and settings.
+    """
+    cards = {card: n for card, n in zip(pool, counts) if n}
+    blob = json.dumps([cards, context], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def evaluate(deck, gauntlet, settings):
+    """Score a deck against the gauntlet. Run in a worker process.
+
+    Returns the float share of points it won, a draw being half a win.
+    """
+    points = 0.0
+    games = 0
+    for name, opponent in sorted(gauntlet.items()):
+        for i in range(settings["games"]):
+            seed = zlib.crc32(f"{settings['seed']}:{name}:{i}".encode())
+            if i % 2 == 0:
+                winner, _ = bots.play_match(deck, opponent, settings["bot"],
+                                            settings["bot"], seed,
+                                            settings["max_turns"])
+                mine = 0
+            else:
+                winner, _ = bots.play_match(opponent, deck, settings["bot"],
+                                            settings["bot"], seed,
+                                            settings["max_turns"])
+                mine = 1
+            points += 0.5 if winner is None else float(winner == mine)
+            games += 1
+    return points / games
+
+
+def read_cache(path):
+    """Get a dict of {deck key: fitness} from a cache file.
+
+    A line cut short by an interruption is ignored, and ended so that the
+    next deck appended starts a line of its own.
+    """
+    cache = {}
+    if not os.path.exists(path):
+        return cache
+    line = ""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            cache[record["key"]] = record["fitness"]
+    if line and not line.endswith("\n"):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\n")
+    return cache
+
+
+def _init_worker():
+    pkmn.use_images(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Breed a deck that beats a gauntlet of decks.")
+    parser.add_argument("--decks", default=bots.DECKS,
+                        help="folder of decks to play against")
+    parser.add_argument("--cards", nargs="+", default=None,
+                        help="Pokemon to build from (default: all)")
+    parser.add_argument("--energy", nargs="+", default=None,
+                        choices=pkmn.Energy.NAMES,
+                        help="energy to build from (default: all)")
+    parser.add_argument("--size", type=int, default=40,
+                        help="cards in a deck")
+    parser.add_argument("--population", type=int, default=32,
+                        help="decks in each generation")
+    parser.add_argument("--generations", type=int, default=20,
+                        help="generations to breed")
+    parser.add_argument("--swaps", type=int, default=3,
+                        help="most cards swapped when a deck mutates")
+    parser.add_argument("--games", type=int, default=20,
+                        help="games against each deck in the gauntlet")
+    parser.add_argument("--bot", default="greedy_bot", choices=bots.BOTS,
+                        help="bot playing every deck")
+    parser.add_argument("--max-turns", type=int, default=500,
+                        help="turns after which a game is a draw")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed the search and games are played from")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to play on (default: one per CPU)")
+    parser.add_argument("--cache", default="evolve.jsonl",
+                        help="file the fitness of each deck is kept in")
+    parser.add_argument("--out", default="evolved.json",
+                        help="file to write the best deck to")
+    args = parser.parse_args()
+
+    pkmn.use_images(False)
+    gauntlet = bots.load_decks(args.decks)
+    if not gauntlet:
+        parser.error(f"{args.decks} has no decks to play against.")
+    cards = args.cards if args.cards is not None else \
+        sorted(pkmn.pokemon_data())
+    for card in cards:
+        if card not in pkmn.pokemon_data():
+            parser.error(f"There is no card {card!r}.")
+    pool = cards + (args.energy if args.energy is not None else
+                    pkmn.Energy.NAMES)
+    if sum(limit(card, args.size) for card in pool) < args.size:
+        parser.error(f"The pool can't fill a deck of {args.size} cards.")
+    if args.population < max(ELITE, SELECTION):
+        parser.error(f"A population needs at least "
+                     f"{max(ELITE, SELECTION)} decks.")
+
+    rng = random.Random(args.seed)
+    settings = {"games": args.games, "bot": args.bot,
+                "max_turns": args.max_turns, "seed": args.seed}
+    context = hashlib.sha1(json.dumps([gauntlet, settings], sort_keys=True)
+                           .encode("utf-8")).hexdigest()
+    cache = read_cache(args.cache)
+
+    # start from the gauntlet itself, as far as the pool allows
+    population = [from_deck(pool, d, args.size, rng)
+                  for d in gauntlet.values()][:args.population]
+    while len(population) < args.population:
+        population.append(repair(pool, [0] * len(pool), args.size, rng))
+
+    fitness = {}
+    checkpoint = open(args.cache, 'a', encoding='utf-8')
+    workers = ProcessPoolExecutor(args.workers, initializer=_init_worker)
+    with checkpoint, workers:
+        for generation in range(args.generations + 1):
+            keys = {counts: deck_key(pool, counts, context)
+                    for counts in population}
+            pending = {}
+            for counts, key in keys.items():
+                if key not in cache and key not in pending.values():
+                    pending[workers.submit(evaluate, to_deck(pool, counts),
+                                           gauntlet, settings)] = key
+            for future in as_completed(pending):
+                key = pending[future]
+                cache[key] = future.result()
+                checkpoint.write(json.dumps(
+                    {"key": key, "fitness": cache[key]}) + "\n")
+                checkpoint.flush()
+            for counts, key in keys.items():
+                fitness[counts] = cache[key]
+
+            population.sort(key=fitness.get, reverse=True)
+            mean = sum(fitness[c] for c in population) / len(population)
+            print(f"Generation {generation}: best {fitness[population[0]]:.1%}"
+                  f", mean {mean:.1%}, {len(pending)} decks played.")
+            if generation == args.generations:
+                break
+
+            children = population[:ELITE]
+            while len(children) < args.population:
+                mother = select(population, fitness, rng)
+                father = select(population, fitness, rng)
+                child = crossover(pool, mother, father, args.size, rng)
+                children.append(mutate(pool, child, args.size, rng,
+                                       args.swaps))
+            population = children
+
+    best = population[0]
+    d = to_deck(pool, best)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(d, f, indent=4)
+    print(f"Best deck, scoring {fitness[best]:.1%}, written to {args.out}:")
+    for kind in ("pokemon", "energy"):
+        for card, n in d[kind].items():
+            print(f"    {n} {card}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import threading
+from collections import deque
+
+import pygame
+
+import pkmn
+from animation import ANIMATOR
+
+FPS = 30
+
+
+class WindowFrontend:
+
+    def __init__(self):
+        """Read input from the real mouse and keyboard; draw in a window."""
+        pygame.init()
+        self._clock = pygame.time.Clock()
+
+    def open(self, size):
+        """Create or resize the window, returning the Surface to draw on."""
+        return pygame.display.set_mode(size, pygame.RESIZABLE)
+
+    def screen(self):
+        """Get the Surface to draw on."""
+        return pygame.display.get_surface()
+
+    def events(self):
+        """Get every event that happened since the last frame."""
+        return pygame.event.get()
+
+    def mouse_pos(self):
+        """Get (x, y) of the mouse cursor."""
+        return pygame.mouse.get_pos()
+
+    def present(self, screen, dirty=None):
+        """Show the finished frame, waiting to keep to the frame rate.
+
+        Parameters:
+
+            screen - Surface the frame was drawn on.
+
+            dirty  - list of rects that changed since the last frame, or None
+                     if the whole frame may have.
+        """
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        self._clock.tick(FPS)
+
+    def show(self, state, draw):
+        """Draw a snapshot of the game and show it, here and now.
+
+        Parameters:
+
+            state - Snapshot of the game, not changed once handed over.
+
+            draw  - Function called with (screen, state) to draw it.
+        """
+        screen = self.screen()
+        draw(screen, state)
+        self.present(screen)
+
+    def ticks(self):
+        """Get the time in milliseconds."""
+        return pygame.time.get_ticks()
+
+    def set_timer(self, event_type, delay):
+        """Post an event of event_type after delay milliseconds, once.
+
+        Setting a timer for the same event_type again restarts it.
+        """
+        pygame.time.set_timer(event_type, delay, loops=1)
+
+
+class ScriptFinished(Exception):
+    """Raised when a ScriptedFrontend has no input left to give."""
+
+
+class ScriptedFrontend:
+
+    def __init__(self, frames, on_frame=None):
+        """Feed pre-written input to the game and draw off-screen.
+
+        Nothing here touches the display or the real mouse, so games can be
+        played on a machine with no screen (use SDL_VIDEODRIVER=dummy).
+        Time is virtual and advances by one frame every time input is read,
+        so runs are repeatable no matter how fast the machine is.
+
+        Parameters:
+
+            frames   - Iterable of lists of pygame Events, one list per frame.
+                       The mouse is wherever the last event with a `pos` put
+                       it. Once this runs out, ScriptFinished is raised.
+
+            on_frame - Function called with (screen, frame number) whenever a
+                       frame is presented.
+        """
+        self._frames = iter(frames)
+        self._on_frame = on_frame
+        self._screen = None
+        self._mouse = (0, 0)
+        self._now = 0
+        self._timers = {}
+        self.frame = 0
+
+    def open(self, size):
+        """Create an off-screen Surface to draw on."""
+        self._screen = pygame.Surface(size)
+        return self._screen
+
+    def screen(self):
+        """Get the Surface to draw on."""
+        return self._screen
+
+    def events(self):
+        """Get the next frame's scripted events, plus any timers now due."""
+        try:
+            events = list(next(self._frames))
+        except StopIteration:
+            raise ScriptFinished(f"script ended after {self.frame} frames")
+        self._now += 1000 / FPS
+        for event_type, due in list(self._timers.items()):
+            if due <= self._now:
+                events.append(pygame.event.Event(event_type))
+                del self._timers[event_type]
+        for event in events:
+            if hasattr(event, "pos"):
+                self._mouse = event.pos
+        return events
+
+    def mouse_pos(self):
+        """Get (x, y) of the scripted mouse cursor."""
+        return self._mouse
+
+    def present(self, screen, dirty=None):
+        """Hand the finished frame to on_frame."""
+        if self._on_frame is not None:
+            self._on_frame(screen, self.frame)
+        self.frame += 1
+
+    def show(self, state, draw):
+        """Draw a snapshot of the game and present it as the next frame."""
+        draw(self._screen, state)
+        self.present(self._screen)
+
+    def ticks(self):
+        """Get the virtual time in milliseconds."""
+        return int(self._now)
+
+    def set_timer(self, event_type, delay):
+        """Deliver an event of event_type after delay virtual milliseconds."""
+        self._timers[event_type] = self._now + delay
+
+
+class ThreadedFrontend:
+
+    def __init__(self):
+        """Run the game on its own thread, with the window on this one.
+
+        The game's thread hands over what to show, and the main thread
+        pumps events and draws it, so the window can be moved, resized and
+        closed while the game is busy. The game hands over finished frames
+        from the screens that take input, and snapshots of the game, see
+        `show`, before work that draws nothing, like a bot's turn. A
+        snapshot is drawn on the main thread, and drawn again at the new
+        size when the window is resized, or once card pictures it was drawn
+        without have loaded, however long the game takes to draw its next
+        frame. Events that arrive meanwhile are queued, not lost.
+
+        The threads only share deques, which append and pop atomically, so
+        neither ever waits on a lock for the other. What to show goes
+        through one of length 1, so the window always shows the latest, and
+        older frames and snapshots are dropped unseen.
+        """
+        pygame.init()
+        self._events = deque()
+        self._shown = deque(maxlen=1)   # (draw, snapshot) or (None, frame)
+        self._sizes = deque()
+        self._screen = None
+        self._mouse = (0, 0)
+        self._clock = pygame.time.Clock()
+
+    def run(self, game):
+        """Run game() on a new thread, showing what it hands over until done.
+
+        Call this from the main thread, which must own the window. Closing
+        the window returns at once, even if the game is busy. Any exception
+        the game raises is raised again here.
+        """
+        failure = []
+
+        def play():
+            try:
+                game()
+            except SystemExit:
+                pass
+            except BaseException as e:
+                failure.append(e)
+
+        thread = threading.Thread(target=play, name="game", daemon=True)
+        thread.start()
+        clock = pygame.time.Clock()
+        shown = None
+        loaded = pkmn.images_loaded()
+        while thread.is_alive():
+            redraw = False
+            if pkmn.images_loaded() != loaded:
+                # redraw the snapshot now its cards have real pictures
+                loaded = pkmn.images_loaded()
+                redraw = True
+            while self._sizes:
+                pygame.display.set_mode(self._sizes.popleft(),
+                                        pygame.RESIZABLE)
+                redraw = True
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED,
+                                  pygame.VIDEORESIZE):
+                    redraw = True
+                self._events.append(event)
+            self._mouse = pygame.mouse.get_pos()
+            if self._shown:
+                shown = self._shown.pop()
+                redraw = True
+            if redraw and shown is not None:
+                draw, item = shown
+                window = pygame.display.get_surface()
+                if draw is None:
+                    window.blit(item, (0, 0))
+                else:
+                    draw(window, item)
+                pygame.display.flip()
+            clock.tick(FPS)
+        if failure:
+            raise failure[0]
+
+    def open(self, size):
+        """Create an off-screen Surface to draw on, and size the window."""
+        self._screen = pygame.Surface(size)
+        self._sizes.append(size)
+        return self._screen
+
+    def screen(self):
+        """Get the Surface to draw on."""
+        return self._screen
+
+    def events(self):
+        """Get every event the main thread has received since last time."""
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def mouse_pos(self):
+        """Get (x, y) of the mouse cursor, as the main thread last saw it."""
+        return self._mouse
+
+    def present(self, screen, dirty=None):
+        """Hand a copy of the finished frame to the main thread to show.
+
+        Waits to keep to the frame rate. Frames where nothing changed aren't
+        handed over at all.
+        """
+        if dirty is None or dirty:
+            self._shown.append((None, screen.copy()))
+        self._clock.tick(FPS)
+
+    def show(self, state, draw):
+        """Hand a snapshot of the game to the main thread to draw and show.
+
+        Returns at once, so the game can get on with slow work while the
+        window shows the snapshot.
+
+        Parameters:
+
+            state - Snapshot of the game. It's read on the main thread, so
+                    it mustn't be changed once handed over.
+
+            draw  - Function called on the main thread with (screen, state)
+                    to draw it. It mustn't use anything the game's thread
+                    changes.
+        """
+        self._shown.append((draw, state))
+
+    def ticks(self):
+        """Get the time in milliseconds."""
+        return pygame.time.get_ticks()
+
+    def set_timer(self, event_type, delay):
+        """Post an event of event_type after delay milliseconds, once."""
+        pygame.time.set_timer(event_type, delay, loops=1)
+
+
+_current = None
+
+
+def use(frontend):
+    """Make the given frontend the one every screen reads and draws with.
+
+    Animations are timed by the frontend's clock too.
+    """
+    global _current
+    _current = frontend
+    ANIMATOR.set_clock(frontend.ticks)
+
+
+def current():
+    """Get the frontend in use, defaulting to a WindowFrontend."""
+    if _current is None:
+        use(WindowFrontend())
+    return _current
@@ -0,0 +1,185 @@
+"""Play a scripted game with no window, saving or checking every frame.
+
+    SDL_VIDEODRIVER=dummy python headless.py script.json --out frames
+    SDL_VIDEODRIVER=dummy python headless.py script.json --golden frames
+
+The first saves each frame as frames/00000.png, frames/00001.png, etc. The
+second compares each frame against those, exiting with status 1 if any
+differ. Either way, frame times are printed at the end. With --timings,
+so is how long each phase of the game took, see `instrument`, and with
+--timings-log every timed call is written to a file as a line of JSON.
+With --memory, what images and caches hold once the script ends is
+printed, see `memory`; resizing in the script shows what old window sizes
+leave behind.
+
+A script is a JSON file like:
+
+    {
+        "size": [1000, 800],
+        "seed": 0,
+        "decks": ["decks/brightsdeck.json", "decks/brightsdeck.json"],
+        "hand": 4,
+        "steps": [
+            {"move": [500, 700]},
+            {"click": [500, 700]},
+            {"wait": 10},
+            {"key": "escape"},
+            {"resize": [800, 600]}
+        ]
+    }
+
+Every step is one frame of input, except "wait", which is that many frames
+of none. The game stops when the steps run out.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+import pygame
+
+import pkmn
+import board
+import memory
+import instrument
+from frontend import ScriptedFrontend, ScriptFinished
+
+# bound before `instrument` can wrap it, so checking frames isn't counted
+_load_golden = pygame.image.load
+
+
+def script_frames(steps):
+    """Turn a script's steps into lists of pygame Events, one per frame.
+
+    Parameters:
+        steps - list of dicts, as described at the top of this file.
+    """
+    for step in steps:
+        if "wait" in step:
+            for _ in range(step["wait"]):
+                yield []
+        elif "move" in step:
+            yield [pygame.event.Event(pygame.MOUSEMOTION,
+                                      pos=tuple(step["move"]))]
+        elif "click" in step:
+            yield [pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+                                      pos=tuple(step["click"]), button=1)]
+        elif "key" in step:
+            key = pygame.key.key_code(step["key"])
+            yield [pygame.event.Event(pygame.KEYDOWN, key=key)]
+        elif "resize" in step:
+            w, h = step["resize"]
+            yield [pygame.event.Event(pygame.VIDEORESIZE, w=w, h=h,
+                                      size=(w, h))]
+        else:
+            raise ValueError(f"Unknown script step {step}.")
+
+
+def build_board(script, fe):
+    """Set up a Board the same way test.py does, but with the given frontend.
+
+    Parameters:
+
+        script - dict of the loaded script.
+
+        fe     - Frontend for the board to use.
+    """
+    pygame.init()
+    pkmn.init()
+    random.seed(script.get("seed", 0))
+    size = tuple(script.get("size", (1000, 800)))
+    players = []
+    for path in script.get("decks", ["decks/brightsdeck.json"] * 2):
+        with open(path, 'r', encoding='utf-8') as f:
+            players.append(board.Player.from_deck_dict(json.load(f)))
+    itf = board.Board(size, players[0], players[1], fe)
+    for player in players:
+        player.hand.extend(player.draw(script.get("hand", 4)))
+        player.set_dimensions(size)
+
+    # frames must not depend on how quickly card art loads
+    pkmn.wait_for_images()
+    return itf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script", help="JSON file of scripted input")
+    parser.add_argument("--out", help="directory to save frames to")
+    parser.add_argument("--golden", help="directory of frames to compare to")
+    parser.add_argument("--timings", action="store_true",
+                        help="time each phase of the game")
+    parser.add_argument("--timings-log",
+                        help="file to log every timed call to")
+    parser.add_argument("--memory", action="store_true",
+                        help="print what images and caches hold at the end")
+    args = parser.parse_args()
+
+    with open(args.script, 'r', encoding='utf-8') as f:
+        script = json.load(f)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    frame_times = []
+    mismatched = []
+    last = time.perf_counter()
+
+    def on_frame(screen, frame):
+        nonlocal last
+        now = time.perf_counter()
+        frame_times.append(now - last)
+        name = f"{frame:05d}.png"
+        if args.out:
+            pygame.image.save(screen, os.path.join(args.out, name))
+        if args.golden:
+            path = os.path.join(args.golden, name)
+            if not os.path.exists(path):
+                mismatched.append(name)
+            else:
+                golden = _load_golden(path)
+                if golden.get_size() != screen.get_size() or \
+                   pygame.image.tobytes(golden, "RGB") != \
+                   pygame.image.tobytes(screen, "RGB"):
+                    mismatched.append(name)
+        last = time.perf_counter()
+
+    fe = ScriptedFrontend(script_frames(script["steps"]), on_frame)
+    itf = build_board(script, fe)
+    log = None
+    if args.timings_log:
+        log = open(args.timings_log, 'w', encoding='utf-8')
+    if args.timings or log is not None:
+        instrument.enable(log)
+    last = time.perf_counter()
+    try:
+        itf.run_game()
+    except ScriptFinished:
+        pass
+    finally:
+        instrument.disable()
+        if log is not None:
+            log.close()
+
+    if frame_times:
+        ordered = sorted(frame_times)
+        p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        print(f"{len(ordered)} frames: "
+              f"p50 {1000 * p(0.5):.2f}ms, "
+              f"p95 {1000 * p(0.95):.2f}ms, "
+              f"max {1000 * ordered[-1]:.2f}ms")
+    if args.timings or args.timings_log:
+        instrument.print_report()
+    if args.memory:
+        memory.print_report()
+    if mismatched:
+        print(f"{len(mismatched)} frame(s) differ from {args.golden}: "
+              + ", ".join(mismatched[:10]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import json
+import time
+import threading
+
+import pygame
+
+import ui
+import pkmn
+import board
+import engine
+
+BUCKETS = 32    # histogram buckets, by the bit length of microseconds
+
+# Each phase is the calls to a few methods, timed from entry to exit. Calls
+# nest: a move's effect runs inside the action chosen, and a roll inside
+# the move. A call's own time leaves out the phases timed inside it.
+PHASES = {
+    "choice": [(board.Player, "choose_action")],
+    "move": [(pkmn.Move, "run")],
+    "receive_attack": [(board.Player, "receive_attack"),
+                       (engine.Side, "receive_attack")],
+    "remove_fainted": [(engine.Side, "remove_fainted")],
+    "render": [(board.Player, "render"), (board.Player, "render_hand"),
+               (ui.Scene, "render")]
+}
+
+# Calls that are only counted. Text is counted from `ui.render_line`'s
+# cache misses instead, which are exactly its calls to Font.render, since
+# Font is a C type that can't be wrapped.
+COUNTED = {
+    "smoothscale": (pygame.transform, "smoothscale"),
+    "image.load": (pygame.image, "load")
+}
+
+_originals = {}
+_phases = {}
+_counts = {}
+_local = threading.local()
+_log = None
+_started = None
+_text_misses = 0
+
+
+class PhaseStats:
+    __slots__ = ("calls", "total", "own", "longest", "histogram")
+
+    def __init__(self):
+        """Collect the durations of one phase's calls."""
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.longest = 0.0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, duration, own):
+        """Count a call that took duration seconds, own of them its own."""
+        self.calls += 1
+        self.total += duration
+        self.own += own
+        self.longest = max(self.longest, duration)
+        bucket = min(int(duration * 1e6).bit_length(), BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def percentile(self, q):
+        """Get an upper bound on the qth fraction of durations, in seconds.
+
+        It's the top of the histogram bucket the percentile falls in, so
+        it's at most twice the true value, and never more than the longest
+        call.
+        """
+        rank = q * self.calls
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= rank:
+                return min((1 << bucket) / 1e6, self.longest)
+        return 0.0
+
+    def dump(self):
+        """Get these statistics as a dict of plain values."""
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "own": self.own,
+            "max": self.longest,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "histogram": {f"<{1 << bucket}us": n for bucket, n in
+                          enumerate(self.histogram) if n}
+        }
+
+
+def _timed(phase, f):
+    """Wrap f so its calls are timed as part of a phase."""
+    stats = _phases[phase]
+
+    def wrapper(*args, **kwargs):
+        stack = _local.__dict__.setdefault("stack", [])
+        inner = [0.0]   # time spent in timed calls made by this one
+        stack.append(inner)
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += duration
+            stats.add(duration, duration - inner[0])
+            if _log is not None:
+                _log.write(json.dumps({
+                    "phase": phase, "start": start - _started,
+                    "duration": duration, "own": duration - inner[0],
+                    "depth": len(stack)}) + "\n")
+    return wrapper
+
+
+def _counted(name, f):
+    """Wrap f so its calls are counted under name."""
+    def wrapper(*args, **kwargs):
+        _counts[name] += 1
+        return f(*args, **kwargs)
+    return wrapper
+
+
+def enable(log=None):
+    """Start timing phases and counting calls, from zero.
+
+    Until this is called nothing is wrapped, so the game runs exactly as
+    it would without this module.
+
+    Parameters:
+        log - Text file to write a JSON line to for every timed call, or
+              None to keep only the totals and histograms.
+    """
+    global _log, _started, _text_misses
+    disable()
+    _log = log
+    _started = time.perf_counter()
+    _text_misses = ui.render_line.cache_info().misses
+    for phase, methods in PHASES.items():
+        _phases[phase] = PhaseStats()
+        for owner, attr in methods:
+            f = owner.__dict__[attr]
+            _originals[owner, attr] = f
+            setattr(owner, attr, _timed(phase, f))
+    for name, (owner, attr) in COUNTED.items():
+        _counts[name] = 0
+        f = getattr(owner, attr)
+        _originals[owner, attr] = f
+        setattr(owner, attr, _counted(name, f))
+
+
+def disable():
+    """Put back everything `enable` wrapped, keeping what was measured."""
+    global _log, _text_misses
+    if not _originals:
+        return
+    for (owner, attr), f in _originals.items():
+        setattr(owner, attr, f)
+    _originals.clear()
+    _counts["font.render"] = \
+        ui.render_line.cache_info().misses - _text_misses
+    _log = None
+
+
+def report():
+    """Get what was measured since `enable` as a dict of plain values.
+
+    Returns:
+        {"phases": {phase: dict from `PhaseStats.dump`},
+         "counts": {call: int}}, with times in seconds.
+    """
+    counts = dict(_counts)
+    if _originals:
+        counts["font.render"] = \
+            ui.render_line.cache_info().misses - _text_misses
+    return {"phases": {phase: stats.dump()
+                       for phase, stats in _phases.items()},
+            "counts": counts}
+
+
+def print_report():
+    """Print each phase's times and the counted calls."""
+    r = report()
+    print(f"{'phase':<16}{'calls':>8}{'total ms':>12}{'own ms':>12}"
+          f"{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}")
+    for phase, s in r["phases"].items():
+        print(f"{phase:<16}{s['calls']:>8}"
+              f"{1000 * s['total']:>12.1f}{1000 * s['own']:>12.1f}"
+              f"{1000 * s['p50']:>11.2f}{1000 * s['p95']:>11.2f}"
+              f"{1000 * s['max']:>11.2f}")
+    print(", ".join(f"{n} {name}" for name, n in r["counts"].items()))
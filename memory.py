@@ -0,0 +1,195 @@
+import gc
+import sys
+
+import pygame
+
+import ui
+import pkmn
+import board
+
+# Owners, in the order they're reported. A Surface held by more than one is
+# counted once, by the first that holds it, so card pictures that are also
+# shown by an ImageView are counted as decoded card images.
+OWNERS = ["card atlas", "decoded card images", "scaled cards",
+          "unit overlays", "energy orbs", "fit_within", "text",
+          "widget images", "opponent snapshots", "scene backgrounds",
+          "layouts"]
+
+
+def surface_bytes(surface):
+    """Get how many bytes of pixels a Surface owns.
+
+    A subsurface shares its parent's pixels, so it owns none.
+    """
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def _cache_contents(f):
+    """Get the keys and results a function wrapped by lru_cache holds.
+
+    The cache has no way of listing them, so they're read through the
+    garbage collector, which is handed every key and result of a bounded
+    cache directly, and an unbounded one's dict of them.
+    """
+    contents = []
+    for r in gc.get_referents(f):
+        if isinstance(r, type) or r is f.__wrapped__ or r is f.__dict__:
+            continue
+        if isinstance(r, dict):     # a bounded cache's dict holds links
+            contents.extend(x for item in r.items() for x in item
+                            if type(x).__name__ != "_lru_list_elem")
+        elif type(r) is not object:     # the marker between keyword args
+            contents.append(r)
+    return contents
+
+
+def _python_bytes(objects, seen):
+    """Estimate the bytes held by Python objects and what they contain.
+
+    Surfaces and fonts are left out; the pixels are counted by their
+    owners, and a font is shared by everything drawn in it.
+    """
+    total = 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or \
+           isinstance(obj, (pygame.Surface, pygame.font.Font, type)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, board.Layout):
+            stack.append(vars(obj))
+    return total
+
+
+def _card_name(card):
+    if isinstance(card, pkmn.Unit):
+        return card.card_id()
+    if isinstance(card, pkmn.Energy):
+        return f"energy/{card.name()}"
+    return "cardback"
+
+
+def _size_name(surface):
+    w, h = surface.get_size()
+    return f"{w}x{h}"
+
+
+def report():
+    """Measure the memory held by images and caches, broken down by owner.
+
+    Only what's already loaded is measured; nothing is loaded to do it.
+
+    Returns:
+        dict of {owner: {"count": int, "bytes": int, "by": {part: bytes}}}
+        for each of OWNERS, in order. count is the Surfaces, or the cache
+        entries of an owner that holds no Surfaces. A scaled image's or
+        overlay's part is its size, so ones kept for old window sizes
+        stand out.
+    """
+    owners = {owner: {"count": 0, "bytes": 0, "by": {}} for owner in OWNERS}
+    seen = set()
+
+    def add(owner, part, surface):
+        if surface is None or id(surface) in seen:
+            return
+        seen.add(id(surface))
+        size = surface_bytes(surface)
+        o = owners[owner]
+        o["count"] += 1
+        o["bytes"] += size
+        o["by"][part] = o["by"].get(part, 0) + size
+
+    def add_python(owner, part, objects, count):
+        size = _python_bytes(objects, seen)
+        o = owners[owner]
+        o["count"] += count
+        o["bytes"] += size
+        o["by"][part] = o["by"].get(part, 0) + size
+
+    objects = gc.get_objects()
+    cards = [obj for obj in objects if isinstance(obj, pkmn.Card)]
+
+    if pkmn._card_atlas.cache_info().currsize:
+        sheets = {id(image.get_parent()): image.get_parent()
+                  for image in pkmn._card_atlas().values()}
+        for i, sheet in enumerate(sheets.values()):
+            add("card atlas", f"sheet {i}", sheet)
+
+    for card in cards:
+        add("decoded card images", _card_name(card), card._orig_image)
+    for obj in objects:
+        if isinstance(obj, pkmn.Pokemon) and obj._image is not None and \
+           obj._image.done():
+            add("decoded card images", obj._img_id, obj._image.result())
+
+    for card in cards:
+        if card._image is not None:
+            add("scaled cards", _size_name(card._image), card._image)
+    for card in cards:
+        if isinstance(card, pkmn.Unit) and card._overlay is not None:
+            add("unit overlays", _size_name(card._overlay), card._overlay)
+
+    if pkmn.energy_tiles.cache_info().currsize:
+        add("energy orbs", "tile sheet", pkmn.energy_tiles()[1])
+    for orb in _cache_contents(pkmn.energy_orb):
+        if isinstance(orb, pygame.Surface):
+            add("energy orbs", _size_name(orb), orb)
+
+    add_python("fit_within", "entries", _cache_contents(pkmn.fit_within),
+               pkmn.fit_within.cache_info().currsize)
+
+    for surface in _cache_contents(ui.render_line):
+        if isinstance(surface, pygame.Surface):
+            add("text", "render_line", surface)
+    for panels in list(ui._PANELS.values()):
+        for surface in list(panels.values()):
+            add("text", "text_panel", surface)
+    for obj in objects:
+        if isinstance(obj, ui.TextBox):
+            add("text", "TextBox", obj._image)
+    add_python("text", "layout_text", _cache_contents(ui.layout_text), 0)
+    add_python("text", "advance tables", list(ui._ADVANCES.values()), 0)
+
+    for obj in objects:
+        if isinstance(obj, (ui.Button, ui.ImageView)) and \
+           obj._image is not None:
+            add("widget images", type(obj).__name__, obj._image)
+
+    for snapshot in list(board._SNAPSHOTS):
+        add("opponent snapshots", _size_name(snapshot), snapshot)
+
+    for obj in objects:
+        if isinstance(obj, ui.Scene) and obj._background is not None:
+            add("scene backgrounds", _size_name(obj._background),
+                obj._background)
+
+    add_python("layouts", "entries", _cache_contents(board.get_layout),
+               board.get_layout.cache_info().currsize)
+    return owners
+
+
+def print_report(parts=5):
+    """Print how much each owner holds, with its largest parts.
+
+    Parameters:
+        parts - int number of parts to list under each owner.
+    """
+    owners = report()
+    total = sum(o["bytes"] for o in owners.values())
+    print(f"{'owner':<22}{'count':>7}{'MiB':>10}")
+    for owner, o in owners.items():
+        print(f"{owner:<22}{o['count']:>7}{o['bytes'] / 2**20:>10.2f}")
+        largest = sorted(o["by"].items(), key=lambda item: -item[1])
+        for part, size in largest[:parts]:
+            if size:
+                print(f"    {part:<30}{size / 2**20:>7.2f}")
+    print(f"{'total':<29}{total / 2**20:>10.2f}")
@@ -23,19 +23,21 @@ new Defending Pokemon is now Asleep.
 @attack
 def f_11bb5ae003d091cb83c5(user, attacker, opponent, target, damage, space,
                            screen, check_event):
-    valid = bench_of(opponent, 3 - space)
+    defending = 3 - space
+    valid = bench_of(opponent, defending)
 
-    if not valid:
+    if valid:
         help_text = "Choose one of the opponent's Pokemon to switch with the" \
                     " target."
         space_b = user.front_line_opponent(screen, check_event, opponent,
                                            valid, help_text=help_text)
         if space_b == None:
             space_b = valid[0]
-        opponent.front_line[space] = opponent.front_line[space_b]
-        opponent.front_line[space_b] = target
+        opponent.front_line[defending], opponent.front_line[space_b] = \
+            opponent.front_line[space_b], opponent.front_line[defending]
 
-    opponent.front_line[space].afflict('asleep')
+    if opponent.front_line[defending]:
+        opponent.front_line[defending].afflict('asleep')
 
 
 """U-turn
@@ -65,7 +67,8 @@ The Defending Pokemon is now Asleep.
 @attack
 def f_3ac392dc9a1025b9b48e(user, attacker, opponent, target, damage, space,
                            screen, check_event):
-    target.afflict("asleep")
+    if target is not opponent:
+        target.afflict("asleep")
 
 
 """Splash Arch
@@ -119,6 +122,8 @@ Pokemon.
 @attack
 def f_7badaa956278e1accc4d(user, attacker, opponent, target, damage, space,
                            screen, check_event):
+    if target is opponent:
+        return damage
     energy = target.energy()
     for e in energy:
         damage += 30 * energy[e]
@@ -148,5 +153,5 @@ Flip a coin. If heads, your opponent's Active Pokemon is now Paralyzed.
 @attack
 def f_80bb2a9da8285b74151c(user, attacker, opponent, target, damage, space,
                            screen, check_event):
-    if random.randint(0, 1):
+    if target is not opponent and random.randint(0, 1):
         target.afflict('paralyzed')
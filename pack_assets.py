@@ -0,0 +1,64 @@
+"""Bundle the game's assets into one pack file.
+
+Every file in SOURCES is written, byte for byte, into `assets.pack` after a
+JSON index of where each one lives. `assetpack` memory-maps the pack and
+serves assets from it, so starting the game opens one file instead of one
+per card, which is what's slow on a network filesystem.
+
+Each file's size and modification time are kept in the index, and a file
+that has changed since, or is missing from the pack, is read from disk
+instead. Run `pack_atlas.py` first, then this, whenever assets change, so
+they're served from the pack again.
+
+This file should not be imported.
+"""
+
+import os
+import json
+
+from assetpack import PACK_PATH, MAGIC, HEADER
+
+SOURCES = ["assets/atlas", "assets/card", "assets/data", "assets/energy",
+           "assets/font", "assets/img"]
+
+
+def collect_files():
+    """Return a sorted list of the path of every file to be packed."""
+    paths = []
+    for source in SOURCES:
+        for folder, _, filenames in os.walk(source):
+            for filename in filenames:
+                path = os.path.join(folder, filename)
+                paths.append(path.replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def build_pack():
+    """Write every file in SOURCES to PACK_PATH, behind an index."""
+    index = {}
+    blobs = []
+    offset = 0
+    for path in collect_files():
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        index[path] = [offset, len(blobs[-1]), mtime]
+        offset += len(blobs[-1])
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    tmp_path = PACK_PATH + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for blob in blobs:
+            f.write(blob)
+
+    # a game starting mid-build never sees a half-written pack
+    os.replace(tmp_path, PACK_PATH)
+
+    print(f"Packed {len(index)} files ({offset / 2 ** 20:.1f} MiB) "
+          f"into {PACK_PATH}.")
+
+
+if __name__ == "__main__":
+    build_pack()
@@ -0,0 +1,115 @@
+"""Pack card art into atlas sheets.
+
+Every image in `assets/card` and every energy card in `assets/energy` is
+scaled to the largest size it gets drawn at and packed into one or more
+sheets in `assets/atlas`, along with a JSON index of where each card lives.
+`pkmn.card_atlas` serves cards from these sheets as subsurfaces.
+
+Run this again whenever card art is added or changed. Cards missing from the
+index are still loaded from their own files, but a card whose art changed
+is drawn from its old copy in the atlas until this is run. The atlas is
+committed, and checking out resets file times, so there's nothing cheap to
+tell a changed file by.
+
+This file should not be imported.
+"""
+
+import os
+import json
+
+import pygame
+
+SOURCES = ["assets/card", "assets/energy"]
+OUT_DIR = "assets/atlas"
+INDEX = os.path.join(OUT_DIR, "cards.json")
+
+CARD_H = 342        # height of the card scans, the biggest we ever draw them
+SHEET_SIZE = 2048
+PADDING = 1
+
+
+def collect_images():
+    """Return a dict of {name: Surface} for every card image to be packed.
+
+    Names are the file's path relative to `assets`, without extension, e.g.
+    "card/fs050shellder" or "energy/water".
+    """
+    images = {}
+    for source in SOURCES:
+        for filename in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() not in (".png", ".jpg"):
+                continue
+            if source == "assets/energy" and stem == "tiles":
+                continue
+            loaded = pygame.image.load(os.path.join(source, filename))
+            w, h = loaded.get_size()
+
+            # card scans are palettized, which smoothscale can't handle
+            image = pygame.Surface((w, h), pygame.SRCALPHA, 32)
+            image.blit(loaded, (0, 0))
+            if h > CARD_H:
+                size = ((w * CARD_H) // h, CARD_H)
+                image = pygame.transform.smoothscale(image, size)
+            name = f"{os.path.basename(source)}/{stem}"
+            images[name] = image
+    return images
+
+
+def pack(sizes):
+    """Place rectangles on as few sheets as possible, shelf by shelf.
+
+    Parameters:
+        sizes - dict of {name: (w, h)}.
+
+    Returns:
+        dict of {name: (sheet, x, y, w, h)} and the number of sheets used.
+    """
+    placed = {}
+    sheet, x, y, shelf_h = 0, 0, 0, 0
+    for name in sorted(sizes, key=lambda n: -sizes[n][1]):
+        w, h = sizes[name]
+        if x + w > SHEET_SIZE:
+            x, y, shelf_h = 0, y + shelf_h + PADDING, 0
+        if y + h > SHEET_SIZE:
+            sheet, x, y, shelf_h = sheet + 1, 0, 0, 0
+        placed[name] = (sheet, x, y, w, h)
+        x += w + PADDING
+        shelf_h = max(shelf_h, h)
+    return placed, sheet + 1
+
+
+def build_atlas():
+    """Pack every card image and write the sheets and index to OUT_DIR."""
+    images = collect_images()
+    placed, n_sheets = pack({name: images[name].get_size()
+                             for name in images})
+
+    # trim each sheet to the area actually used
+    extents = [[0, 0] for _ in range(n_sheets)]
+    for sheet, x, y, w, h in placed.values():
+        extents[sheet][0] = max(extents[sheet][0], x + w)
+        extents[sheet][1] = max(extents[sheet][1], y + h)
+
+    sheets = [pygame.Surface(size, pygame.SRCALPHA, 32) for size in extents]
+    for name, (sheet, x, y, _, _) in placed.items():
+        sheets[sheet].blit(images[name], (x, y))
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    filenames = []
+    for i, surface in enumerate(sheets):
+        filenames.append(f"cards{i}.png")
+        pygame.image.save(surface, os.path.join(OUT_DIR, filenames[-1]))
+
+    # one card per line, in the same spirit as assets/energy/tiles.json
+    lines = [f'        "{name}": {json.dumps(list(placed[name]))}'
+             for name in sorted(placed)]
+    with open(INDEX, 'w', encoding='utf-8') as f:
+        f.write('{\n    "sheets": ' + json.dumps(filenames) + ',\n')
+        f.write('    "cards": {\n' + ',\n'.join(lines) + '\n    }\n}\n')
+
+    print(f"Packed {len(placed)} cards onto {n_sheets} sheet(s).")
+
+
+if __name__ == "__main__":
+    build_atlas()
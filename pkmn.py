@@ -1,20 +1,184 @@
 import os
-import json
+import threading
 from collections import defaultdict
+from concurrent import futures
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import lru_cache
 
-import pygame
-pygame.init()
-
+import assetpack
 from moves import move_by_id
 
-with open("assets/energy/tiles.json", 'r', encoding='utf-8') as f:
-    ENERGY_TILE_DATA = json.load(f)
-ENERGY_TILES = pygame.image.load("assets/energy/tiles.png")
+# pygame is imported where it's needed, so that game logic can be used
+# without loading it, e.g. for simulations.
+
+PKMN_DATA = "assets/data/pkmn_fs.json"
+ATLAS_INDEX = "assets/atlas/cards.json"
+CARD_SIZE = (245, 342)  # size of a card scan, used until its image loads
+
+_LOADER = ThreadPoolExecutor(max_workers=4, thread_name_prefix="card-loader")
+_ATLAS_LOCK = threading.Lock()    # also guards _pending and _loaded
+_pending = set()
+_loaded = 0     # images finished loading, see images_loaded
+_use_images = True
+
+@lru_cache(1)
+def pokemon_data():
+    """Load the card database, as a dict of {id: dict of attributes}."""
+    return assetpack.load_json(PKMN_DATA)
+
+
+@lru_cache(1)
+def energy_tiles():
+    """Load the energy orb tile sheet.
+
+    Returns:
+        dict of tiles.json, with each orb's offset into the sheet.
+        pygame Surface of the sheet.
+    """
+    return (assetpack.load_json("assets/energy/tiles.json"),
+            assetpack.load_image("assets/energy/tiles.png"))
+
+
+def use_images(enabled):
+    """Choose whether cards created from now on load their pictures.
+
+    Simulations and servers never draw a card, so they turn this off to skip
+    loading art entirely. Cards without pictures are drawn as cardbacks.
+    """
+    global _use_images
+    _use_images = enabled
+
+
+def init():
+    """Load the card database and start loading card art in the background.
+
+    Nothing is loaded when this module is imported. Everything loads when
+    first used anyway, but calling this before opening a window lets the
+    loading happen while the window opens.
+    """
+    pokemon_data()
+    shared_cardback()
+
+
+@lru_cache(1)
+def _card_atlas():
+    """Load the packed card sheets built by `pack_atlas.py`.
+
+    Returns:
+        dict of {name: Surface}, where each Surface is a subsurface of one of
+        the sheets and name is like "card/fs050shellder". Empty if the atlas
+        has not been built.
+    """
+    import pygame
+
+    if not assetpack.exists(ATLAS_INDEX):
+        return {}
+    index = assetpack.load_json(ATLAS_INDEX)
+    folder = os.path.dirname(ATLAS_INDEX)
+    sheets = []
+    for filename in index['sheets']:
+        loaded = assetpack.load_image(f"{folder}/{filename}")
+
+        # PNGs decode as RGBA, which blits far slower than native ARGB
+        sheet = pygame.Surface(loaded.get_size(), pygame.SRCALPHA, 32)
+        sheet.blit(loaded, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        sheets.append(sheet)
+    return {name: sheets[i].subsurface((x, y, w, h))
+            for name, (i, x, y, w, h) in index['cards'].items()}
+
+
+def card_atlas():
+    """Load the packed card sheets built by `pack_atlas.py`.
+
+    Safe to call from several threads; the sheets are only loaded once.
+
+    Returns:
+        dict of {name: Surface}, where each Surface is a subsurface of one of
+        the sheets and name is like "card/fs050shellder". Empty if the atlas
+        has not been built.
+    """
+    with _ATLAS_LOCK:
+        return _card_atlas()
+
+
+def load_card_image(name):
+    """Get a card's image, from the atlas if possible.
+
+    Parameters:
+        name - str of the image's path within assets, EXCLUDING EXTENSION.
+               For example, "card/fs050shellder" or "energy/water".
+
+    Returns:
+        Pygame Surface object, or None if no such image exists.
+    """
+    atlas = card_atlas()
+    if name in atlas:
+        return atlas[name]
+    for ext in ("png", "jpg"):
+        if assetpack.exists(f"assets/{name}.{ext}"):
+            return assetpack.load_image(f"assets/{name}.{ext}")
+    return None
+
+
+def load_card_image_async(name, fallback=None):
+    """Start loading a card's image on a background thread.
+
+    Parameters:
+
+        name     - str of the image's path within assets, as for
+                   `load_card_image`.
+
+        fallback - str of another image to load if name doesn't exist.
+
+    Returns:
+        concurrent.futures.Future of the pygame Surface.
+    """
+    def load():
+        image = load_card_image(name)
+        if image is None and fallback is not None:
+            image = load_card_image(fallback)
+        return image
+
+    future = _LOADER.submit(load)
+    with _ATLAS_LOCK:
+        _pending.add(future)
+    future.add_done_callback(_finish_loading)
+    return future
+
+
+def _finish_loading(future):
+    global _loaded
+    with _ATLAS_LOCK:
+        _pending.discard(future)
+        _loaded += 1
+
+
+def images_loading():
+    """Return True if any card images are still loading."""
+    return bool(_pending)
+
+
+def images_loaded():
+    """Get how many card images have finished loading so far.
+
+    Anything drawn before this last changed may be missing pictures, so
+    screens that keep a drawing of the board compare it to redraw.
+    """
+    return _loaded
+
+
+def wait_for_images():
+    """Block until every card image started so far has loaded.
+
+    Images started while waiting are waited for too.
+    """
+    while True:
+        with _ATLAS_LOCK:
+            pending = [f for f in _pending if not f.done()]
+        if not pending:
+            return
+        futures.wait(pending)
 
-PKMN = {}
-with open("assets/data/pkmn_fs.json", 'r', encoding='utf-8') as f:
-    PKMN |= json.load(f)
 
 @lru_cache(128)
 def fit_within(outer, inner):
@@ -42,23 +206,62 @@ def fit_within(outer, inner):
     return x, y, w, h
 
 
-@lru_cache(32)
+@lru_cache(36)   # every energy at four sizes, e.g. units and action panels
 def energy_orb(name, new_length):
-    length = ENERGY_TILE_DATA['sidelength']
+    """Get the orb image of an energy type, scaled to a square.
+
+    Orbs are cached by energy and size, so screens drawing orbs at a few
+    sizes each reuse their own, and sizes left behind by old window sizes
+    are dropped once unused.
+
+    Parameters:
+
+        name       - str of energy name, as it appears in tiles.json.
+
+        new_length - int of side length to scale to.
+    """
+    import pygame
+
+    tile_data, tiles = energy_tiles()
+    length = tile_data['sidelength']
     surface = pygame.Surface((length, length), pygame.SRCALPHA, 32)
-    offset = ENERGY_TILE_DATA[name]
-    surface.blit(ENERGY_TILES, (-offset[0], -offset[1]))
-    surface = pygame.transform.smoothscale(surface, (new_length, new_length))
-    return surface
+    offset = tile_data[name]
+    surface.blit(tiles, (-offset[0], -offset[1]))
+    return pygame.transform.smoothscale(surface, (new_length, new_length))
 
 
 class Card:
 
     def __init__(self, image):
-        self._orig_image = image
-        self._image = image
-        self._w, self._h = image.get_size()
+        """Create a card with the given picture.
+
+        Parameters:
+            image - pygame Surface, or a Future that will give one. Until it
+                    does, the card is drawn as a cardback, as it always is
+                    if image is None.
+        """
         self._x, self._y = 0, 0
+        if image is None or isinstance(image, Future):
+            self._source = image
+            self._orig_image = None
+            self._image = None
+            self._w, self._h = CARD_SIZE
+        else:
+            self._source = None
+            self._orig_image = image
+            self._image = image
+            self._w, self._h = image.get_size()
+
+    def ready(self):
+        """Return True once this card's image has loaded."""
+        if self._orig_image is None and self._source is not None and \
+           self._source.done():
+            image = self._source.result()
+            if image is not None:
+                self._orig_image = image
+                self._image = image
+                self._w, self._h = image.get_size()
+        return self._orig_image is not None
 
     @staticmethod
     def cardback():
@@ -67,8 +270,7 @@ class Card:
         Generally, you should create one of these and re-use it for all
         card backs.
         """
-        image = pygame.image.load("assets/card/cardback.png")
-        return Card(image)
+        return Card(load_card_image_async("card/cardback"))
     
     def set_rect(self, x=None, y=None, w=None, h=None):
         """Set position and dimensions of this card.
@@ -104,9 +306,17 @@ class Card:
         """
         if centered:
             rect = (rect[0]-rect[2]//2, rect[1]-rect[3]//2, rect[2], rect[3])
+        if not self.ready():
+            self._x, self._y, self._w, self._h = fit_within(rect, CARD_SIZE)
+            cardback = shared_cardback()
+            if self is not cardback and cardback.ready():
+                cardback.render(screen, rect)
+            return
         x, y, w, h = fit_within(rect, self._orig_image.get_size())
         self._x, self._y = x, y
         if w != self._w and h != self._h:
+            import pygame
+
             try:
                 self._image = pygame.transform.smoothscale(self._orig_image,
                                                           (w, h))
@@ -115,6 +325,10 @@ class Card:
             self._w, self._h = w, h
         screen.blit(self._image, (x, y))
 
+    def rect(self):
+        """Get (x, y, w, h) of where this card was last drawn."""
+        return self._x, self._y, self._w, self._h
+
     def contains_point(self, pos):
         """Return True if the given pos lies on this card.
         
@@ -134,9 +348,15 @@ class Energy(Card):
              "psychic", "steel", "water"]
 
     def __init__(self, name):
-        super().__init__(pygame.image.load(f"assets/energy/{name}.png"))
+        super().__init__(Energy._image(name) if _use_images else None)
         self._name = name
         self._placement = "energy"
+
+    @staticmethod
+    @lru_cache(None)
+    def _image(name):
+        """Start loading an energy's image, once for all cards of that type."""
+        return load_card_image_async(f"energy/{name}")
     
     def name(self):
         """Get name attribute."""
@@ -148,10 +368,19 @@ class Energy(Card):
 
 
 class Unit(Card):
+    AFFLICTION_COLORS = {
+        'paralyzed': (245, 245, 0),
+        'asleep': (245, 245, 245),
+        'poisoned': (125, 0, 140),
+        'confused': (0, 245, 245),
+        'burned': (245, 125, 0)
+    }
 
     def __init__(self, name, image, hp, element, moves, retreat_cost,
-                 weakness, resistance, abilities, pre_evo, attributes):
+                 weakness, resistance, abilities, pre_evo, attributes,
+                 card_id=None):
         super().__init__(image)
+        self._card_id = card_id
         self._name = name
         self._hp = hp
         self._max_hp = hp
@@ -169,10 +398,25 @@ class Unit(Card):
 
         self._energy = defaultdict(lambda: 0)
         self._affliction = None
+
+        self._overlay = None
+        self._overlay_key = None
     
     def name(self):
         """Get name attribute."""
         return self._name
+
+    def card_id(self):
+        """Get the id of this unit's entry in the card database."""
+        return self._card_id
+
+    def hp(self):
+        """Get the hit points this unit has left."""
+        return self._hp
+
+    def max_hp(self):
+        """Get the hit points this unit starts with."""
+        return self._max_hp
     
     def element(self):
         """Get element attribute."""
@@ -259,15 +503,38 @@ class Unit(Card):
         self.render(screen, rect)
         x, y, w, h = fit_within(rect, (self._w, self._h))
 
-        # energy orbs
+        key = (tuple(self._energy.items()), self._hp, self._affliction, w, h)
+        if key != self._overlay_key:
+            self._overlay = self._compose_overlay(w, h)
+            self._overlay_key = key
+        screen.blit(self._overlay, (x, y))
+
+    def _compose_overlay(self, w, h):
+        """Draw the energy orbs and health bar onto a transparent Surface.
+
+        Parameters:
+            w, h - Dimensions of the card, as drawn.
+
+        Returns:
+            pygame.Surface to be drawn with its top-left on the card's.
+        """
+        import pygame
+
         orb_len = w // 5
-        orb_x = x
-        orb_y = y + h
+        n_orbs = sum(self._energy.values())
+        rows = (n_orbs + 4) // 5
+        surface = pygame.Surface((w, h + rows * orb_len), pygame.SRCALPHA, 32)
+
+        # energy orbs
+        orb_x = 0
+        orb_y = h
         a = 0
         for e in self._energy:
+            if not self._energy[e]:
+                continue
             img = energy_orb(e, orb_len)
             for _ in range(self._energy[e]):
-                screen.blit(img, (orb_x, orb_y))
+                surface.blit(img, (orb_x, orb_y))
                 orb_x += orb_len
                 a += 1
                 if a > 4:
@@ -276,24 +543,18 @@ class Unit(Card):
                     orb_y += orb_len
         
         # health bar
-        colors = {
-            'paralyzed': (245, 245, 0),
-            'asleep': (245, 245, 245),
-            'poisoned': (125, 0, 140),
-            'confused': (0, 245, 245),
-            'burned': (245, 125, 0)
-        }
         if self._affliction is not None:
-            color = colors[self._affliction]
+            color = Unit.AFFLICTION_COLORS[self._affliction]
         else:
             color = (0, 245, 0)
         bar_w = (4 * w) // 5
         green_w = (bar_w * self._hp) // self._max_hp
-        x, y = x + (w // 10), y + (h // 10)
+        x, y = w // 10, h // 10
         bar_h = h // 20
-        pygame.draw.rect(screen, (0, 0, 0), (x, y, bar_w, bar_h))
-        pygame.draw.rect(screen, color, (x, y, green_w, bar_h))
-        pygame.draw.rect(screen, (0, 0, 0), (x, y, bar_w, bar_h), 2)
+        pygame.draw.rect(surface, (0, 0, 0), (x, y, bar_w, bar_h))
+        pygame.draw.rect(surface, color, (x, y, green_w, bar_h))
+        pygame.draw.rect(surface, (0, 0, 0), (x, y, bar_w, bar_h), 2)
+        return surface
     
     def sufficient_energy(self, energy):
         """Check if this unit has enough energy for some action.
@@ -493,7 +754,7 @@ class Pokemon:
         Parameters:
             name - str identifying the Pokemon, as it appears in pkmn.json.
         """
-        return Pokemon.from_dict(PKMN[name])
+        return Pokemon.from_dict(pokemon_data()[name])
     
     @staticmethod
     def from_dict(d):
@@ -558,29 +819,25 @@ class Pokemon:
         return lambda x: x
 
     def load_image(self, img_id):
-        """Create a Pygame Surface object of the given file.
+        """Start loading the given card image in the background.
 
         Parameters:
             img_id - str of image name, EXCLUDING EXTENSION.
 
         Returns:
-            Pygame Surface object.
+            Future of a Pygame Surface object, shared by every Unit built
+            from this Pokemon, or None if images are turned off.
         """
-        if os.path.exists(f"assets/card/{img_id}.png"):
-            filepath = f"assets/card/{img_id}.png"
-        elif os.path.exists(f"assets/card/{img_id}.jpg"):
-            filepath = f"assets/card/{img_id}.jpg"
-        else:
-            filepath = "assets/card/cardback.jpg"
-
-        return pygame.image.load(filepath)
+        if not _use_images:
+            return None
+        return load_card_image_async(f"card/{img_id}", "card/cardback")
 
     def build_unit(self):
         """Create a new Unit object with this Pokemon's attributes."""
         return Unit(self._name, self._image, self._max_hp, self._element,
                     self._moves[:], self._retreat_cost, self._weakness,
                     self._resistance, self._abilities[:], self._pre_evo,
-                    self.attributes.copy())
+                    self.attributes.copy(), self._img_id)
 
 
 class Move:
@@ -665,4 +922,7 @@ class Move:
                                 fl_spot, screen, check_event)
 
 
-CARDBACK = Card.cardback()
+@lru_cache(1)
+def shared_cardback():
+    """Get the one cardback Card that every face-down card is drawn with."""
+    return Card.cardback()
@@ -0,0 +1,367 @@
+import json
+import time
+import select
+import socket
+import struct
+from functools import lru_cache
+
+import pkmn
+import engine
+
+PORT = 7777
+KEYFRAME_INTERVAL = 16  # states sent to a seat per keyframe
+RESYNC_AFTER = 2.0      # seconds of quiet before a client checks it's current
+
+# Everything sent either way is a frame: a FRAME header giving its kind and
+# the length of the payload that follows.
+#
+#   MESSAGE   a JSON object with an "op":
+#
+#     client to server
+#       {"op": "join", "room": str, "deck": dict}  sit down at a table
+#       {"op": "watch", "room": str}               spectate a table
+#       {"op": "act", "action": list}              take a turn, see engine
+#       {"op": "resync", "seq": int or None}       ask for a keyframe unless
+#                                                  seq is the latest sent
+#
+#     server to client
+#       {"op": "joined", "room": str, "seat": int} seat 0 goes first
+#       {"op": "watching", "room": str}            now spectating
+#       {"op": "error", "message": str}            a message was refused
+#       {"op": "left"}                             the opponent disconnected
+#
+#   KEYFRAME  the whole game as the seat, or a spectator, sees it, see
+#             `flatten`:
+#             SEQ, FIELDS int16 fields, then the hand
+#
+#   DELTA     the fields that changed since the frame numbered SEQ - 1:
+#             SEQ, COUNT changes of CHANGE, then the hand, or UNCHANGED
+#
+# A hand is a COUNT, then that many CARD codes, see `card_keys`. A client
+# that misses a frame ignores deltas until the next keyframe, asking for
+# one with "resync" rather than waiting for the next one due. Since a lost
+# frame only shows once a later one arrives, a client that hears nothing
+# for RESYNC_AFTER seconds sends the last SEQ it has (None before its first
+# keyframe), which costs the server nothing to answer when it's current.
+FRAME = struct.Struct("<BH")    # kind, payload length
+MESSAGE, KEYFRAME, DELTA = range(3)
+MAX_PAYLOAD = 2 ** 16 - 1
+SEQ = struct.Struct("<I")
+COUNT = struct.Struct("<B")
+CHANGE = struct.Struct("<Bh")   # field index, new value
+CARD = struct.Struct("<H")
+UNCHANGED = 255
+
+AFFLICTIONS = (None, "asleep", "burned", "confused", "paralyzed", "poisoned")
+GAME_FIELDS = 4     # seat (-1 for spectators), turn, winner, over
+UNIT_FIELDS = 3 + len(pkmn.Energy.NAMES)   # card, hp, affliction, energies
+# each slot, then the sizes of the hand, deck, prize cards and discard pile
+SIDE_FIELDS = engine.SLOTS * UNIT_FIELDS + 4
+FIELDS = GAME_FIELDS + 2 * SIDE_FIELDS
+KEYFRAME_FIELDS = struct.Struct(f"<{FIELDS}h")
+
+
+@lru_cache(1)
+def card_keys():
+    """Get the `engine.card_key` of every card, indexed by its code.
+
+    Code 0 is no card. Both ends number cards from the same database.
+    """
+    return [None] + pkmn.Energy.NAMES + sorted(pkmn.pokemon_data())
+
+
+@lru_cache(1)
+def card_codes():
+    """Get a dict of {card key: code}, the inverse of `card_keys`."""
+    return {key: code for code, key in enumerate(card_keys())}
+
+
+def flatten(state):
+    """Turn a dict from `engine.Game.state` into what's sent of it.
+
+    Returns:
+        list of FIELDS ints: the game, then each side's front line slots
+        and the size of each pile.
+        list of the codes of the cards in the looking seat's hand.
+    """
+    codes = card_codes()
+    winner = state["winner"]
+    seat = state["seat"]
+    fields = [-1 if seat is None else seat, state["turn"],
+              -1 if winner is None else winner, int(state["over"])]
+    hand = []
+    for side in state["sides"]:
+        for unit in side["front_line"]:
+            if unit is None:
+                fields.extend([0] * UNIT_FIELDS)
+                continue
+            fields.append(codes[unit["id"]])
+            fields.append(unit["hp"])
+            fields.append(AFFLICTIONS.index(unit["affliction"]))
+            fields.extend(unit["energy"].get(name, 0)
+                          for name in pkmn.Energy.NAMES)
+        fields.extend((side["hand_size"], side["deck_size"],
+                       side["prize_cards"], side["discard_size"]))
+        if side["hand"] is not None:
+            hand = [codes[key] for key in side["hand"]]
+    return fields, hand
+
+
+def unflatten(fields, hand):
+    """Turn what `flatten` gives back into a dict like `engine.Game.state`.
+
+    The number of turns played isn't sent, so it's missing.
+    """
+    keys = card_keys()
+    seat, turn, winner, over = fields[:GAME_FIELDS]
+    sides = []
+    i = GAME_FIELDS
+    for s in range(2):
+        front_line = []
+        for _ in range(engine.SLOTS):
+            unit = fields[i:i + UNIT_FIELDS]
+            i += UNIT_FIELDS
+            if unit[0] == 0:
+                front_line.append(None)
+                continue
+            front_line.append({
+                "id": keys[unit[0]],
+                "hp": unit[1],
+                "affliction": AFFLICTIONS[unit[2]],
+                "energy": {name: n for name, n in
+                           zip(pkmn.Energy.NAMES, unit[3:]) if n}
+            })
+        hand_size, deck_size, prize_cards, discard_size = fields[i:i + 4]
+        i += 4
+        sides.append({
+            "front_line": front_line,
+            "hand": [keys[code] for code in hand] if s == seat else None,
+            "hand_size": hand_size,
+            "deck_size": deck_size,
+            "prize_cards": prize_cards,
+            "discard_size": discard_size
+        })
+    return {"seat": None if seat < 0 else seat, "turn": turn,
+            "winner": None if winner < 0 else winner, "over": bool(over),
+            "sides": sides}
+
+
+def _frame(kind, payload):
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+def _pack_hand(hand):
+    return COUNT.pack(len(hand)) + b"".join(CARD.pack(c) for c in hand)
+
+
+def _unpack_hand(payload, offset):
+    count, = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    hand = [CARD.unpack_from(payload, offset + CARD.size * i)[0]
+            for i in range(count)]
+    return hand, offset + CARD.size * count
+
+
+def encode(msg):
+    """Encode a message as a MESSAGE frame.
+
+    Parameters:
+        msg - dict with at least an "op".
+    """
+    return _frame(MESSAGE,
+                  json.dumps(msg, separators=(",", ":")).encode("utf-8"))
+
+
+def decode(payload):
+    """Decode the payload of a MESSAGE frame.
+
+    Raises ValueError if it isn't a JSON object with an "op".
+    """
+    msg = json.loads(payload)
+    if not isinstance(msg, dict) or "op" not in msg:
+        raise ValueError("Messages must be objects with an op.")
+    return msg
+
+
+class Encoder:
+    __slots__ = ("seq", "_fields", "_hand", "_keyframe")
+
+    def __init__(self):
+        """Encode the states sent to one seat, each against the last.
+
+        Frames are bytes that can be sent to any number of clients, so one
+        Encoder serves every spectator of a game.
+        """
+        self.seq = 0
+        self._fields = None
+        self._hand = None
+        self._keyframe = None
+
+    def encode(self, state, keyframe=False):
+        """Encode a state as a DELTA frame, or a KEYFRAME when one is due.
+
+        Parameters:
+
+            state    - dict from `engine.Game.state`.
+
+            keyframe - If True, send a keyframe even if one isn't due.
+        """
+        fields, hand = flatten(state)
+        self.seq += 1
+        seq = SEQ.pack(self.seq)
+        if keyframe or self._fields is None or \
+           self.seq % KEYFRAME_INTERVAL == 0:
+            frame = _frame(KEYFRAME, seq + KEYFRAME_FIELDS.pack(*fields) +
+                           _pack_hand(hand))
+        else:
+            changes = [CHANGE.pack(i, value) for i, (value, old) in
+                       enumerate(zip(fields, self._fields)) if value != old]
+            frame = _frame(DELTA, b"".join((
+                seq, COUNT.pack(len(changes)), *changes,
+                COUNT.pack(UNCHANGED) if hand == self._hand
+                else _pack_hand(hand))))
+        self._fields = fields
+        self._hand = hand
+        self._keyframe = frame if frame[0] == KEYFRAME else None
+        return frame
+
+    def keyframe(self):
+        """Get a KEYFRAME of the last state encoded, numbered as it was.
+
+        It's made at most once per state, however many clients ask, and the
+        next delta follows it just as it follows the frame it repeats.
+        """
+        if self._keyframe is None:
+            self._keyframe = _frame(KEYFRAME, SEQ.pack(self.seq) +
+                                    KEYFRAME_FIELDS.pack(*self._fields) +
+                                    _pack_hand(self._hand))
+        return self._keyframe
+
+
+class Decoder:
+
+    def __init__(self):
+        """Rebuild states from the frames an Encoder made."""
+        self.seq = None
+        self._fields = None
+        self._hand = None
+
+    def decode(self, kind, payload):
+        """Apply a KEYFRAME or DELTA frame.
+
+        Returns the state as a dict, see `unflatten`, or None if the frame
+        is a delta that doesn't follow the last frame applied, in which
+        case nothing can be applied until the next keyframe.
+        """
+        seq, = SEQ.unpack_from(payload)
+        offset = SEQ.size
+        if kind == KEYFRAME:
+            fields = list(KEYFRAME_FIELDS.unpack_from(payload, offset))
+            hand, _ = _unpack_hand(payload, offset + KEYFRAME_FIELDS.size)
+        else:
+            if self.seq is None or seq != self.seq + 1:
+                return None
+            fields = self._fields[:]
+            count, = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            for _ in range(count):
+                i, value = CHANGE.unpack_from(payload, offset)
+                fields[i] = value
+                offset += CHANGE.size
+            if payload[offset] == UNCHANGED:
+                hand = self._hand
+            else:
+                hand, _ = _unpack_hand(payload, offset)
+        self.seq = seq
+        self._fields = fields
+        self._hand = hand
+        return unflatten(fields, hand)
+
+
+class Connection:
+
+    def __init__(self, host, port=PORT):
+        """Connect to a server started by `server.py`.
+
+        This end is plain blocking sockets, so the game's own loop can poll
+        it between frames rather than running an event loop of its own.
+
+        Parameters:
+
+            host - str hostname or address of the server.
+
+            port - int port the server listens on.
+        """
+        self._sock = socket.create_connection((host, port))
+        self._buffer = b""
+        self._closed = False
+        self._decoder = Decoder()
+        self._resyncing = False
+        self._last_heard = time.monotonic()
+
+    def send(self, msg):
+        """Send one message to the server."""
+        self._sock.sendall(encode(msg))
+
+    def poll(self, timeout=0):
+        """Get every message that has arrived, waiting up to timeout seconds.
+
+        Keyframes and deltas are decoded into {"op": "state", "state": dict}
+        messages, with the dict as `unflatten` gives it.
+
+        Returns a list of messages, which is empty if none have arrived.
+        Raises ConnectionError once the server has closed the connection
+        and every message it sent before that has been read.
+        """
+        messages = self._take_messages()
+        if messages:
+            return messages
+        if self._closed:
+            raise ConnectionError("The server closed the connection.")
+
+        readable, _, _ = select.select([self._sock], [], [], timeout)
+        if readable:
+            data = self._sock.recv(MAX_PAYLOAD)
+            if not data:
+                self._closed = True
+            self._buffer += data
+            self._last_heard = time.monotonic()
+        elif time.monotonic() - self._last_heard > RESYNC_AFTER:
+            self.send({"op": "resync", "seq": self._decoder.seq})
+            self._last_heard = time.monotonic()
+        return self._take_messages()
+
+    def _take_frames(self):
+        """Split the complete frames off the buffer, as (kind, payload)."""
+        frames = []
+        offset = 0
+        while len(self._buffer) - offset >= FRAME.size:
+            kind, length = FRAME.unpack_from(self._buffer, offset)
+            end = offset + FRAME.size + length
+            if end > len(self._buffer):
+                break
+            frames.append((kind, self._buffer[offset + FRAME.size:end]))
+            offset = end
+        self._buffer = self._buffer[offset:]
+        return frames
+
+    def _take_messages(self):
+        """Decode the complete frames in the buffer."""
+        messages = []
+        for kind, payload in self._take_frames():
+            if kind == MESSAGE:
+                messages.append(decode(payload))
+                continue
+            state = self._decoder.decode(kind, payload)
+            if state is None:
+                if not self._resyncing:
+                    self.send({"op": "resync", "seq": None})
+                    self._resyncing = True
+            else:
+                self._resyncing = False
+                messages.append({"op": "state", "state": state})
+        return messages
+
+    def close(self):
+        """Close the connection."""
+        self._sock.close()
@@ -0,0 +1,79 @@
+import zlib
+import gzip
+import json
+import random
+import warnings
+
+import bots
+import engine
+
+# A replay is one line of JSON:
+#
+#     {"decks": [dict, dict], "seed": int, "max_turns": int or None,
+#      "actions": [list, ...], "winner": int or None, "turns": int}
+#
+# The decks are as in `decks`, the first going first. Replay files hold one
+# replay per line, and are gzipped if their names end in ".gz". A replay
+# is played back by dealing the decks from the seed and taking its actions
+# in turn, reseeding each turn as `bots.play_match` does.
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def record(deck1, deck2, bot1, bot2, seed, max_turns=None):
+    """Play one game between two bots, as for `bots.play_match`.
+
+    Returns the game as a replay dict.
+    """
+    actions = []
+    winner, turns = bots.play_match(deck1, deck2, bot1, bot2, seed,
+                                    max_turns, actions)
+    return {"decks": [deck1, deck2], "seed": seed, "max_turns": max_turns,
+            "actions": [list(action) for action in actions],
+            "winner": winner, "turns": turns}
+
+
+def write(path, replays):
+    """Write replays to a file, one per line, replacing what was there."""
+    with _open(path, "w") as f:
+        for r in replays:
+            f.write(json.dumps(r, separators=(",", ":")) + "\n")
+
+
+def read(path):
+    """Yield each replay in a file, reading one line at a time.
+
+    A line cut short, say by the game writing it being stopped, is skipped.
+    So is the end of a gzipped file that was cut short, with a warning;
+    the replays before it are still read.
+    """
+    with _open(path, "r") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except (EOFError, OSError, zlib.error) as e:
+            warnings.warn(f"{path} is cut short, skipping the rest: {e}")
+
+
+def replay(r):
+    """Play back a replay.
+
+    Yields (game, action) before each action is taken, with game the
+    engine.Game as it stands, then (game, None) once the game is over. The
+    same Game is stepped in place throughout.
+    """
+    seed = r["seed"]
+    random.seed(seed)
+    game = engine.Game.new(*r["decks"], r["max_turns"])
+    for action in r["actions"]:
+        yield game, tuple(action)
+        random.seed(bots.turn_seed(seed, game.turns))
+        game.step(action)
+    yield game, None
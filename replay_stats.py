@@ -0,0 +1,213 @@
+"""Tally how each Pokemon and move fares over files of replays.
+
+    python replay_stats.py replays/*.jsonl.gz
+    python replay_stats.py logs/ --workers 8 --out stats.json
+
+Each file is a shard read by one worker process, which plays its replays
+back one at a time, so memory stays flat however long the file is, and
+sums them into a partial tally. The tallies are added up as workers finish.
+Replays are written by `tournament.py --replays`, or `replay.record`.
+
+For each species this counts the games it was played in, the times it was
+played or evolved into, the damage it dealt, the prize cards it won, how
+often it fainted once played, and how many turns it took on average to
+evolve into it. For each move it counts uses, damage, prize cards won and
+knock outs.
+
+This file should not be imported.
+"""
+
+import os
+import glob
+import json
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pkmn
+import replay
+
+
+def _front_lines(game):
+    """Get each side's front line slots as a list of (unit, hit points)."""
+    return [[(unit, unit.hp() if unit else 0) for unit in side.front_line]
+            for side in game.sides]
+
+
+def _tally(stats, action, turn, before, prizes, game, placed):
+    """Add what one action did to stats.
+
+    Parameters:
+
+        stats  - Counter of {(kind, name, stat): count}.
+
+        action - tuple of the action taken.
+
+        turn   - int index of the side that took it.
+
+        before - `_front_lines` of the game before the action.
+
+        prizes - int prize cards the side had before the action.
+
+        game   - engine.Game after the action.
+
+        placed - dict of {id of unit: game.turns when it was placed}.
+    """
+    side = game.sides[turn]
+    evolved = None
+    if action[0] == "play":
+        unit = side.front_line[action[2]]
+        old = before[turn][action[2]][0]
+        if unit is not old:     # energy is attached to the unit there
+            species = unit.card_id()
+            stats["species", species, "played"] += 1
+            if old is not None:
+                evolved = old
+                stats["species", species, "evolved"] += 1
+                stats["species", species, "evolve_turns"] += \
+                    game.turns - placed.pop(id(old), game.turns)
+            placed[id(unit)] = game.turns
+
+    elif action[0] == "attack":
+        attacker = before[turn][action[1]][0]
+        species = attacker.card_id()
+        move = f"{species}/{attacker.moves()[action[2]].name()}"
+        defending = game.sides[1 - turn].front_line
+        # a unit knocked out is detached, which heals it, so it took all
+        # the hit points it had left
+        damage = sum(hp if unit not in defending else
+                     max(0, hp - max(unit.hp(), 0))
+                     for unit, hp in before[1 - turn] if unit)
+        won = prizes - len(side.prize_cards)
+        for kind, name in (("species", species), ("move", move)):
+            stats[kind, name, "damage"] += damage
+            stats[kind, name, "prizes"] += won
+        stats["move", move, "used"] += 1
+        stats["move", move, "knockouts"] += sum(
+            unit is not None and unit not in defending
+            for unit, _ in before[1 - turn])
+
+    for s, units in enumerate(before):
+        for unit, _ in units:
+            if unit is not None and unit is not evolved and \
+               unit not in game.sides[s].front_line:
+                stats["species", unit.card_id(), "fainted"] += 1
+                placed.pop(id(unit), None)
+
+
+def game_stats(r):
+    """Tally one replay, see `replay`.
+
+    Returns a Counter of {(kind, name, stat): count}, kind being "species",
+    "move" or "games".
+    """
+    stats = Counter()
+    placed = {}
+    last = None
+    for game, action in replay.replay(r):
+        if last is not None:
+            _tally(stats, *last, game, placed)
+        if action is None:
+            break
+        last = (action, game.turn, _front_lines(game),
+                len(game.current().prize_cards))
+
+    played = [name for kind, name, stat in stats
+              if kind == "species" and stat == "played"]
+    for species in played:
+        stats["species", species, "games"] += 1
+    stats["games", "all", "games"] += 1
+    stats["games", "all", "turns"] += r["turns"]
+    stats["games", "all", "draws"] += r["winner"] is None
+    return stats
+
+
+def shard_stats(path):
+    """Tally every replay in one file. Run in a worker process."""
+    stats = Counter()
+    for r in replay.read(path):
+        stats.update(game_stats(r))
+    return stats
+
+
+def summarize(stats):
+    """Turn a tally into a dict of {kind: {name: {stat: value}}}.
+
+    Rates and averages are worked out from the counts alongside them.
+    """
+    summary = {}
+    for (kind, name, stat), count in stats.items():
+        summary.setdefault(kind, {}).setdefault(name, {})[stat] = count
+    for s in summary.get("species", {}).values():
+        played = s.get("played", 0)
+        s["faint_rate"] = s.get("fainted", 0) / played if played else None
+        evolved = s.get("evolved", 0)
+        s["average_evolve_turns"] = \
+            s.get("evolve_turns", 0) / evolved if evolved else None
+    return summary
+
+
+def print_report(summary):
+    """Print the species and moves in a summary, most used first."""
+    species = summary.get("species", {})
+    print(f"{'species':<22}{'games':>7}{'played':>8}{'damage':>9}"
+          f"{'prizes':>8}{'faint':>7}{'evolve':>8}")
+    for name, s in sorted(species.items(),
+                          key=lambda item: -item[1].get("played", 0)):
+        faint = s["faint_rate"]
+        evolve = s["average_evolve_turns"]
+        print(f"{name:<22}{s.get('games', 0):>7}{s.get('played', 0):>8}"
+              f"{s.get('damage', 0):>9}{s.get('prizes', 0):>8}"
+              f"{'' if faint is None else f'{faint:.0%}':>7}"
+              f"{'' if evolve is None else f'{evolve:.1f}':>8}")
+    print()
+    moves = summary.get("move", {})
+    print(f"{'move':<40}{'used':>7}{'damage':>9}{'prizes':>8}{'KOs':>6}")
+    for name, m in sorted(moves.items(),
+                          key=lambda item: -item[1].get("used", 0)):
+        print(f"{name:<40}{m.get('used', 0):>7}{m.get('damage', 0):>9}"
+              f"{m.get('prizes', 0):>8}{m.get('knockouts', 0):>6}")
+
+
+def _init_worker():
+    pkmn.use_images(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tally species and move statistics over replays.")
+    parser.add_argument("paths", nargs="+",
+                        help="replay files, or folders of them")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to read on (default: one per CPU)")
+    parser.add_argument("--out", default=None,
+                        help="file to write the statistics to as JSON")
+    args = parser.parse_args()
+
+    shards = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            shards.extend(sorted(glob.glob(os.path.join(path, "*.jsonl*"))))
+        else:
+            shards.append(path)
+    if not shards:
+        parser.error("There are no replay files to read.")
+
+    stats = Counter()
+    with ProcessPoolExecutor(args.workers,
+                             initializer=_init_worker) as pool:
+        for partial in pool.map(shard_stats, shards):
+            stats.update(partial)
+
+    summary = summarize(stats)
+    games = summary.get("games", {}).get("all", {})
+    print(f"{games.get('games', 0)} games from {len(shards)} files, "
+          f"{games.get('draws', 0)} drawn.\n")
+    print_report(summary)
+    if args.out is not None:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
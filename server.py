@@ -0,0 +1,410 @@
+"""Host games of Pokemon for players connecting with `client.py`.
+
+    python server.py
+    python server.py --host 0.0.0.0 --port 7777
+
+One process serves any number of rooms at once on a single asyncio event
+loop. Each room is a table for two: the first player to join it goes first,
+and the game starts when the second sits down. Games are run by `engine`
+with card art turned off, so the server never loads pygame, and a room
+waiting for its second player holds little more than the first one's deck.
+
+Anyone can watch a room too. Each state is encoded once for all of its
+spectators and queued to each of them; one who falls behind skips ahead to
+a keyframe instead of holding up the game, and is dropped if they keep
+falling behind.
+
+Messages are described in `protocol`. States are sent to each player as
+deltas against the last one they were sent, with a keyframe now and then.
+"""
+
+import asyncio
+import argparse
+import traceback
+
+import pkmn
+import engine
+import protocol
+
+MAX_DECK = 60           # cards in the biggest deck the server accepts
+SPECTATOR_QUEUE = 32    # frames queued to a spectator before they skip
+MAX_SKIPS = 8           # skips in a row before a spectator is dropped
+WRITE_BUFFER = 2 ** 16  # bytes buffered for a spectator before queueing
+
+
+def deck_error(d):
+    """Get why a deck sent by a client can't be played, or None if it can.
+
+    Parameters:
+        d - Anything; a deck is a dict as in `decks`.
+    """
+    if not isinstance(d, dict) or not isinstance(d.get("pokemon"), dict) or \
+       not isinstance(d.get("energy"), dict):
+        return "A deck needs dicts of pokemon and energy."
+    for name in d["pokemon"]:
+        if name not in pkmn.pokemon_data():
+            return f"There is no card {name!r}."
+    for name in d["energy"]:
+        if name not in pkmn.Energy.NAMES:
+            return f"There is no {name!r} energy."
+    counts = list(d["pokemon"].values()) + list(d["energy"].values())
+    if not all(isinstance(n, int) and n >= 0 for n in counts):
+        return "Card counts must be whole numbers."
+    if not 0 < sum(counts) <= MAX_DECK:
+        return f"A deck must have between 1 and {MAX_DECK} cards."
+    return None
+
+
+class Spectator:
+    __slots__ = ("writer", "queue", "skips", "task")
+
+    def __init__(self, writer):
+        """Start sending queued frames to someone watching a room.
+
+        Parameters:
+            writer - asyncio StreamWriter of their connection.
+        """
+        self.writer = writer
+        self.queue = asyncio.Queue(SPECTATOR_QUEUE)
+        self.skips = 0
+        self.task = asyncio.get_running_loop().create_task(self._pump())
+
+    async def _pump(self):
+        """Write frames from the queue as fast as the connection takes them.
+
+        A None in the queue closes the connection once it's written out.
+        """
+        try:
+            while True:
+                frame = await self.queue.get()
+                if frame is None:
+                    break
+                self.writer.write(frame)
+                await self.writer.drain()
+                if self.queue.empty():
+                    self.skips = 0
+        except ConnectionError:
+            pass
+        finally:
+            self.writer.close()
+
+    def send(self, frame, keyframe=None):
+        """Queue a frame without waiting, whether or not there's room.
+
+        While they keep up, frames are written straight to the connection,
+        so the task writing out the queue only wakes when they fall behind.
+        If the queue is full, everything in it is thrown away and replaced
+        by keyframe, which must be the state as of this frame, so they skip
+        straight to where the game is.
+
+        Parameters:
+
+            frame    - bytes of the frame.
+
+            keyframe - Function returning the keyframe to skip to, or None
+                       to drop this frame if the queue is full.
+
+        Returns False if they have skipped MAX_SKIPS times in a row and
+        should be dropped.
+        """
+        if self.queue.empty() and \
+           self.writer.transport.get_write_buffer_size() < WRITE_BUFFER:
+            self.writer.write(frame)
+            return True
+        if not self.queue.full():
+            self.queue.put_nowait(frame)
+            return True
+        if keyframe is None:
+            return True
+        self.skips += 1
+        if self.skips > MAX_SKIPS:
+            return False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(keyframe())
+        return True
+
+    def close(self, frame=None, keyframe=None):
+        """Close the connection after sending what's queued and frame.
+
+        If there isn't room for them, everything queued before the newest
+        keyframe is thrown away, since it's superseded, and the deltas after
+        it are kept. If there still isn't room, everything queued is
+        replaced by keyframe, as in `send`.
+
+        Parameters:
+
+            frame    - bytes of a last frame to send, or None.
+
+            keyframe - As for `send`.
+        """
+        needed = 1 if frame is None else 2
+        if self.queue.qsize() > SPECTATOR_QUEUE - needed:
+            queued = []
+            while not self.queue.empty():
+                queued.append(self.queue.get_nowait())
+            starts = [i for i, queued_frame in enumerate(queued)
+                      if queued_frame[0] == protocol.KEYFRAME]
+            if starts:
+                queued = queued[starts[-1]:]
+            if len(queued) > SPECTATOR_QUEUE - needed:
+                queued = [] if keyframe is None else [keyframe()]
+            for queued_frame in queued:
+                self.queue.put_nowait(queued_frame)
+        if frame is not None:
+            self.queue.put_nowait(frame)
+        self.queue.put_nowait(None)
+
+    def drop(self):
+        """Close the connection now, throwing away anything queued."""
+        self.task.cancel()
+        self.writer.transport.abort()
+
+
+class Room:
+    __slots__ = ("name", "decks", "writers", "encoders", "game",
+                 "spectators", "spectator_encoder")
+
+    def __init__(self, name):
+        """Create an empty table.
+
+        Parameters:
+            name - str the players join it by.
+        """
+        self.name = name
+        self.decks = []
+        self.writers = []
+        self.encoders = []
+        self.game = None
+        self.spectators = set()
+        self.spectator_encoder = protocol.Encoder()
+
+    def send(self, seat, msg):
+        """Queue a message to the player in the given seat."""
+        self.writers[seat].write(protocol.encode(msg))
+
+    def send_state(self):
+        """Send each player and spectator the game as they see it."""
+        for seat in range(len(self.writers)):
+            state = self.game.state(seat)
+            self.writers[seat].write(self.encoders[seat].encode(state))
+
+        if self.spectators:
+            encoder = self.spectator_encoder
+            frame = encoder.encode(self.game.state(None))
+            for spectator in list(self.spectators):
+                if not spectator.send(frame, encoder.keyframe):
+                    self.spectators.discard(spectator)
+                    spectator.drop()
+
+    def close_spectators(self, msg=None):
+        """Disconnect every spectator, after sending them a message."""
+        frame = protocol.encode(msg) if msg is not None else None
+        encoder = self.spectator_encoder
+        keyframe = encoder.keyframe if encoder.seq else None
+        for spectator in self.spectators:
+            spectator.close(frame, keyframe)
+        self.spectators.clear()
+
+
+class Server:
+
+    def __init__(self, max_turns=None):
+        """Create a server with no rooms.
+
+        Parameters:
+            max_turns - As for engine.Game, for every game hosted.
+        """
+        self.rooms = {}
+        self.max_turns = max_turns
+
+    async def start(self, host="127.0.0.1", port=protocol.PORT):
+        """Start listening, returning the asyncio Server.
+
+        Parameters:
+
+            host - str address to listen on.
+
+            port - int port to listen on, or 0 to pick a free one.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        """Serve one player's or spectator's connection until they leave."""
+        room = None
+        seat = None
+        spectator = None
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(protocol.FRAME.size)
+                    kind, length = protocol.FRAME.unpack(header)
+                    payload = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    if kind != protocol.MESSAGE:
+                        raise ValueError("Clients only send messages.")
+                    msg = protocol.decode(payload)
+                except ValueError:
+                    msg = {"op": "error", "message": "Malformed message."}
+                    writer.write(protocol.encode(msg))
+                    continue
+
+                if spectator is not None:
+                    self.resync_spectator(room, spectator, msg)
+                    continue
+                if msg["op"] == "join" and room is None:
+                    room, seat = self.join(msg, writer)
+                elif msg["op"] == "watch" and room is None:
+                    room, spectator = self.watch(msg, writer)
+                elif msg["op"] == "act" and room is not None:
+                    self.act(room, seat, msg.get("action"))
+                elif msg["op"] == "resync" and room is not None:
+                    if room.game is not None and \
+                       msg.get("seq") != room.encoders[seat].seq:
+                        writer.write(room.encoders[seat].keyframe())
+                else:
+                    writer.write(protocol.encode(
+                        {"op": "error",
+                         "message": f"Unexpected {msg['op']!r}."}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if spectator is not None:
+                room.spectators.discard(spectator)
+                spectator.drop()
+            elif room is not None:
+                self.leave(room, seat)
+            writer.close()
+
+    def join(self, msg, writer):
+        """Seat a player in the room they asked for, if there's space.
+
+        Returns the Room and seat, or (None, None) if they weren't seated.
+        """
+        name = msg.get("room")
+        error = deck_error(msg.get("deck"))
+        if not isinstance(name, str):
+            error = "Rooms are named by a str."
+        elif error is None:
+            room = self.rooms.get(name)
+            if room is not None and len(room.writers) == 2:
+                error = f"Room {name!r} is full."
+        if error is not None:
+            writer.write(protocol.encode({"op": "error", "message": error}))
+            return None, None
+
+        room = self.rooms.setdefault(name, Room(name))
+        seat = len(room.writers)
+        room.decks.append(msg["deck"])
+        room.writers.append(writer)
+        room.encoders.append(protocol.Encoder())
+        room.send(seat, {"op": "joined", "room": name, "seat": seat})
+        if seat == 1:
+            room.game = engine.Game.new(room.decks[0], room.decks[1],
+                                        self.max_turns)
+            room.decks = None
+            room.send_state()
+        return room, seat
+
+    def watch(self, msg, writer):
+        """Add a spectator to the room they asked for, if it exists.
+
+        Returns the Room and Spectator, or (None, None) if there's no room.
+        """
+        room = self.rooms.get(msg.get("room"))
+        if room is None:
+            writer.write(protocol.encode(
+                {"op": "error", "message": "There is no such room."}))
+            return None, None
+
+        encoder = room.spectator_encoder
+        if room.game is not None and not room.spectators:
+            # states aren't encoded for spectators while there are none
+            encoder.encode(room.game.state(None), keyframe=True)
+
+        spectator = Spectator(writer)
+        room.spectators.add(spectator)
+        spectator.send(protocol.encode({"op": "watching", "room": room.name}))
+        if room.game is not None:
+            spectator.send(encoder.keyframe())
+        return room, spectator
+
+    def resync_spectator(self, room, spectator, msg):
+        """Send a spectator a keyframe if they ask and have fallen behind."""
+        encoder = room.spectator_encoder
+        if msg["op"] == "resync" and encoder.seq and \
+           msg.get("seq") != encoder.seq:
+            if not spectator.send(encoder.keyframe(), encoder.keyframe):
+                room.spectators.discard(spectator)
+                spectator.drop()
+
+    def act(self, room, seat, action):
+        """Take a player's turn, and tell everyone how it went."""
+        game = room.game
+        if game is None or game.over() or game.turn != seat:
+            room.send(seat, {"op": "error", "message": "It isn't your turn."})
+            return
+        try:
+            game.step(action)
+        except (ValueError, TypeError, IndexError):
+            room.send(seat, {"op": "error",
+                             "message": f"{action} is not a legal action."})
+            room.writers[seat].write(room.encoders[seat].keyframe())
+            return
+        except Exception as e:
+            # a bug in a move rather than a bad action; the game may have
+            # got part of the way through it, so everyone is sent how far
+            traceback.print_exc()
+            room.send(seat, {"op": "error",
+                             "message": f"{action} failed on the server: "
+                                        f"{e!r}"})
+            room.send_state()
+            return
+        room.send_state()
+        if game.over():
+            self.rooms.pop(room.name, None)
+            room.close_spectators()
+
+    def leave(self, room, seat):
+        """Close a room when one of its players leaves."""
+        if self.rooms.get(room.name) is not room:
+            return
+        del self.rooms[room.name]
+        for other, writer in enumerate(room.writers):
+            if other != seat:
+                room.send(other, {"op": "left"})
+                writer.close()
+        room.close_spectators({"op": "left"})
+
+
+async def serve(host, port, max_turns=None):
+    """Run a Server until the process is stopped."""
+    pkmn.use_images(False)
+    server = await Server(max_turns).start(host, port)
+    addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+    print(f"Serving on {addresses}.")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Host games for players connecting with client.py.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=protocol.PORT,
+                        help="port to listen on")
+    parser.add_argument("--max-turns", type=int, default=None,
+                        help="turns after which a game is a draw")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_turns))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,35 @@
 import sys
 import json
+import argparse
 
 import pygame
-pygame.init()
 
+import pkmn
+import bots
 import board
+import engine
+import frontend
 
 def main():
+    parser = argparse.ArgumentParser(description="Play a game on one screen.")
+    parser.add_argument("--bot", choices=sorted(bots.BOTS),
+                        help="bot to play player 2, instead of a person")
+    args = parser.parse_args()
+
+    pygame.init()
+    pkmn.init()
 
     with open("decks/brightsdeck.json", 'r', encoding='utf-8') as f:
         d = json.load(f)
     
     player1 = board.Player.from_deck_dict(d)
-    player2 = board.Player.from_deck_dict(d)
+    if args.bot is None:
+        player2 = board.Player.from_deck_dict(d)
+    else:
+        player2 = board.BotPlayer(engine.deck_from_dict(d), args.bot)
 
-    itf = board.Board((1000, 800), player1, player2)
+    fe = frontend.ThreadedFrontend()
+    itf = board.Board((1000, 800), player1, player2, fe)
 
     player1.hand.extend(player1.draw(4))
     player2.hand.extend(player2.draw(4))
@@ -22,7 +37,7 @@ def main():
     player1.set_dimensions((1000, 800))
     player2.set_dimensions((1000, 800))
 
-    itf.run_game()
+    fe.run(itf.run_game)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
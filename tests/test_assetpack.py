@@ -0,0 +1,50 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+
+import assetpack
+import pack_assets
+
+
+class PackTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.addCleanup(os.chdir, os.getcwd())
+        self.addCleanup(assetpack._asset_pack.cache_clear)
+        os.chdir(folder)
+        os.makedirs("assets/data")
+        self.path = "assets/data/card.json"
+        self._write({"hp": 50})
+        with mock.patch.object(pack_assets, "SOURCES", ["assets/data"]), \
+             contextlib.redirect_stdout(None):
+            pack_assets.build_pack()
+        assetpack._asset_pack.cache_clear()
+
+    def _write(self, d):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(d, f)
+
+    def test_current_asset_comes_from_the_pack(self):
+        pack = assetpack.asset_pack()
+        self.assertTrue(pack.current(self.path))
+        self.assertEqual(assetpack.load_json(self.path), {"hp": 50})
+
+    def test_asset_changed_after_packing_comes_from_disk(self):
+        self._write({"hp": 120})
+        self.assertFalse(assetpack.asset_pack().current(self.path))
+        self.assertEqual(assetpack.load_json(self.path), {"hp": 120})
+
+    def test_asset_only_in_the_pack_is_still_served(self):
+        os.remove(self.path)
+        self.assertTrue(assetpack.exists(self.path))
+        self.assertEqual(assetpack.load_json(self.path), {"hp": 50})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import random
+import itertools
+import unittest
+import contextlib
+from unittest import mock
+
+import pygame
+
+import pkmn
+import ui
+import bots
+import board
+import engine
+import frontend
+from tests.test_moves import _side
+
+
+class ChooseActionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        pygame.font.init()
+
+    def setUp(self):
+        random.seed(0)
+        self.player = board.Player([])
+        self.player.front_line = _side("fs054lapras", None, None,
+                                       None).front_line
+        self.player.set_dimensions((1280, 720))
+        self.opponent = board.Player([])
+        self.opponent.set_dimensions((1280, 720))
+        self.addCleanup(frontend.use, frontend.current())
+
+    def _script(self, frames):
+        fe = frontend.ScriptedFrontend(frames)
+        frontend.use(fe)
+        return fe.open((1280, 720)), fe
+
+    def test_a_click_before_the_first_frame_is_taken(self):
+        x, y, w, h = self.player._layout.deck_rect
+        click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                   pos=(x + w // 2, y + h // 2))
+        screen, fe = self._script([[click]])
+        drawn = len(self.player.deck)
+        self.player.deck.append(pkmn.Card.cardback())
+        self.player.choose_action(screen, lambda event: event.type,
+                                  self.opponent)
+        self.assertEqual(fe.frame, 0)
+        self.assertEqual(len(self.player.deck), drawn)
+        self.assertEqual(len(self.player.hand), 1)
+
+    def test_panels_are_drawn_again_only_when_the_layout_changes(self):
+        with mock.patch.object(ui, "_draw_text",
+                               wraps=ui._draw_text) as draw:
+            self.player._prerender_action_panels()
+            drawn = draw.call_count
+            self.player._prerender_action_panels()
+            self.assertEqual(draw.call_count, drawn)
+            self.player.set_dimensions((1000, 600))
+            self.player._prerender_action_panels()
+            self.assertGreater(draw.call_count, drawn)
+
+class BotPlayerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        pygame.font.init()
+        cls.deck = next(iter(bots.load_decks().values()))
+
+    def setUp(self):
+        random.seed(0)
+        self.addCleanup(frontend.use, frontend.current())
+
+    def test_bots_play_a_game_out_on_the_board(self):
+        shown = []
+        fe = frontend.ScriptedFrontend(itertools.repeat([]))
+        fe.show = lambda state, draw: shown.append(state)
+        players = [board.BotPlayer(engine.deck_from_dict(self.deck),
+                                   "greedy_bot") for _ in range(2)]
+        itf = board.Board((1000, 800), *players, fe)
+        for player in players:
+            player.hand.extend(player.draw(4))
+            player.set_dimensions((1000, 800))
+        with contextlib.redirect_stdout(None):
+            itf.run_game()
+        self.assertTrue(any(not p.prize_cards for p in players))
+        # each turn, the board was shown from the side waiting for the bot
+        self.assertTrue(shown)
+        self.assertTrue(all(state["seat"] == 1 for state in shown))
+
+    def test_a_state_is_drawn_as_the_player_would_draw_it(self):
+        game = engine.Game.new(self.deck, self.deck)
+        you, opponent = board.Player([]), board.Player([])
+        state = game.state(0)
+        for player, side in zip((you, opponent), state["sides"]):
+            player.load_state(side)
+            player.set_dimensions((1000, 800))
+        pkmn.wait_for_images()  # both are drawn with the same cardback
+        screen = pygame.Surface((1000, 800))
+        board.draw_state(screen, state)
+        expected = you._field_image((1000, 800), opponent)
+        self.assertEqual(pygame.image.tobytes(screen, "RGB"),
+                         pygame.image.tobytes(expected, "RGB"))
+
+
+if __name__ == "__main__":
+    unittest.main()
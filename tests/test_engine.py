@@ -0,0 +1,84 @@
+import random
+import unittest
+
+import pkmn
+import bots
+import engine
+from tests.test_moves import _side
+
+
+class SideTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_playing_a_basic_puts_it_on_the_front_line(self):
+        side = _side(None, None, None, None)
+        side.hand = [engine.card_from_key("fs054lapras")]
+        self.assertIn(("play", 0, 2), side.legal_actions())
+        self.assertTrue(side.act(("play", 0, 2), _side(None, None, None,
+                                                        None)))
+        self.assertEqual(side.front_line[2].card_id(), "fs054lapras")
+        self.assertEqual(side.hand, [])
+
+    def test_energy_goes_to_an_occupied_slot(self):
+        side = _side(None, "fs054lapras", None, None)
+        side.hand = [engine.card_from_key("water")]
+        plays = [a for a in side.legal_actions() if a[0] == "play"]
+        self.assertEqual(plays, [("play", 0, 1)])
+        side.act(plays[0], _side(None, None, None, None))
+        self.assertEqual(side.front_line[1].energy()["water"], 1)
+
+    def test_retreat_never_targets_its_own_slot(self):
+        side = _side("fs054lapras", None, "fs059azumarill", None)
+        side.front_line[0].add_energy({"water": 4})
+        retreats = [a for a in side.legal_actions() if a[0] == "retreat"]
+        self.assertTrue(retreats)
+        self.assertTrue(all(to != slot for _, slot, to in retreats))
+
+    def test_an_illegal_action_is_refused(self):
+        side = _side("fs054lapras", None, None, None)
+        opponent = _side(None, None, None, None)
+        self.assertFalse(side.act(("move", 1, 2), opponent))
+        self.assertFalse(side.act(("attack", 0, 0), opponent))
+
+
+class GameTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        cls.decks = bots.load_decks()
+
+    def test_step_refuses_an_action_that_is_not_legal(self):
+        random.seed(0)
+        deck = next(iter(self.decks.values()))
+        game = engine.Game.new(deck, deck)
+        with self.assertRaises(ValueError):
+            game.step(("wake", 0))
+        self.assertEqual(game.turns, 0)
+
+    def test_a_game_between_bots_ends_with_a_winner(self):
+        deck = self.decks["brightsdeck"]
+        winner, turns = bots.play_match(deck, deck, "greedy_bot",
+                                        "greedy_bot", seed=1)
+        self.assertIn(winner, (0, 1))
+        self.assertGreater(turns, 0)
+
+    def test_a_side_with_no_prize_cards_wins_at_the_end_of_its_turn(self):
+        random.seed(0)
+        deck = next(iter(self.decks.values()))
+        game = engine.Game.new(deck, deck)
+        game.current().prize_cards = []
+        game.step(("draw",))
+        self.assertEqual(game.winner, 0)
+        self.assertTrue(game.over())
+        self.assertEqual(game.legal_actions(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import numpy as np
+
+import pkmn
+import bots
+import env
+
+
+class VectorEnvTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        cls.deck = bots.load_decks()["brightsdeck"]
+
+    def setUp(self):
+        self.env = env.VectorEnv(4, self.deck, opponent="random_bot")
+        self.obs = self.env.reset(seed=0)
+
+    def _legal(self):
+        """Pick the first legal action in every game."""
+        return self.obs["mask"].argmax(axis=1)
+
+    def test_the_mask_allows_exactly_the_legal_actions(self):
+        table = env.actions()
+        for i, game in enumerate(self.env.games):
+            side = game.current()
+            legal = {self.env._concrete(side, table[a])
+                     for a in np.flatnonzero(self.obs["mask"][i])}
+            self.assertEqual(legal, set(side.legal_actions()))
+
+    def test_step_gives_arrays_of_one_row_per_game(self):
+        obs, rewards, terminated, truncated = self.env.step(self._legal())
+        self.assertIs(obs, self.obs)
+        self.assertEqual(obs["mask"].shape, (4, len(env.actions())))
+        self.assertEqual(obs["card"].shape, (4, 2, 4))
+        for array, dtype in ((rewards, np.float32), (terminated, bool),
+                             (truncated, bool)):
+            self.assertEqual(array.shape, (4,))
+            self.assertEqual(array.dtype, dtype)
+        self.assertEqual(env.features(obs).shape,
+                         (4, len(env.feature_names())))
+
+    def test_a_game_that_ends_is_dealt_again(self):
+        game = self.env.games[1]
+        game.current().prize_cards = []
+        won = self.env.seats[1]
+        _, rewards, terminated, truncated = self.env.step(self._legal())
+        self.assertEqual(terminated.tolist(), [False, True, False, False])
+        self.assertFalse(truncated.any())
+        self.assertEqual(rewards[1], 1)
+        self.assertIsNot(self.env.games[1], game)
+        self.assertFalse(self.env.games[1].over())
+        self.assertEqual(self.env.seats[1], 1 - won)
+        self.assertTrue(self.obs["mask"][1].any())
+
+    def test_actions_out_of_range_name_the_env_and_action(self):
+        for chosen in ([0, 0, 0, len(env.actions())], [0, -1, 0, 0]):
+            with self.assertRaisesRegex(ValueError, r"VectorEnv\(n=4.*no "
+                                        r"action -?\d+, chosen for game"):
+                self.env.step(chosen)
+        with self.assertRaisesRegex(ValueError, "VectorEnv"):
+            self.env.step([0, 0])
+        with self.assertRaisesRegex(ValueError, "VectorEnv"):
+            self.env.step([0.5] * 4)
+
+    def test_an_illegal_action_is_refused(self):
+        chosen = self._legal()
+        chosen[2] = np.flatnonzero(~self.obs["mask"][2])[0]
+        with self.assertRaisesRegex(ValueError, "isn't legal in game 2"):
+            self.env.step(chosen)
+
+
+class FeaturesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        deck = bots.load_decks()["brightsdeck"]
+        vector = env.VectorEnv(16, deck, opponent="greedy_bot")
+        obs = vector.reset(seed=1)
+        for _ in range(6):
+            obs, *_ = vector.step(obs["mask"].argmax(axis=1))
+        cls.games = vector.games
+
+    def test_a_batch_has_the_features_of_each_game_alone(self):
+        batch = env.encode(self.games)
+        alone = np.concatenate([env.encode([game]) for game in self.games])
+        self.assertTrue(batch.flags["C_CONTIGUOUS"])
+        self.assertEqual(batch.dtype, np.float32)
+        np.testing.assert_array_equal(batch, alone)
+
+    def test_each_slot_gives_its_species_number(self):
+        batch = env.encode(self.games)
+        names = env.feature_names()
+        for i, game in enumerate(self.games):
+            for s, side in enumerate((game.current(), game.opponent())):
+                for slot, card in enumerate(side.front_line):
+                    prefix = f"{('me', 'opponent')[s]}.slot{slot}."
+                    number = batch[i, names.index(prefix + "species")]
+                    occupied = batch[i, names.index(prefix + "occupied")]
+                    if card is None:
+                        self.assertEqual((number, occupied), (0, 0))
+                    else:
+                        self.assertEqual(env.species()[int(number) - 1],
+                                         card.card_id())
+                        self.assertEqual(occupied, 1)
+
+    def test_features_fill_a_given_array(self):
+        obs = env.observe(self.games)
+        out = np.full((len(self.games), len(env.feature_names())), np.nan,
+                      np.float32)
+        self.assertIs(env.features(obs, out), out)
+        np.testing.assert_array_equal(out, env.features(obs))
+
+
+if __name__ == "__main__":
+    unittest.main()
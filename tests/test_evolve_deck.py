@@ -0,0 +1,112 @@
+import os
+import sys
+import shutil
+import random
+import tempfile
+import unittest
+import subprocess
+
+import evolve_deck
+
+POOL = ["fs054lapras", "fs059azumarill", "fs122musharna", "fs196sliggoo",
+        "water", "psychic"]
+SIZE = 12
+
+
+def _random_counts(rng):
+    return [rng.randint(0, 2 * evolve_deck.limit(card, SIZE))
+            for card in POOL]
+
+
+class BreedingTest(unittest.TestCase):
+
+    def assertLegal(self, counts):
+        self.assertEqual(len(counts), len(POOL))
+        self.assertEqual(sum(counts), SIZE)
+        for card, n in zip(POOL, counts):
+            self.assertGreaterEqual(n, 0)
+            self.assertLessEqual(n, evolve_deck.limit(card, SIZE))
+
+    def test_repair_always_gives_a_legal_deck(self):
+        for seed in range(200):
+            counts = _random_counts(random.Random(seed))
+            repaired = evolve_deck.repair(POOL, counts, SIZE,
+                                          random.Random(seed))
+            self.assertLegal(repaired)
+            self.assertEqual(evolve_deck.repair(POOL, counts, SIZE,
+                                                random.Random(seed)),
+                             repaired)
+
+    def test_repair_leaves_a_legal_deck_alone(self):
+        counts = (4, 0, 2, 0, 6, 0)
+        self.assertEqual(evolve_deck.repair(POOL, counts, SIZE,
+                                            random.Random(0)), counts)
+
+    def test_crossover_takes_each_count_from_a_parent(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            mother = evolve_deck.repair(POOL, _random_counts(rng), SIZE, rng)
+            father = evolve_deck.repair(POOL, _random_counts(rng), SIZE, rng)
+            child = evolve_deck.crossover(POOL, mother, father, SIZE, rng)
+            self.assertLegal(child)
+            self.assertEqual(evolve_deck.crossover(POOL, mother, mother,
+                                                   SIZE, rng), mother)
+
+    def test_mutate_swaps_at_most_swaps_cards(self):
+        rng = random.Random(0)
+        for swaps in range(5):
+            deck = evolve_deck.repair(POOL, _random_counts(rng), SIZE, rng)
+            mutant = evolve_deck.mutate(POOL, deck, SIZE, rng, swaps)
+            self.assertLegal(mutant)
+            removed = sum(max(0, a - b) for a, b in zip(deck, mutant))
+            self.assertLessEqual(removed, swaps)
+        self.assertEqual(evolve_deck.mutate(POOL, deck, SIZE, rng, 0), deck)
+
+    def test_decks_go_to_and_from_deck_dicts(self):
+        counts = (4, 0, 2, 0, 6, 0)
+        d = evolve_deck.to_deck(POOL, counts)
+        self.assertEqual(d["pokemon"], {"fs054lapras": 4,
+                                        "fs122musharna": 2})
+        self.assertEqual(d["energy"], {"water": 6})
+        self.assertEqual(evolve_deck.from_deck(POOL, d, SIZE,
+                                               random.Random(0)), counts)
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def _run(self):
+        return subprocess.run(
+            [sys.executable, "evolve_deck.py", "--cards", *POOL[:4],
+             "--energy", *POOL[4:], "--size", str(SIZE),
+             "--population", "4", "--generations", "2", "--games", "1",
+             "--workers", "1",
+             "--cache", os.path.join(self.folder, "cache.jsonl"),
+             "--out", os.path.join(self.folder, "best.json")],
+            capture_output=True, text=True, check=True).stdout
+
+    def test_a_second_run_reads_every_deck_from_the_cache(self):
+        first = self._run()
+        with open(os.path.join(self.folder, "cache.jsonl"), 'r',
+                  encoding='utf-8') as f:
+            cached = len(f.readlines())
+        self.assertIn("Generation 0:", first)
+        self.assertNotIn(", 0 decks played.", first.splitlines()[0])
+
+        second = self._run()
+        generations = [line for line in second.splitlines()
+                       if line.startswith("Generation")]
+        self.assertEqual(len(generations), 3)
+        self.assertTrue(all(line.endswith(", 0 decks played.")
+                            for line in generations))
+        best = lambda out: out[out.index("Best deck"):]
+        self.assertEqual(best(second), best(first))
+        with open(os.path.join(self.folder, "cache.jsonl"), 'r',
+                  encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), cached)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import unittest
+from unittest import mock
+
+import pygame
+
+import frontend
+
+
+class ThreadedFrontendTest(unittest.TestCase):
+
+    def test_snapshots_are_drawn_on_the_main_thread(self):
+        fe = frontend.ThreadedFrontend()
+        self.addCleanup(pygame.display.quit)
+        drawn = threading.Event()
+        calls = []
+
+        def draw(screen, state):
+            calls.append((threading.current_thread(), screen.get_size(),
+                          state))
+            drawn.set()
+
+        def game():
+            fe.open((320, 240))
+            fe.show({"turn": 3}, draw)
+            drawn.wait(5)
+
+        fe.run(game)
+        self.assertEqual(calls, [(threading.main_thread(), (320, 240),
+                                  {"turn": 3})])
+
+    def test_a_snapshot_is_drawn_again_once_pictures_load(self):
+        fe = frontend.ThreadedFrontend()
+        self.addCleanup(pygame.display.quit)
+        loaded = [0]
+        drawn = [threading.Event(), threading.Event()]
+        calls = []
+
+        def draw(screen, state):
+            calls.append(state)
+            drawn[min(len(calls), 2) - 1].set()
+
+        def game():
+            fe.open((32, 24))
+            fe.show({"turn": 1}, draw)
+            drawn[0].wait(5)
+            loaded[0] += 1
+            drawn[1].wait(5)
+
+        with mock.patch("pkmn.images_loaded", lambda: loaded[0]):
+            fe.run(game)
+        self.assertEqual(calls[:2], [{"turn": 1}, {"turn": 1}])
+
+    def test_only_the_newest_snapshot_or_frame_is_shown(self):
+        fe = frontend.ThreadedFrontend()
+        screen = fe.open((32, 24))
+        fe.show({"turn": 1}, None)
+        fe.present(screen)
+        fe.show({"turn": 2}, None)
+        self.assertEqual(list(fe._shown), [(None, {"turn": 2})])
+
+
+class ScriptedFrontendTest(unittest.TestCase):
+
+    def test_a_snapshot_is_drawn_and_presented_as_a_frame(self):
+        frames = []
+        fe = frontend.ScriptedFrontend([], lambda screen, n:
+                                       frames.append(screen.get_at((0, 0))))
+        fe.open((32, 24))
+        fe.show((255, 0, 0), lambda screen, colour: screen.fill(colour))
+        self.assertEqual(frames, [(255, 0, 0, 255)])
+        self.assertEqual(fe.frame, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
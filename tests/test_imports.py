@@ -0,0 +1,39 @@
+import sys
+import subprocess
+import unittest
+
+IMPORT_BUDGET = 100  # ms to import LOGIC_MODULES in a fresh interpreter
+LOGIC_MODULES = ["pkmn", "moves", "engine", "protocol"]
+HEAVY_MODULES = ["pygame", "cv2", "numpy"]
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_the_game_logic_imports_quickly_without_heavy_modules(self):
+        code = ("import sys, time\n"
+                "start = time.perf_counter()\n"
+                f"import {', '.join(LOGIC_MODULES)}\n"
+                "print(1000 * (time.perf_counter() - start))\n"
+                f"print(' '.join(m for m in {HEAVY_MODULES!r} "
+                "if m in sys.modules))\n")
+        out = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True, text=True,
+                             check=True).stdout.splitlines()
+        ms, heavy = float(out[0]), out[1].split() if len(out) > 1 else []
+        self.assertEqual(heavy, [], "these should load on first use")
+        self.assertLessEqual(ms, IMPORT_BUDGET,
+                             f"import {', '.join(LOGIC_MODULES)}")
+
+    def test_importing_the_board_registers_no_event_types(self):
+        code = ("import pygame\n"
+                "before = pygame.event.custom_type()\n"
+                "import board\n"
+                "print(pygame.event.custom_type() - before)\n")
+        out = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True, text=True,
+                             check=True).stdout
+        self.assertEqual(out.splitlines()[-1], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,19 @@
+import unittest
+
+import instrument
+
+
+class PhaseStatsTest(unittest.TestCase):
+
+    def test_percentiles_never_pass_the_longest_call(self):
+        stats = instrument.PhaseStats()
+        for duration in (1.2, 1.5, 1.88):
+            stats.add(duration, duration)
+        dumped = stats.dump()
+        self.assertLessEqual(dumped["p50"], dumped["max"])
+        self.assertLessEqual(dumped["p95"], dumped["max"])
+        self.assertGreaterEqual(dumped["p95"], 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import unittest
+from unittest import mock
+
+import pkmn
+import engine
+
+
+def _side(*keys):
+    """Create a Side with no deck and the given cards on its front line.
+
+    Parameters:
+        keys - str card key or None for each slot, see `engine.card_key`.
+    """
+    side = engine.Side([])
+    side.front_line = [None if key is None else engine.card_from_key(key)
+                       for key in keys]
+    return side
+
+
+def _attack(user, opponent, slot, name, choice=None):
+    """Use the move with the given name, powered up, from a slot."""
+    unit = user.front_line[slot]
+    unit.add_energy({energy: 4 for energy in pkmn.Energy.NAMES})
+    move = [m.name() for m in unit.moves()].index(name)
+    action = ("attack", slot, move) + (() if choice is None else (choice,))
+    return user.act(action, opponent)
+
+
+class MovesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_sleep_inducer_switches_in_the_chosen_pokemon(self):
+        user = _side("fs122musharna", None, None, None)
+        opponent = _side(None, "fs059azumarill", None, "fs054lapras")
+        defending, benched = opponent.front_line[3], opponent.front_line[1]
+        self.assertTrue(_attack(user, opponent, 0, "Sleep Inducer", 1))
+        self.assertIs(opponent.front_line[3], benched)
+        self.assertIs(opponent.front_line[1], defending)
+        self.assertEqual(benched.affliction(), "asleep")
+        self.assertIsNone(defending.affliction())
+
+    def test_sleep_inducer_with_no_bench_puts_the_defender_to_sleep(self):
+        user = _side("fs122musharna", None, None, None)
+        opponent = _side(None, None, None, "fs054lapras")
+        self.assertTrue(_attack(user, opponent, 0, "Sleep Inducer"))
+        self.assertEqual(opponent.front_line[3].affliction(), "asleep")
+
+    def test_icy_wind_puts_the_defender_to_sleep(self):
+        user = _side("fs054lapras", None, None, None)
+        opponent = _side(None, None, None, "fs059azumarill")
+        self.assertTrue(_attack(user, opponent, 0, "Icy Wind"))
+        self.assertEqual(opponent.front_line[3].affliction(), "asleep")
+
+    def test_icy_wind_on_an_empty_slot_does_nothing(self):
+        user = _side("fs054lapras", None, None, None)
+        opponent = _side(None, "fs059azumarill", None, None)
+        self.assertTrue(_attack(user, opponent, 0, "Icy Wind"))
+        self.assertIsNone(opponent.front_line[1].affliction())
+
+    def test_psychic_adds_30_for_each_energy_on_the_defender(self):
+        user = _side("fs122musharna", None, None, None)
+        opponent = _side(None, None, None, "fs054lapras")
+        defender = opponent.front_line[3]
+        defender.add_energy({"water": 2})
+        self.assertTrue(_attack(user, opponent, 0, "Psychic"))
+        self.assertEqual(defender.hp(), defender.max_hp() - 30 - 2 * 30)
+
+    def test_psychic_on_an_empty_slot_only_rolls(self):
+        user = _side("fs122musharna", None, None, None)
+        opponent = _side(None, "fs054lapras", None, None)
+        self.assertTrue(_attack(user, opponent, 0, "Psychic"))
+        bystander = opponent.front_line[1]
+        self.assertEqual(bystander.hp(), bystander.max_hp())
+
+    def test_body_slam_paralyzes_on_heads(self):
+        user = _side("fs196sliggoo", None, None, None)
+        opponent = _side(None, None, None, "fs054lapras")
+        with mock.patch("random.randint", return_value=1):
+            self.assertTrue(_attack(user, opponent, 0, "Body Slam"))
+        self.assertEqual(opponent.front_line[3].affliction(), "paralyzed")
+
+    def test_body_slam_on_an_empty_slot_paralyzes_nothing(self):
+        user = _side("fs196sliggoo", None, None, None)
+        opponent = _side(None, "fs054lapras", None, None)
+        with mock.patch("random.randint", return_value=1):
+            self.assertTrue(_attack(user, opponent, 0, "Body Slam"))
+        self.assertIsNone(opponent.front_line[1].affliction())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+import pkmn
+
+
+class EnergyOrbTest(unittest.TestCase):
+
+    def test_orbs_of_two_sizes_are_both_kept(self):
+        pkmn.energy_orb.cache_clear()
+        for _ in range(3):
+            small = pkmn.energy_orb("water", 12)
+            large = pkmn.energy_orb("water", 30)
+        self.assertEqual(small.get_size(), (12, 12))
+        self.assertEqual(large.get_size(), (30, 30))
+        info = pkmn.energy_orb.cache_info()
+        self.assertEqual((info.misses, info.hits), (2, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import random
+import socket
+import struct
+import unittest
+from unittest import mock
+
+import pkmn
+import bots
+import engine
+import protocol
+
+
+def _states(turns=40):
+    """Play a game between bots, getting the state each seat sees."""
+    random.seed(0)
+    deck = next(iter(bots.load_decks().values()))
+    game = engine.Game.new(deck, deck)
+    states = [game.state(0)]
+    while not game.over() and len(states) < turns:
+        game.step(bots.greedy_bot(game))
+        states.append(game.state(0))
+    return states
+
+
+def _sent(state):
+    """Get a state as it arrives, with only the fields that are sent."""
+    return protocol.unflatten(*protocol.flatten(state))
+
+
+class CodecTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+
+    def test_a_keyframe_then_deltas_rebuild_every_state(self):
+        encoder, decoder = protocol.Encoder(), protocol.Decoder()
+        kinds = []
+        for state in _states():
+            frame = encoder.encode(state)
+            kind, length = protocol.FRAME.unpack_from(frame)
+            self.assertEqual(length, len(frame) - protocol.FRAME.size)
+            kinds.append(kind)
+            self.assertEqual(
+                decoder.decode(kind, frame[protocol.FRAME.size:]),
+                _sent(state))
+        self.assertEqual(kinds[0], protocol.KEYFRAME)
+        self.assertIn(protocol.DELTA, kinds)
+        self.assertEqual(kinds[protocol.KEYFRAME_INTERVAL - 1],
+                         protocol.KEYFRAME)
+
+    def test_a_delta_after_a_gap_is_ignored_until_a_keyframe(self):
+        encoder, decoder = protocol.Encoder(), protocol.Decoder()
+        states = _states(4)
+        frames = [encoder.encode(state) for state in states]
+        decode = lambda frame: decoder.decode(frame[0],
+                                              frame[protocol.FRAME.size:])
+        self.assertEqual(decode(frames[0]), _sent(states[0]))
+        self.assertIsNone(decode(frames[2]))
+        self.assertEqual(decode(encoder.keyframe()), _sent(states[3]))
+        self.assertEqual(decoder.seq, encoder.seq)
+
+
+class ConnectionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+
+    def setUp(self):
+        listener = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(listener.close)
+        self.connection = protocol.Connection(
+            "127.0.0.1", listener.getsockname()[1])
+        self.addCleanup(self.connection.close)
+        self.server, _ = listener.accept()
+        self.addCleanup(self.server.close)
+        self.server.settimeout(5)
+
+    def _received(self):
+        """Read one message the connection sent to the server."""
+        header = self.server.recv(protocol.FRAME.size, socket.MSG_WAITALL)
+        kind, length = protocol.FRAME.unpack(header)
+        payload = self.server.recv(length, socket.MSG_WAITALL)
+        self.assertEqual(kind, protocol.MESSAGE)
+        return protocol.decode(payload)
+
+    def _poll(self):
+        """Poll until something arrives."""
+        for _ in range(100):
+            messages = self.connection.poll(0.05)
+            if messages:
+                return messages
+        self.fail("nothing arrived")
+
+    def test_a_gap_in_the_deltas_asks_once_for_a_keyframe(self):
+        encoder = protocol.Encoder()
+        states = _states(5)
+        frames = [encoder.encode(state) for state in states]
+        self.server.sendall(frames[0])
+        self.assertEqual(self._poll(),
+                         [{"op": "state", "state": _sent(states[0])}])
+
+        self.server.sendall(frames[2] + frames[3])     # frames[1] is lost
+        self.assertEqual(self.connection.poll(0.5), [])
+        self.assertEqual(self._received(), {"op": "resync", "seq": None})
+
+        self.server.sendall(encoder.keyframe())
+        self.assertEqual(self._poll(),
+                         [{"op": "state", "state": _sent(states[4])}])
+        self.server.sendall(protocol.encode({"op": "left"}))
+        self.assertEqual(self._poll(), [{"op": "left"}])
+        self.server.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            self.server.recv(1)     # only the one resync was sent
+
+    def test_a_quiet_connection_asks_whether_it_is_current(self):
+        encoder = protocol.Encoder()
+        self.server.sendall(encoder.encode(_states(1)[0]))
+        self._poll()
+        with mock.patch.object(protocol, "RESYNC_AFTER", 0.05):
+            for _ in range(10):
+                self.assertEqual(self.connection.poll(0.02), [])
+        self.assertEqual(self._received(),
+                         {"op": "resync", "seq": encoder.seq})
+
+    def test_a_frame_at_the_largest_payload_arrives_whole(self):
+        filler = "x" * (protocol.MAX_PAYLOAD - len('{"op":"chat","t":""}'))
+        frame = protocol.encode({"op": "chat", "t": filler})
+        self.assertEqual(len(frame),
+                         protocol.FRAME.size + protocol.MAX_PAYLOAD)
+        self.server.sendall(frame + protocol.encode({"op": "left"}))
+        messages = []
+        while len(messages) < 2:
+            messages += self._poll()
+        self.assertEqual(messages, [{"op": "chat", "t": filler},
+                                    {"op": "left"}])
+        with self.assertRaises(struct.error):
+            protocol.encode({"op": "chat", "t": filler + "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
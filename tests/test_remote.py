@@ -0,0 +1,80 @@
+import random
+import unittest
+from unittest import mock
+
+import pkmn
+import board
+import engine
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+
+def _load(player, keys):
+    """Put the given cards on a Player's front line, as the server would."""
+    side = engine.Side([])
+    side.front_line = [None if key is None else engine.card_from_key(key)
+                       for key in keys]
+    for unit in side.front_line:
+        if unit is not None:
+            unit.add_energy({energy: 4 for energy in pkmn.Energy.NAMES})
+    player.load_state(side.state())
+
+
+class RemotePlayerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+
+    def setUp(self):
+        random.seed(0)
+        self.connection = FakeConnection()
+        self.you = board.RemotePlayer(self.connection)
+        self.opponent = board.Player([])
+        _load(self.you, ["fs122musharna", None, None, None])
+        _load(self.opponent, [None, "fs059azumarill", None, "fs054lapras"])
+
+    def _move(self, name):
+        unit = self.you.front_line[0]
+        return [m.name() for m in unit.moves()].index(name)
+
+    def test_a_slot_picked_for_a_move_is_sent_as_its_choice(self):
+        move = self._move("Sleep Inducer")
+        with mock.patch.object(board.Player, "front_line_opponent",
+                               return_value=1) as pick:
+            self.you.act(("attack", 0, move), self.opponent, object(),
+                         None)
+        self.assertEqual(pick.call_args.args[2], self.opponent)
+        self.assertEqual(pick.call_args.args[3], [1])
+        self.assertEqual(self.connection.sent,
+                         [{"op": "act", "action": ["attack", 0, move, 1]}])
+        # the attack is only taken on the server
+        self.assertEqual(self.opponent.front_line[3].card_id(),
+                         "fs054lapras")
+        self.assertIsNone(self.opponent.front_line[3].affliction())
+
+    def test_a_move_that_asks_nothing_is_sent_as_is(self):
+        move = self._move("Psychic")
+        self.you.act(("attack", 0, move), self.opponent, object(), None)
+        self.assertEqual(self.connection.sent,
+                         [{"op": "act", "action": ["attack", 0, move]}])
+
+    def test_the_server_takes_the_choice_sent(self):
+        game = engine.Game(engine.Side([]), engine.Side([]))
+        game.sides[0].load_state(self.you.state())
+        game.sides[1].load_state(self.opponent.state())
+        benched = game.sides[1].front_line[1]
+        game.step(["attack", 0, self._move("Sleep Inducer"), 1])
+        self.assertIs(game.sides[1].front_line[3], benched)
+        self.assertEqual(benched.affliction(), "asleep")
+
+
+if __name__ == "__main__":
+    unittest.main()
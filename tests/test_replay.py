@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import replay
+
+
+class ReadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def test_truncated_gzip_keeps_the_replays_before_the_cut(self):
+        path = os.path.join(self.folder, "shard.jsonl.gz")
+        replay.write(path, ({"seed": i, "pad": "x" * (i % 50)}
+                            for i in range(2000)))
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        with self.assertWarns(UserWarning):
+            seeds = [r["seed"] for r in replay.read(path)]
+        self.assertGreater(len(seeds), 0)
+        self.assertEqual(seeds, list(range(len(seeds))))
+
+
+if __name__ == "__main__":
+    unittest.main()
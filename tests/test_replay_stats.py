@@ -0,0 +1,59 @@
+import unittest
+
+import pkmn
+import bots
+import replay
+import replay_stats
+
+
+def _attacks(r):
+    """Play back a replay, giving what each attack did to the defender.
+
+    Yields a list of (hit points before, hit points after or None if the
+    unit was knocked out) for each unit the defender had out.
+    """
+    last = None
+    for game, action in replay.replay(r):
+        if last is not None:
+            defender, before = last
+            yield [(hp, unit.hp() if unit in defender.front_line else None)
+                   for unit, hp in before]
+            last = None
+        if action is not None and action[0] == "attack":
+            defender = game.opponent()
+            last = (defender, [(unit, unit.hp())
+                               for unit in defender.front_line if unit])
+
+
+class DamageTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        cls.deck1 = cls.deck2 = bots.load_decks()["brightsdeck"]
+
+    def test_knock_outs_count_the_hit_points_left(self):
+        for seed in range(20):
+            r = replay.record(self.deck1, self.deck2, "greedy_bot",
+                              "greedy_bot", seed, 200)
+            hits = list(_attacks(r))
+            if any(after is None for hit in hits for _, after in hit):
+                break
+        else:
+            self.skipTest("No game had a knock out.")
+
+        expected = sum(hp if after is None else max(0, hp - max(after, 0))
+                       for hit in hits for hp, after in hit)
+        knocked_out = sum(hp for hit in hits for hp, after in hit
+                          if after is None)
+        summary = replay_stats.summarize(replay_stats.game_stats(r))
+        moves = summary["move"].values()
+        self.assertGreater(knocked_out, 0)
+        self.assertEqual(sum(m.get("damage", 0) for m in moves), expected)
+        self.assertEqual(sum(m.get("knockouts", 0) for m in moves),
+                         sum(after is None for hit in hits
+                             for _, after in hit))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import pkmn
+import engine
+import server
+import protocol
+
+
+class Client:
+
+    def __init__(self, reader, writer):
+        """A connection to the server, reading frames as they arrive."""
+        self.reader = reader
+        self.writer = writer
+        self.decoder = protocol.Decoder()
+
+    @staticmethod
+    async def connect(port):
+        return Client(*await asyncio.open_connection("127.0.0.1", port))
+
+    def send(self, msg):
+        self.writer.write(protocol.encode(msg))
+
+    async def frame(self):
+        """Read the next frame, as (kind, payload)."""
+        header = await asyncio.wait_for(
+            self.reader.readexactly(protocol.FRAME.size), 5)
+        kind, length = protocol.FRAME.unpack(header)
+        return kind, await self.reader.readexactly(length)
+
+    async def receive(self):
+        """Read the next frame, as a message or a decoded state."""
+        kind, payload = await self.frame()
+        if kind == protocol.MESSAGE:
+            return protocol.decode(payload)
+        return {"op": "state", "state": self.decoder.decode(kind, payload)}
+
+    async def closed(self):
+        """Check the server has closed the connection."""
+        return await asyncio.wait_for(self.reader.read(), 5) == b""
+
+    def close(self):
+        self.writer.close()
+
+
+class SlowWriter:
+
+    def __init__(self):
+        """A StreamWriter whose connection takes nothing until let go."""
+        self.written = []
+        self.closed = False
+        self.aborted = False
+        self.buffered = server.WRITE_BUFFER     # as if the buffer is full
+        self.flowing = asyncio.Event()
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def abort(self):
+        self.aborted = True
+
+    def write(self, frame):
+        self.written.append(frame)
+
+    async def drain(self):
+        await self.flowing.wait()
+
+    def close(self):
+        self.closed = True
+
+
+def _frames(kind, first, count):
+    """Make frames of a kind, numbered from first."""
+    return [protocol.FRAME.pack(kind, protocol.SEQ.size) +
+            protocol.SEQ.pack(seq) for seq in range(first, first + count)]
+
+
+class SpectatorTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.writer = SlowWriter()
+        self.spectator = server.Spectator(self.writer)
+        self.addCleanup(self.spectator.task.cancel)
+
+    async def _written(self):
+        """Let the connection take everything, and get what it was sent."""
+        self.writer.flowing.set()
+        await asyncio.wait_for(self.spectator.task, 5)
+        return self.writer.written
+
+    async def _take_one(self):
+        """Send a frame the connection takes, and is then stuck writing."""
+        self.spectator.send(b"sent")
+        await asyncio.sleep(0)
+        self.assertTrue(self.spectator.queue.empty())
+
+    def _fill(self):
+        """Queue frames until the spectator has fallen behind."""
+        for frame in _frames(protocol.DELTA, 1, server.SPECTATOR_QUEUE):
+            self.assertTrue(self.spectator.send(frame, None))
+        self.assertTrue(self.spectator.queue.full())
+
+    async def test_frames_are_written_straight_out_while_they_keep_up(self):
+        self.writer.buffered = 0
+        frames = _frames(protocol.DELTA, 1, 3)
+        for frame in frames:
+            self.spectator.send(frame)
+        self.assertEqual(self.writer.written, frames)
+        self.assertTrue(self.spectator.queue.empty())
+
+    async def test_a_spectator_behind_skips_to_a_keyframe(self):
+        await self._take_one()
+        self._fill()
+        keyframe, = _frames(protocol.KEYFRAME, 99, 1)
+        self.assertTrue(self.spectator.send(b"late", lambda: keyframe))
+        self.assertEqual(self.spectator.skips, 1)
+        self.spectator.close()
+        self.assertEqual(await self._written(), [b"sent", keyframe])
+
+    async def test_a_spectator_that_keeps_skipping_is_dropped(self):
+        keyframe, = _frames(protocol.KEYFRAME, 99, 1)
+        for _ in range(server.MAX_SKIPS):
+            self._fill()
+            self.assertTrue(self.spectator.send(b"late", lambda: keyframe))
+        self._fill()
+        self.assertFalse(self.spectator.send(b"late", lambda: keyframe))
+
+    async def test_closing_keeps_the_newest_keyframe_and_its_deltas(self):
+        await self._take_one()
+        queued = _frames(protocol.DELTA, 1, 20)
+        queued += _frames(protocol.KEYFRAME, 21, 1)
+        queued += _frames(protocol.DELTA, 22, server.SPECTATOR_QUEUE - 21)
+        for frame in queued:
+            self.spectator.send(frame)
+        self.assertTrue(self.spectator.queue.full())
+        left = protocol.encode({"op": "left"})
+        self.spectator.close(left)
+        self.assertEqual(await self._written(),
+                         [b"sent"] + queued[20:] + [left])
+
+    async def test_closing_with_no_keyframe_queued_skips_to_one(self):
+        await self._take_one()
+        queued = _frames(protocol.DELTA, 1, server.SPECTATOR_QUEUE)
+        for frame in queued:
+            self.spectator.send(frame)
+        keyframe, = _frames(protocol.KEYFRAME, 99, 1)
+        left = protocol.encode({"op": "left"})
+        self.spectator.close(left, lambda: keyframe)
+        self.assertEqual(await self._written(), [b"sent", keyframe, left])
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pkmn.use_images(False)
+        with open("decks/brightsdeck.json", 'r', encoding='utf-8') as f:
+            cls.deck = json.load(f)
+
+    async def asyncSetUp(self):
+        self.server = server.Server()
+        self.listener = await self.server.start(port=0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            client.close()
+            await client.writer.wait_closed()
+        # let the server see each client leave before the loop is closed
+        handlers = asyncio.all_tasks() - {asyncio.current_task()}
+        if handlers:
+            await asyncio.wait(handlers, timeout=5)
+        self.listener.close()
+        await self.listener.wait_closed()
+
+    async def connect(self):
+        client = await Client.connect(self.port)
+        self.clients.append(client)
+        return client
+
+    async def sit_down(self, room="table"):
+        """Seat two players at a table, returning them once both see it."""
+        players = []
+        for seat in range(2):
+            player = await self.connect()
+            player.send({"op": "join", "room": room, "deck": self.deck})
+            self.assertEqual(await player.receive(),
+                             {"op": "joined", "room": room, "seat": seat})
+            players.append(player)
+        for seat, player in enumerate(players):
+            msg = await player.receive()
+            self.assertEqual(msg["op"], "state")
+            self.assertEqual(msg["state"]["seat"], seat)
+        return players
+
+    async def test_a_turn_taken_is_sent_to_both_players(self):
+        first, second = await self.sit_down()
+        first.send({"op": "act", "action": ["draw"]})
+        for seat, player in enumerate((first, second)):
+            kind, payload = await player.frame()
+            self.assertEqual(kind, protocol.DELTA)
+            state = player.decoder.decode(kind, payload)
+            self.assertEqual(state["turn"], 1)
+            self.assertEqual(state["sides"][0]["hand_size"],
+                             engine.HAND_SIZE + 1)
+
+    async def test_an_illegal_action_is_refused_to_that_seat(self):
+        first, second = await self.sit_down()
+        first.send({"op": "act", "action": ["wake", 9]})
+        msg = await first.receive()
+        self.assertEqual(msg["op"], "error")
+        self.assertEqual((await first.frame())[0], protocol.KEYFRAME)
+        second.send({"op": "act", "action": ["draw"]})
+        self.assertEqual(await second.receive(),
+                         {"op": "error", "message": "It isn't your turn."})
+
+    async def test_a_failing_move_is_reported_and_the_room_carries_on(self):
+        first, second = await self.sit_down()
+        with mock.patch.object(engine.Game, "step",
+                               side_effect=RuntimeError("a bug")), \
+             mock.patch("traceback.print_exc"):
+            first.send({"op": "act", "action": ["draw"]})
+            msg = await first.receive()
+        self.assertEqual(msg["op"], "error")
+        self.assertIn("a bug", msg["message"])
+        for player in (first, second):
+            self.assertEqual((await player.receive())["op"], "state")
+        first.send({"op": "act", "action": ["draw"]})
+        msg = await second.receive()
+        self.assertEqual(msg["state"]["turn"], 1)
+
+    async def test_a_game_is_played_to_the_end(self):
+        self.server.max_turns = 6
+        players = await self.sit_down()
+        for turn in range(6):
+            players[turn % 2].send({"op": "act", "action": ["draw"]})
+            states = [(await player.receive())["state"]
+                      for player in players]
+            self.assertEqual([state["turn"] for state in states],
+                             [(turn + 1) % 2] * 2)
+        self.assertTrue(states[0]["over"])
+        self.assertIsNone(states[0]["winner"])
+        self.assertEqual(self.server.rooms, {})
+
+    async def test_a_player_leaving_closes_the_room(self):
+        first, second = await self.sit_down()
+        watcher = await self.connect()
+        watcher.send({"op": "watch", "room": "table"})
+        self.assertEqual(await watcher.receive(),
+                         {"op": "watching", "room": "table"})
+        self.assertEqual((await watcher.receive())["op"], "state")
+
+        second.close()
+        self.assertEqual(await first.receive(), {"op": "left"})
+        self.assertTrue(await first.closed())
+        self.assertEqual(await watcher.receive(), {"op": "left"})
+        self.assertTrue(await watcher.closed())
+        self.assertEqual(self.server.rooms, {})
+
+    async def test_every_spectator_is_sent_every_state(self):
+        first, second = await self.sit_down()
+        watchers = []
+        for _ in range(3):
+            watcher = await self.connect()
+            watcher.send({"op": "watch", "room": "table"})
+            self.assertEqual((await watcher.receive())["op"], "watching")
+            watchers.append(watcher)
+        for watcher in watchers:
+            self.assertEqual((await watcher.frame())[0], protocol.KEYFRAME)
+        first.send({"op": "act", "action": ["draw"]})
+        frames = [await watcher.frame() for watcher in watchers]
+        self.assertEqual(frames, [frames[0]] * 3)
+        self.assertEqual(frames[0][0], protocol.DELTA)
+
+    async def test_a_full_room_turns_a_third_player_away(self):
+        await self.sit_down()
+        third = await self.connect()
+        third.send({"op": "join", "room": "table", "deck": self.deck})
+        self.assertEqual(await third.receive(),
+                         {"op": "error", "message": "Room 'table' is full."})
+
+
+if __name__ == "__main__":
+    unittest.main()
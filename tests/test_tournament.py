@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import tempfile
+import unittest
+import subprocess
+
+import tournament
+
+# a '-' in a name once let two pairings write the same replay file
+NAMES = ["a", "c", "a-b", "b-c"]
+
+
+class TournamentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.decks = os.path.join(self.folder, "decks")
+        os.mkdir(self.decks)
+        with open("decks/brightsdeck.json", 'r', encoding='utf-8') as f:
+            deck = json.load(f)
+        for i, name in enumerate(NAMES):
+            deck["energy"]["water"] += i
+            with open(os.path.join(self.decks, name + ".json"), 'w',
+                      encoding='utf-8') as f:
+                json.dump(deck, f)
+
+    def _command(self, run):
+        return [sys.executable, "tournament.py", "--decks", self.decks,
+                "--games", "20", "--workers", "1",
+                "--checkpoint", os.path.join(self.folder, f"{run}.jsonl"),
+                "--out", os.path.join(self.folder, f"{run}.json"),
+                "--replays", os.path.join(self.folder, f"{run}-replays")]
+
+    def _run(self, run):
+        out = subprocess.run(self._command(run), capture_output=True,
+                             text=True, check=True).stdout
+        with open(os.path.join(self.folder, f"{run}.json"), 'r',
+                  encoding='utf-8') as f:
+            return out, json.load(f)
+
+    def test_a_killed_run_resumes_where_it_stopped(self):
+        checkpoint = os.path.join(self.folder, "killed.jsonl")
+        process = subprocess.Popen(self._command("killed"),
+                                   stdout=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline and process.poll() is None:
+                if os.path.exists(checkpoint) and \
+                   os.path.getsize(checkpoint):
+                    break
+                time.sleep(0.01)
+        finally:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+        with open(checkpoint, 'r', encoding='utf-8') as f:
+            played = len(f.readlines())
+        pairings = len(NAMES) * (len(NAMES) - 1) // 2
+        self.assertGreater(played, 0)
+        self.assertLess(played, pairings)
+
+        out, resumed = self._run("killed")
+        self.assertIn(f"{played} of {pairings} pairings already played",
+                      out)
+        _, whole = self._run("whole")
+        self.assertEqual(resumed["scores"], whole["scores"])
+        self.assertEqual(resumed["elo"], whole["elo"])
+        self.assertEqual(len(os.listdir(os.path.join(self.folder,
+                                                     "whole-replays"))),
+                         pairings)
+
+    def test_elo_ranks_decks_by_who_beats_whom(self):
+        names = ["weak", "strong", "middling"]
+        results = {("strong", "weak"): ["strong"] * 9 + ["weak"],
+                   ("middling", "strong"): ["strong"] * 7 + ["middling"] * 3,
+                   ("weak", "middling"): ["middling"] * 6 + [None] * 2 +
+                                         ["weak"] * 2}
+        matrix = tournament.score_matrix(names, results)
+        self.assertEqual(matrix["weak"]["middling"], [3.0, 10])
+        self.assertEqual(matrix["middling"]["weak"], [7.0, 10])
+        elo = tournament.fit_elo(names, matrix)
+        self.assertEqual(sorted(names, key=elo.get, reverse=True),
+                         ["strong", "middling", "weak"])
+        self.assertAlmostEqual(sum(elo.values()) / 3, tournament.ELO_BASE)
+
+
+if __name__ == "__main__":
+    unittest.main()
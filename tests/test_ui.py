@@ -0,0 +1,30 @@
+import unittest
+
+import pygame
+
+import ui
+
+
+class TextPanelTest(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        ui._PANELS.clear()
+
+    def test_a_panel_is_drawn_once_per_size(self):
+        panel = ui.text_panel("Move\n\nMove it.", (300, 200))
+        self.assertIs(ui.text_panel("Move\n\nMove it.", [300, 200]), panel)
+        self.assertEqual(panel.get_size(), (300, 200))
+
+    def test_panels_for_old_sizes_are_dropped(self):
+        for width in range(300, 310 + 10 * ui.PANEL_SIZES, 10):
+            ui.text_panel("Move\n\nMove it.", (width, 200))
+            ui.text_panel("Retreat\n\nRetreat it.", (width, 200))
+        self.assertEqual(len(ui._PANELS), ui.PANEL_SIZES)
+        self.assertEqual(sum(len(panels) for panels in ui._PANELS.values()),
+                         2 * ui.PANEL_SIZES)
+        self.assertNotIn((300, 200), ui._PANELS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+"""Play every deck in `decks/` against every other, bot against bot.
+
+    python tournament.py
+    python tournament.py --games 200 --bot random_bot --workers 8
+    python tournament.py --checkpoint big.jsonl --out big.json
+
+Each pair of decks plays --games games, taking turns going first, with
+pairings spread over a pool of processes. Every pairing is appended to the
+checkpoint file as soon as it finishes. Run again with the same file and
+settings and pairings already played are read back instead of replayed, so
+an interrupted tournament carries on where it stopped. Changing a deck or a
+setting only replays the pairings it affects.
+
+With --replays, every game of the pairings played is also written to that
+folder, one gzipped `replay` file per pairing named by its `pairing_key`,
+for `replay_stats.py`.
+
+At the end, a matrix of each deck's score against each other deck (a draw
+counts as half a win) and Elo ratings fitted to every game are printed and
+written to --out.
+
+This file should not be imported.
+"""
+
+import os
+import json
+import math
+import zlib
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pkmn
+import bots
+import replay
+
+ELO_BASE = 1500
+ELO_ITERATIONS = 200
+
+
+def pairing_key(a, b, decks, settings):
+    """Get a str naming a pairing, its decks' contents and its settings.
+
+    A checkpointed pairing is only reused if its key still matches.
+    """
+    blob = json.dumps([a, decks[a], b, decks[b], settings], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def play_pairing(a, b, deck_a, deck_b, settings, replay_path=None):
+    """Play every game of one pairing. Run in a worker process.
+
+    Returns a list of the name of the winner of each game, or None for a
+    draw. Deck a goes first in even games and b in odd ones. Each game is
+    seeded from the pairing and its number, so results don't depend on
+    which worker plays them.
+
+    If replay_path is given, the games are written to it as they're
+    played, as one `replay` file for the pairing.
+    """
+    decks = {a: deck_a, b: deck_b}
+    results = []
+
+    def games():
+        for i in range(settings["games"]):
+            seed = zlib.crc32(f"{settings['seed']}:{a}:{b}:{i}".encode())
+            first, second = (a, b) if i % 2 == 0 else (b, a)
+            r = replay.record(decks[first], decks[second], settings["bot"],
+                              settings["bot"], seed, settings["max_turns"])
+            winner = r["winner"]
+            results.append(None if winner is None else
+                           (first, second)[winner])
+            yield r
+
+    if replay_path is None:
+        for _ in games():
+            pass
+    else:
+        replay.write(replay_path, games())
+    return results
+
+
+def read_checkpoint(path):
+    """Get a dict of {pairing key: results} from a checkpoint file.
+
+    A line cut short by an interruption is ignored, and ended so that the
+    next pairing appended starts a line of its own.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    line = ""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            done[record["key"]] = record["results"]
+    if line and not line.endswith("\n"):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\n")
+    return done
+
+
+def score_matrix(names, results):
+    """Tally each deck's score against each other deck.
+
+    Returns:
+        dict of {a: {b: [points a scored against b, games played]}}.
+    """
+    matrix = {a: {b: [0, 0] for b in names if b != a} for a in names}
+    for (a, b), winners in results.items():
+        for winner in winners:
+            for deck, other in ((a, b), (b, a)):
+                points = 0.5 if winner is None else float(winner == deck)
+                matrix[deck][other][0] += points
+                matrix[deck][other][1] += 1
+    return matrix
+
+
+def fit_elo(names, matrix):
+    """Fit Elo ratings to every game, whatever order they were played in.
+
+    This is the maximum likelihood Bradley-Terry fit, with one drawn game
+    added between each pair of decks so that a deck that never wins still
+    gets a finite rating.
+    """
+    strength = {name: 1.0 for name in names}
+    for _ in range(ELO_ITERATIONS):
+        new = {}
+        for a in names:
+            points = sum(matrix[a][b][0] + 0.5 for b in matrix[a])
+            expected = sum((matrix[a][b][1] + 1) / (strength[a] + strength[b])
+                           for b in matrix[a])
+            new[a] = points / expected
+        mean = math.exp(sum(math.log(s) for s in new.values()) / len(new))
+        strength = {name: s / mean for name, s in new.items()}
+    return {name: ELO_BASE + 400 * math.log10(s)
+            for name, s in strength.items()}
+
+
+def print_report(names, matrix, elo):
+    """Print the score matrix, decks sorted by Elo."""
+    names = sorted(names, key=elo.get, reverse=True)
+    width = max(len(name) for name in names)
+    print(" " * width + "    Elo " +
+          " ".join(f"{name[:8]:>8}" for name in names))
+    for a in names:
+        cells = []
+        for b in names:
+            if a == b:
+                cells.append(f"{'-':>8}")
+            else:
+                points, games = matrix[a][b]
+                cells.append(f"{points / games:8.1%}" if games else
+                             f"{'':>8}")
+        print(f"{a:>{width}} {elo[a]:6.0f} " + " ".join(cells))
+
+
+def _init_worker():
+    pkmn.use_images(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play a round robin of bot games between decks.")
+    parser.add_argument("--decks", default=bots.DECKS,
+                        help="folder of decks to enter")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per pair of decks")
+    parser.add_argument("--bot", default="greedy_bot", choices=bots.BOTS,
+                        help="bot playing every deck")
+    parser.add_argument("--max-turns", type=int, default=500,
+                        help="turns after which a game is a draw")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed the games are played from")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to play on (default: one per CPU)")
+    parser.add_argument("--checkpoint", default="tournament.jsonl",
+                        help="file finished pairings are kept in")
+    parser.add_argument("--out", default="tournament.json",
+                        help="file to write the results to")
+    parser.add_argument("--replays", default=None,
+                        help="folder to write a replay file per pairing to")
+    args = parser.parse_args()
+
+    decks = bots.load_decks(args.decks)
+    names = list(decks)
+    if len(names) < 2:
+        parser.error(f"{args.decks} needs at least two decks.")
+    settings = {"games": args.games, "bot": args.bot,
+                "max_turns": args.max_turns, "seed": args.seed}
+
+    if args.replays is not None:
+        os.makedirs(args.replays, exist_ok=True)
+    done = read_checkpoint(args.checkpoint)
+    results = {}
+    pending = []
+    for a, b in itertools.combinations(names, 2):
+        key = pairing_key(a, b, decks, settings)
+        if key in done:
+            results[a, b] = done[key]
+        else:
+            pending.append((key, a, b))
+    total = len(results) + len(pending)
+    print(f"{len(results)} of {total} pairings already played.")
+
+    if pending:
+        checkpoint = open(args.checkpoint, 'a', encoding='utf-8')
+        pool = ProcessPoolExecutor(args.workers, initializer=_init_worker)
+        with checkpoint, pool:
+            futures = {}
+            for key, a, b in pending:
+                path = None if args.replays is None else \
+                    os.path.join(args.replays, f"{key}.jsonl.gz")
+                future = pool.submit(play_pairing, a, b, decks[a], decks[b],
+                                     settings, path)
+                futures[future] = (key, a, b)
+            for future in as_completed(futures):
+                key, a, b = futures[future]
+                results[a, b] = future.result()
+                checkpoint.write(json.dumps(
+                    {"key": key, "pair": [a, b],
+                     "results": results[a, b]}) + "\n")
+                checkpoint.flush()
+                print(f"{a} vs {b} done ({len(results)} of {total}).")
+
+    matrix = score_matrix(names, results)
+    elo = fit_elo(names, matrix)
+    print_report(names, matrix, elo)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({"settings": settings, "elo": elo, "scores": matrix},
+                  f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+from collections import defaultdict, OrderedDict
 from functools import lru_cache
 
 import pygame
-pygame.init()
+
+import assetpack
 
 class Button:
 
@@ -32,10 +34,18 @@ class Button:
         x, y = mouse_pos
         if self._x <= x and x <= self._x + self._w and \
            self._y <= y and y <= self._y + self._h:
-            if self._on_click is not None:
-                self._on_click()
+            self.click()
             return True
         return False
+
+    def click(self):
+        """Run this button's function, if it has one."""
+        if self._on_click is not None:
+            self._on_click()
+
+    def rect(self):
+        """Get (x, y, w, h) of where this button was last drawn."""
+        return self._x, self._y, self._w, self._h
     
     def render(self, screen, rect):
         """Draw this button on the screen, stretched to fit the given rect.
@@ -59,9 +69,218 @@ class Button:
         screen.blit(self._image, (x, y))
 
 
+FONT_PATH = "assets/font/PokemonGb-RAeo.ttf"
+
+
+def init():
+    """Start pygame's font module and open the TextBox fonts.
+
+    Safe to call more than once. Text layout and rendering call this
+    themselves, so importing this module touches neither SDL nor the font
+    files.
+    """
+    if TextBox.font is None:
+        pygame.font.init()
+        TextBox.font = pygame.font.Font(assetpack.open_asset(FONT_PATH), 14)
+        TextBox.title_font = pygame.font.Font(assetpack.open_asset(FONT_PATH),
+                                              24)
+
+
+_ADVANCES = {}
+
+
+def text_width(font, text):
+    """Measure the width of a single line of text, in pixels.
+
+    Each character's advance is looked up once per font and kept in a table,
+    so measuring a string never asks pygame to lay it out.
+
+    Parameters:
+
+        font - pygame.font.Font used to draw the text.
+
+        text - str without newlines.
+    """
+    table = _ADVANCES.setdefault(font, {})
+    width = 0
+    for c in text:
+        advance = table.get(c)
+        if advance is None:
+            metrics = font.metrics(c)[0]
+            advance = metrics[4] if metrics else font.size(c)[0]
+            table[c] = advance
+        width += advance
+    return width
+
+
+def _fit_line(words, font, width):
+    """Decide how many of the given words fit on one line.
+
+    Parameters:
+
+        words - list of str, each without spaces.
+
+        font  - pygame.font.Font the line is drawn with.
+
+        width - Horizontal space available.
+
+    Returns:
+        line - str of the text on this line.
+        rest - list of str of the words left for following lines.
+    """
+    space = text_width(font, " ")
+    line_w = text_width(font, words[0])
+    n = 1
+    while n < len(words):
+        word_w = text_width(font, words[n])
+        if line_w + space + word_w >= width:
+            break
+        line_w += space + word_w
+        n += 1
+    if n == 1 and line_w >= width and len(words[0]) > 1:
+        # word is too long for any line, so split it where it overflows
+        word = words[0]
+        i, part_w = 0, 0
+        while i < len(word) - 1:
+            part_w += text_width(font, word[i])
+            if part_w >= width:
+                break
+            i += 1
+        i = max(i, 1)
+        return word[:i], [word[i:]] + words[1:]
+    return " ".join(words[:n]), words[n:]
+
+
+@lru_cache(256)
+def render_line(font, text, fg, bg):
+    """Rasterize one line of text, reusing the Surface if it was drawn before.
+
+    Parameters:
+
+        font - pygame.font.Font to draw with.
+
+        text - str without newlines.
+
+        fg   - (r, g, b) of text color.
+
+        bg   - (r, g, b) of background color.
+    """
+    return font.render(text, True, fg, bg)
+
+
+@lru_cache(512)
+def layout_text(text, width, do_title=True):
+    """Break text into lines that fit within a text box.
+
+    Layouts only depend on their arguments, so they are cached for every
+    TextBox to share.
+
+    Parameters:
+
+        text     - str to lay out. Newlines start new lines.
+
+        width    - Width of the text box's white background.
+
+        do_title - If True, the first line is drawn in the title font.
+
+    Returns:
+        tuple of (line, is_title, y) for each line, where y is measured from
+        the top of the text box.
+    """
+    init()
+    font_height = TextBox.font.size("Tg")[1]
+    title_height = TextBox.title_font.size("Tg")[1]
+    width -= 10
+
+    lines = []
+    y = 5
+    for paragraph in text.split("\n"):
+        words = paragraph.split(" ")
+        if not paragraph:
+            y += font_height + TextBox.line_spacing
+            continue
+        while words:
+            if do_title:
+                line, words = _fit_line(words, TextBox.title_font, width)
+                lines.append((line, True, y))
+                y += title_height + TextBox.line_spacing
+                do_title = False
+            else:
+                line, words = _fit_line(words, TextBox.font, width)
+                lines.append((line, False, y))
+                y += font_height + TextBox.line_spacing
+    return tuple(lines)
+
+
+def _draw_text(surface, text, do_title=True, centered=False):
+    """Fill a surface with a text box's background and lay text out on it.
+
+    Parameters:
+
+        surface  - pygame Surface the size of the text box.
+
+        text     - str to draw.
+
+        do_title - If True, the first line is drawn in the title font.
+
+        centered - If True, each line is centered rather than left aligned.
+    """
+    w, h = surface.get_size()
+    surface.fill(TextBox.bg)
+    init()
+    font_height = TextBox.font.size("Tg")[1]
+
+    for line, is_title, y in layout_text(text, w, do_title):
+        if y + font_height > h:
+            break
+        font = TextBox.title_font if is_title else TextBox.font
+        image = render_line(font, line, TextBox.fg, TextBox.bg)
+        if centered:
+            surface.blit(image, (5 + ((w - 10 - image.get_width()) // 2), y))
+        else:
+            surface.blit(image, (5, y))
+
+
+PANEL_SIZES = 3     # the action panel, help text and d10 roll text boxes
+_PANELS = OrderedDict()     # {size: {(text, do_title, centered): Surface}}
+
+
+def text_panel(text, size, do_title=True, centered=False):
+    """Draw a finished text box, border and all, to be blitted as is.
+
+    For text that's shown over and over, like a Pokemon's moves. Panels are
+    cached, so drawing one again, e.g. when cycling back to it, is one blit.
+    Only the PANEL_SIZES sizes asked for most recently are kept, so panels
+    drawn for an old window size are dropped once the board is laid out
+    again.
+
+    Parameters:
+
+        text     - str to draw.
+
+        size     - (w, h) of the text box.
+
+        do_title - If True, the first line is drawn in the title font.
+
+        centered - If True, each line is centered rather than left aligned.
+    """
+    size = tuple(size)
+    panels = _PANELS.setdefault(size, {})
+    _PANELS.move_to_end(size)
+    while len(_PANELS) > PANEL_SIZES:
+        _PANELS.popitem(last=False)
+    key = (text, do_title, centered)
+    if key not in panels:
+        surface = pygame.Surface(size)
+        _draw_text(surface, text, do_title, centered)
+        pygame.draw.rect(surface, TextBox.fg, (0, 0, *size), width=3)
+        panels[key] = surface
+    return panels[key]
+
+
 class TextBox:
-    font = pygame.font.Font("assets/font/PokemonGB-RAeo.ttf", 14)
-    title_font = pygame.font.Font("assets/font/PokemonGB-RAeo.ttf", 24)
+    font = None                 # both opened by init()
+    title_font = None
     bg = (255, 255, 255)
     fg = (0, 0, 0)
     line_spacing = 8
@@ -70,56 +289,20 @@ class TextBox:
         """Create a text box that contains and wraps text."""
         self._text = text
         self._rect = (0, 0, 0, 0)
+        self._image = None
+        self._image_key = None
     
-    @lru_cache(16)
     def _generate_text_img(self, size, text, do_title=True, centered=False):
         """Create the white-background text image.
         
         Parameters:
             rect - (w, h) defining white background.
         """
-        w, h = size
-        surface = pygame.Surface((w, h))
-        surface.fill(TextBox.bg)
-        font_height = TextBox.font.size("Tg")[1]
-        title_height = TextBox.title_font.size("Tg")[1]
-
-        x = 5
-        w -= 10
-        y = 5
-
-        while text:
-            if text[0] == '\n':
-                y += font_height + TextBox.line_spacing
-                text = text[1:]
-                continue
-
-            i = 1
-            if y + font_height > h:
-                break
-            while TextBox.font.size(text[:i])[0] < w and i < len(text):
-                i += 1
-            if '\n' in text[:i]:
-                i = text.find('\n', 0, i) + 1
-            elif i < len(text):
-                i = text.rfind(' ', 0, i) + 1
-            if do_title:
-                line = TextBox.title_font.render(text[:i], True, TextBox.fg,
-                                                 TextBox.bg)
-                dy = title_height + TextBox.line_spacing
-                do_title = False
-            else:
-                
-                line = TextBox.font.render(text[:i], True, TextBox.fg,
-                                           TextBox.bg)
-                dy = font_height + TextBox.line_spacing
-            if centered:
-                surface.blit(line, (x + ((w - line.get_width()) // 2), y))
-            else:
-                surface.blit(line, (x, y))
-            y += dy
-            text = text[i:]
-        
+        if self._image is not None and self._image.get_size() == size:
+            surface = self._image
+        else:
+            surface = pygame.Surface(size)
+        _draw_text(surface, text, do_title, centered)
         return surface
     
     def set_text(self, text):
@@ -135,9 +318,11 @@ class TextBox:
         
             rect   - (x, y, w, h) defining white background.
         """
-        image = self._generate_text_img(rect[2:], self._text, do_title,
-                                        centered)
-        screen.blit(image, rect[:2])
+        key = (tuple(rect[2:]), self._text, do_title, centered)
+        if key != self._image_key:
+            self._image = self._generate_text_img(*key)
+            self._image_key = key
+        screen.blit(self._image, rect[:2])
         pygame.draw.rect(screen, TextBox.fg, rect, width=3)
         self._rect = rect
     
@@ -146,3 +331,360 @@ class TextBox:
         x0, y0 = point
         x, y, w, h = self._rect
         return x <= x0 and x0 <= x + w and y <= y0 and y0 <= y + h
+
+    def rect(self):
+        """Get (x, y, w, h) of where this text box was last drawn."""
+        return self._rect
+
+
+class HitIndex:
+
+    def __init__(self, cell_size=64):
+        """Create an empty index of clickable rects.
+
+        Rects are bucketed into a grid of square cells, so finding what lies
+        under a point only checks the few rects sharing its cell, no matter
+        how many are on screen.
+
+        Parameters:
+            cell_size - Side length of each grid cell, in pixels.
+        """
+        self._cell_size = cell_size
+        self._cells = defaultdict(list)
+
+    def clear(self):
+        """Remove every rect, ready for the next frame."""
+        self._cells.clear()
+
+    def add(self, rect, target):
+        """Register something clickable.
+
+        Parameters:
+
+            rect   - (x, y, w, h) of its area on screen.
+
+            target - What `hit` returns when the area is clicked.
+
+        Rects added later are treated as drawn on top of earlier ones.
+        """
+        x, y, w, h = rect
+        entry = (x, y, x + w, y + h, target)
+        c = self._cell_size
+        for cx in range(int(x // c), int((x + w) // c) + 1):
+            for cy in range(int(y // c), int((y + h) // c) + 1):
+                self._cells[(cx, cy)].append(entry)
+
+    def hit(self, pos):
+        """Get the topmost target whose rect contains pos, or None.
+
+        Parameters:
+            pos - (x, y) of the point, usually the mouse cursor.
+        """
+        x, y = pos
+        c = self._cell_size
+        bucket = self._cells.get((int(x // c), int(y // c)), ())
+        for x0, y0, x1, y1, target in reversed(bucket):
+            if x0 <= x and x <= x1 and y0 <= y and y <= y1:
+                return target
+        return None
+
+
+class Widget:
+
+    def __init__(self, place, on_click=None):
+        """Create a widget that a Scene lays out and redraws when it changes.
+
+        Parameters:
+
+            place    - Function taking the (w, h) of the screen and returning
+                       the (x, y, w, h) this widget takes up.
+
+            on_click - Function to be run when this widget is clicked.
+        """
+        self._place = place
+        self._on_click = on_click
+        self._rect = (0, 0, 0, 0)
+        self._drawn = None      # where this was last drawn, to clear it
+        self._visible = True
+        self.dirty = True
+
+    def layout(self, size):
+        """Place this widget for a screen of the given (w, h)."""
+        rect = tuple(self._place(size))
+        if rect != self._rect:
+            self._rect = rect
+            self.dirty = True
+
+    def rect(self):
+        """Get (x, y, w, h) of where this widget goes."""
+        return self._rect
+
+    def visible(self):
+        """Return True if this widget is drawn and can be clicked."""
+        return self._visible
+
+    def show(self, visible=True):
+        """Show or hide this widget."""
+        if visible != self._visible:
+            self._visible = visible
+            self.dirty = True
+
+    def click(self):
+        """Run this widget's function, if it has one."""
+        if self._on_click is not None:
+            self._on_click()
+
+    def update(self):
+        """Check for changes that happened outside the widget.
+
+        Called once per frame, before anything is drawn. Widgets that depend
+        on something else set `dirty` here when it changes.
+        """
+
+    def leaves(self):
+        """Generate every visible widget that draws itself, bottom first."""
+        if self._visible:
+            yield self
+
+    def draw(self, screen):
+        """Draw this widget at its rect on the screen."""
+
+
+class Area(Widget):
+
+    def __init__(self, place, value=None, on_click=None):
+        """Create an invisible clickable area.
+
+        For things that are part of a Scene's background, like the board's
+        front line slots.
+
+        Parameters:
+
+            place    - As for Widget.
+
+            value    - Anything, to tell areas apart when clicked.
+
+            on_click - As for Widget.
+        """
+        super().__init__(place, on_click)
+        self.value = value
+
+
+class ImageView(Widget):
+
+    def __init__(self, image, place, on_click=None):
+        """Create a widget showing an image stretched to fit its rect.
+
+        Parameters:
+
+            image    - Pygame Surface object.
+
+            place    - As for Widget.
+
+            on_click - As for Widget.
+        """
+        super().__init__(place, on_click)
+        self._orig_image = image
+        self._image = image
+
+    def draw(self, screen):
+        x, y, w, h = self._rect
+        if self._image.get_size() != (w, h):
+            try:
+                self._image = pygame.transform.smoothscale(self._orig_image,
+                                                           (w, h))
+            except ValueError:
+                self._image = pygame.transform.scale(self._orig_image, (w, h))
+        screen.blit(self._image, (x, y))
+
+
+class TextView(Widget):
+
+    def __init__(self, text, place, do_title=True, centered=False,
+                 on_click=None):
+        """Create a text box widget, drawn with `text_panel`.
+
+        Parameters:
+
+            text     - str to show.
+
+            place    - As for Widget.
+
+            do_title - If True, the first line is drawn in the title font.
+
+            centered - If True, each line is centered.
+
+            on_click - As for Widget.
+        """
+        super().__init__(place, on_click)
+        self._text = text
+        self._do_title = do_title
+        self._centered = centered
+
+    def set_text(self, text):
+        """Change the text shown, redrawing only if it's different."""
+        if text != self._text:
+            self._text = text
+            self.dirty = True
+
+    def draw(self, screen):
+        panel = text_panel(self._text, self._rect[2:], self._do_title,
+                           self._centered)
+        screen.blit(panel, self._rect[:2])
+
+
+class CardView(Widget):
+
+    def __init__(self, card, place, centered=True, on_click=None):
+        """Create a widget showing a card, as large as fits its rect.
+
+        Parameters:
+
+            card     - pkmn.Card to show. It's redrawn when its image
+                       finishes loading.
+
+            place    - As for Widget.
+
+            centered - As for Card.render.
+
+            on_click - As for Widget.
+        """
+        super().__init__(place, on_click)
+        self._card = card
+        self._centered = centered
+        self._ready = card.ready()
+
+    def update(self):
+        if self._card.ready() != self._ready:
+            self._ready = not self._ready
+            self.dirty = True
+
+    def draw(self, screen):
+        self._card.render(screen, self._rect, centered=self._centered)
+
+
+class Container(Widget):
+
+    def __init__(self, place=None):
+        """Create a widget that groups other widgets.
+
+        Hiding a container hides everything in it.
+
+        Parameters:
+            place - As for Widget. If None, it takes up the whole screen.
+        """
+        super().__init__(place or (lambda size: (0, 0, *size)))
+        self._children = []
+
+    def add(self, widget):
+        """Add a widget on top of the others, and return it."""
+        self._children.append(widget)
+        self.dirty = True
+        return widget
+
+    def layout(self, size):
+        super().layout(size)
+        for child in self._children:
+            child.layout(size)
+
+    def update(self):
+        for child in self._children:
+            child.update()
+
+    def leaves(self):
+        if self._visible:
+            for child in self._children:
+                yield from child.leaves()
+
+    def _all_widgets(self):
+        yield self
+        for child in self._children:
+            if isinstance(child, Container):
+                yield from child._all_widgets()
+            else:
+                yield child
+
+
+class Scene(Container):
+
+    def __init__(self):
+        """Create the root of a widget tree, drawn over a background image.
+
+        Widgets are declared once, then `render` is called every frame. It
+        only redraws the parts of the screen where a widget changed, moved,
+        appeared or disappeared, and assumes the screen still holds the
+        last frame otherwise.
+        """
+        super().__init__()
+        self._background = None
+        self._size = None
+        self._full = True
+        self._hits = HitIndex()
+
+    def set_background(self, surface):
+        """Draw every widget over the given screen-sized Surface."""
+        self._background = surface
+        self._full = True
+
+    def invalidate(self):
+        """Redraw the whole screen next frame, e.g. after drawing over it."""
+        self._full = True
+
+    def hit(self, pos):
+        """Get the topmost visible widget at pos, or None."""
+        return self._hits.hit(pos)
+
+    def render(self, screen):
+        """Redraw whatever changed since the last frame.
+
+        Returns:
+            list of pygame Rects of the areas of the screen redrawn.
+        """
+        size = screen.get_size()
+        if size != self._size:
+            self._size = size
+            self._full = True
+        self.layout(size)
+        self.update()
+
+        widgets = list(self._all_widgets())
+        for widget in widgets:
+            if widget.dirty and isinstance(widget, Container):
+                for child in widget._all_widgets():
+                    child.dirty = True
+        if self._full:
+            regions = [pygame.Rect(0, 0, *size)]
+        else:
+            regions = []
+            for widget in widgets:
+                if not widget.dirty or isinstance(widget, Container):
+                    continue
+                rects = [widget._drawn]
+                if widget.visible():
+                    rects.append(widget.rect())
+                for rect in rects:
+                    if rect is not None and rect not in regions:
+                        regions.append(pygame.Rect(rect))
+        if not regions:
+            return []
+
+        leaves = list(self.leaves())
+        clip = screen.get_clip()
+        for region in regions:
+            screen.set_clip(region)
+            if self._background is not None:
+                screen.blit(self._background, region, region)
+            for widget in leaves:
+                if region.colliderect(widget.rect()):
+                    widget.draw(screen)
+        screen.set_clip(clip)
+
+        self._hits.clear()
+        for widget in widgets:
+            widget.dirty = False
+            widget._drawn = None
+        for widget in leaves:
+            widget._drawn = widget.rect()
+            self._hits.add(widget.rect(), widget)
+        self._full = False
+        return regions
@@ -9,8 +9,6 @@ This file should not be imported.
 import json
 import hashlib
 
-from cv2 import sort
-
 from pkmn import Energy
 from moves import move_by_id
 